@@ -8,7 +8,10 @@ native support of data frames, while leaving the original API intact.
 from packaging.version import parse as __parse_version
 from sklearn import __version__ as __sklearn_version__
 
+from ._config import *
+from ._registry import *
 from ._sklearndf import *
+from ._timing import *
 from ._version import __version__
 
 __version__: str
@@ -0,0 +1,181 @@
+"""
+Global configuration of :mod:`sklearndf`.
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Union
+
+import numpy as np
+
+from pytools.api import AllTracker
+
+log = logging.getLogger(__name__)
+
+__all__ = ["get_config", "set_config", "config_context"]
+
+
+#
+# global configuration
+#
+
+_global_config: Dict[str, Any] = dict(
+    float_dtype=None,
+    binary_dtype=None,
+    lgbm_dataset_cache_size=0,
+    lgbm_parallel_predict_min_rows=0,
+    compile_tree_ensembles=False,
+)
+
+
+class _Unchanged:
+    # type of the marker for options that are not changed by set_config
+    def __repr__(self) -> str:
+        return "<unchanged>"
+
+
+_UNCHANGED = _Unchanged()
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Function definitions
+#
+
+
+def get_config() -> Dict[str, Any]:
+    """
+    Get the current global configuration of :mod:`sklearndf`.
+
+    :return: a copy of the current configuration, as a mapping of option names to
+        their values
+    """
+    return _global_config.copy()
+
+
+def set_config(
+    *,
+    float_dtype: Union[str, type, np.dtype, None, _Unchanged] = _UNCHANGED,
+    binary_dtype: Union[str, type, np.dtype, None, _Unchanged] = _UNCHANGED,
+    lgbm_dataset_cache_size: Union[int, _Unchanged] = _UNCHANGED,
+    lgbm_parallel_predict_min_rows: Union[int, _Unchanged] = _UNCHANGED,
+    compile_tree_ensembles: Union[bool, _Unchanged] = _UNCHANGED,
+) -> None:
+    """
+    Set the global configuration of :mod:`sklearndf`.
+
+    Options not passed to this function remain unchanged.
+
+    :param float_dtype: the floating point dtype used for data passed between
+        estimators: if set, floating point outputs of transformers are converted to
+        this dtype, and floating point features are converted to this dtype before
+        they are passed to a native learner; use ``"float32"`` to halve the memory
+        used by intermediate results; ``None`` to leave all dtypes unchanged
+        (default: ``None``)
+    :param binary_dtype: the boolean or integer dtype used for the outputs of
+        transformers producing only zeros and ones, i.e., indicators, one-hot
+        encodings, and binarized features; use ``"uint8"`` or ``"bool"`` to store
+        these outputs in a single byte per value; ``None`` to leave the dtypes of
+        these outputs unchanged (default: ``None``)
+    :param lgbm_dataset_cache_size: the maximum number of binned LightGBM datasets
+        kept for re-use by LightGBM learners, e.g., when fitting many models to the
+        same data during cross-validation or hyperparameter search; the least
+        recently used datasets are discarded first; ``0`` to disable caching
+        (default: ``0``)
+    :param lgbm_parallel_predict_min_rows: the minimum number of rows for which
+        LightGBM learners predict using multiple threads; predictions for fewer
+        rows use a single thread, avoiding the overhead of starting threads for
+        small batches, and leaving the remaining cores to other workers when
+        serving requests concurrently; ``0`` to always use multiple threads
+        (default: ``0``)
+    :param compile_tree_ensembles: if ``True``, random forest, extra trees, and
+        gradient boosting learners compile their fitted trees into contiguous node
+        arrays, and predict by traversing all trees at once, with the same results
+        as the native learners but with lower latency for small batches
+        (default: ``False``)
+    """
+    if float_dtype is not _UNCHANGED:
+        _global_config["float_dtype"] = _validate_dtype(
+            arg_name="float_dtype",
+            dtype=float_dtype,
+            kinds="f",
+            kinds_description="a floating point",
+        )
+    if binary_dtype is not _UNCHANGED:
+        _global_config["binary_dtype"] = _validate_dtype(
+            arg_name="binary_dtype",
+            dtype=binary_dtype,
+            kinds="biu",
+            kinds_description="a boolean or integer",
+        )
+    if lgbm_dataset_cache_size is not _UNCHANGED:
+        _global_config["lgbm_dataset_cache_size"] = _validate_non_negative_int(
+            arg_name="lgbm_dataset_cache_size", value=lgbm_dataset_cache_size
+        )
+    if lgbm_parallel_predict_min_rows is not _UNCHANGED:
+        _global_config["lgbm_parallel_predict_min_rows"] = _validate_non_negative_int(
+            arg_name="lgbm_parallel_predict_min_rows",
+            value=lgbm_parallel_predict_min_rows,
+        )
+    if compile_tree_ensembles is not _UNCHANGED:
+        if not isinstance(compile_tree_ensembles, bool):
+            raise ValueError(
+                "arg compile_tree_ensembles must be a bool: "
+                f"{compile_tree_ensembles!r}"
+            )
+        _global_config["compile_tree_ensembles"] = compile_tree_ensembles
+
+
+@contextmanager
+def config_context(**new_config) -> Iterator[None]:
+    """
+    Context manager for temporarily changing the global configuration of
+    :mod:`sklearndf`.
+
+    Accepts the same keyword arguments as :func:`.set_config`; the previous
+    configuration is restored when leaving the context.
+    """
+    old_config = get_config()
+    set_config(**new_config)
+
+    try:
+        yield
+    finally:
+        _global_config.clear()
+        _global_config.update(old_config)
+
+
+def _validate_dtype(
+    arg_name: str,
+    dtype: Union[str, type, np.dtype, None],
+    kinds: str,
+    kinds_description: str,
+) -> Optional[np.dtype]:
+    if dtype is None:
+        return None
+
+    try:
+        validated = np.dtype(dtype)
+    except TypeError as cause:
+        raise TypeError(f"arg {arg_name} is not a valid dtype: {dtype}") from cause
+
+    if validated.kind not in kinds:
+        raise ValueError(f"arg {arg_name} is not {kinds_description} dtype: {dtype}")
+
+    return validated
+
+
+def _validate_non_negative_int(arg_name: str, value: int) -> int:
+    if not isinstance(value, (int, np.integer)) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"arg {arg_name} must be a non-negative integer: {value!r}")
+
+    return int(value)
+
+
+__tracker.validate()
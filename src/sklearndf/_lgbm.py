@@ -0,0 +1,479 @@
+"""
+Wrapper support for LightGBM learners.
+
+LightGBM learners bin the values of all features before training; the resulting
+binned datasets can be cached and re-used across fits (see option
+``lgbm_dataset_cache_size`` of :func:`.set_config`).
+
+The number of threads LightGBM uses for predictions is set explicitly for each
+prediction, depending on the number of rows (see option
+``lgbm_parallel_predict_min_rows`` of :func:`.set_config`).
+"""
+
+import hashlib
+import logging
+import numbers
+import threading
+from abc import ABCMeta
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Generic, Hashable, Iterator, List, Optional, Tuple, Union
+
+import lightgbm
+import lightgbm.sklearn
+import numpy as np
+import pandas as pd
+from joblib import effective_n_jobs
+
+from pytools.api import AllTracker, inheritdoc
+
+from . import get_config
+from ._wrapper import T_DelegateLearner, T_Self, _LearnerWrapperDF
+
+log = logging.getLogger(__name__)
+
+__all__ = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+@inheritdoc(match="[see superclass]")
+class _LGBMWrapperDF(
+    _LearnerWrapperDF[T_DelegateLearner],
+    Generic[T_DelegateLearner],
+    metaclass=ABCMeta,
+):
+    """
+    Base class for wrappers around LightGBM learners.
+
+    If option ``lgbm_dataset_cache_size`` is set in the global configuration, the
+    binned LightGBM datasets constructed when fitting are cached, and re-used when
+    fitting to the same data again.
+    When fitting to a subset of rows of cached data, e.g., to a cross-validation
+    fold after fitting to the full data, the dataset is derived from the cached
+    dataset without binning the data again.
+
+    Unordered pandas categorical features are passed to LightGBM as categorical
+    features, unless arg ``categorical_feature`` is passed to :meth:`.fit`.
+    Imputers and ``"passthrough"`` columns of a :class:`.ColumnTransformerDF`
+    preserve categorical dtypes, so that categorical features do not need to be
+    one-hot encoded in preprocessing pipelines.
+
+    Predictions for fewer rows than set in option ``lgbm_parallel_predict_min_rows``
+    of the global configuration use a single thread; predictions for more rows use
+    ``n_jobs`` threads, or all cores if ``n_jobs`` is not set.
+    The number of threads is passed to LightGBM for each prediction, since the
+    thread count set for one prediction otherwise persists in the global OpenMP
+    state and applies to subsequent predictions of all LightGBM models in the
+    process.
+    Pass arg ``num_threads`` to override the number of threads for a prediction.
+    """
+
+    #: LightGBM parameter names for the number of threads.
+    NUM_THREADS_PARAMS = frozenset(
+        {"num_threads", "num_thread", "nthread", "nthreads", "n_jobs"}
+    )
+
+    # noinspection PyPep8Naming
+    def continue_fit(
+        self: T_Self,
+        X: pd.DataFrame,
+        y: Union[pd.Series, pd.DataFrame],
+        n_more_estimators: int,
+        **fit_params,
+    ) -> T_Self:
+        """
+        Continue training this fitted learner on new data, adding the given number of
+        boosting iterations to the existing model.
+
+        Uses the fitted booster as the initial model for LightGBM, so that only the
+        additional iterations need to be trained.
+        The new data must have the same features as the data this learner was fitted
+        to, in the same order; categorical features are aligned with the categories
+        seen in the original fit.
+        For classifiers, the new data must include all classes seen in the original
+        fit, and no other classes.
+
+        Parameter ``n_estimators`` is increased by ``n_more_estimators``, so that it
+        matches the number of boosting iterations of the fitted model.
+
+        :param X: input data, with the same features as the data this learner was
+            fitted to
+        :param y: target values
+        :param n_more_estimators: the number of boosting iterations to add
+        :param fit_params: additional fit parameters
+        :return: ``self``
+        """
+
+        # support type hinting in PyCharm
+        self: _LGBMWrapperDF[T_DelegateLearner]
+
+        self._ensure_fitted()
+        self._check_parameter_types(X, y)
+
+        if (
+            not isinstance(n_more_estimators, numbers.Integral)
+            or isinstance(n_more_estimators, bool)
+            or n_more_estimators < 1
+        ):
+            raise ValueError(
+                "arg n_more_estimators must be a positive integer, "
+                f"but got: {n_more_estimators!r}"
+            )
+        if "init_model" in fit_params:
+            raise ValueError(
+                "arg init_model is not supported; training continues from the "
+                "fitted model"
+            )
+
+        features_in = self.feature_names_in_
+        if not X.columns.equals(features_in):
+            raise ValueError(
+                "arg X must have the same columns as the data this learner was "
+                f"fitted to, in the same order: {', '.join(map(str, features_in))}; "
+                f"but got: {', '.join(map(str, X.columns))}"
+            )
+
+        native: T_DelegateLearner = self.native_estimator
+        booster: lightgbm.Booster = native.booster_
+
+        classes = getattr(native, "classes_", None)
+        if classes is not None:
+            y_classes = np.unique(np.asarray(y))
+            if not np.array_equal(y_classes, np.sort(classes)):
+                raise ValueError(
+                    "arg y must have the same classes as the target this learner "
+                    f"was fitted to ({', '.join(map(str, classes))}), "
+                    f"but got: {', '.join(map(str, y_classes))}"
+                )
+
+        X_fit = self._align_categories(
+            self._convert_X_for_delegate(X), booster.pandas_categorical
+        )
+
+        n_estimators: int = native.n_estimators
+        native.set_params(n_estimators=n_more_estimators)
+        try:
+            # fit without the dataset cache: a dataset for continued training is
+            # initialised with the predictions of the initial model, which requires
+            # the raw data
+            native.fit(
+                X_fit,
+                self._convert_y_for_delegate(y),
+                init_model=booster,
+                **fit_params,
+            )
+        except Exception as cause:
+            native.set_params(n_estimators=n_estimators)
+            raise self._make_verbose_exception(
+                self.continue_fit.__name__, cause
+            ) from cause
+
+        native.set_params(n_estimators=n_estimators + n_more_estimators)
+        return self
+
+    # noinspection PyPep8Naming
+    def predict(
+        self, X: pd.DataFrame, **predict_params
+    ) -> Union[pd.Series, pd.DataFrame]:
+        """[see superclass]"""
+        return super().predict(X, **self._with_num_threads(X, predict_params))
+
+    # noinspection PyPep8Naming
+    def _with_num_threads(
+        self, X: pd.DataFrame, predict_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        # add the number of threads for predicting the given data to the predict
+        # parameters, unless already set
+        if not self.NUM_THREADS_PARAMS.isdisjoint(predict_params):
+            return predict_params
+
+        if len(X) < get_config()["lgbm_parallel_predict_min_rows"]:
+            num_threads = 1
+        else:
+            # LightGBM uses all cores if n_jobs is not set
+            num_threads = effective_n_jobs(self.native_estimator.n_jobs or -1)
+
+        return {**predict_params, "num_threads": num_threads}
+
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _align_categories(
+        X: pd.DataFrame, pandas_categorical: Optional[List[List[Any]]]
+    ) -> pd.DataFrame:
+        # encode categorical features using the categories seen in the original
+        # fit, in the same way LightGBM does when predicting
+        categorical_columns = X.columns[X.dtypes == "category"]
+        n_categorical = len(pandas_categorical or [])
+        if len(categorical_columns) != n_categorical:
+            raise ValueError(
+                f"arg X has {len(categorical_columns)} categorical columns, but the "
+                f"data this learner was fitted to had {n_categorical}"
+            )
+        realign = {
+            column: pd.CategoricalDtype(categories, ordered=X[column].dtype.ordered)
+            for column, categories in zip(categorical_columns, pandas_categorical)
+            if list(X[column].cat.categories) != list(categories)
+        }
+        return X.astype(realign) if realign else X
+
+    # noinspection PyPep8Naming
+    def _fit(
+        self, X: pd.DataFrame, y: Optional[Union[pd.Series, pd.DataFrame]], **fit_params
+    ) -> T_DelegateLearner:
+        cache_size: int = get_config()["lgbm_dataset_cache_size"]
+        if cache_size == 0:
+            return super()._fit(X, y, **fit_params)
+
+        X_fit = self._convert_X_for_delegate(X)
+        with _dataset_cache.caching(data=X_fit, size=cache_size):
+            # noinspection PyUnresolvedReferences
+            return self.native_estimator.fit(
+                X_fit, self._convert_y_for_delegate(y), **fit_params
+            )
+
+
+class _CachedDataset:
+    # a binned LightGBM dataset, along with the hashes of its rows and its label;
+    # datasets are only added to the cache once a fit using them has succeeded, so
+    # all cached datasets have been constructed by LightGBM, and subsets can be
+    # derived from them
+
+    def __init__(
+        self, dataset: lightgbm.Dataset, row_hashes: np.ndarray, label: np.ndarray
+    ) -> None:
+        self.dataset = dataset
+        self.label = label
+        self.row_order = np.argsort(row_hashes, kind="mergesort")
+        self.row_hashes_sorted = row_hashes[self.row_order]
+        self.rows_unique = len(row_hashes) < 2 or bool(
+            (self.row_hashes_sorted[1:] != self.row_hashes_sorted[:-1]).all()
+        )
+
+    def get_rows(self, row_hashes: np.ndarray) -> Optional[np.ndarray]:
+        # get the positions of the rows with the given hashes in this dataset,
+        # or None if not all rows are in this dataset
+        if not self.rows_unique:
+            return None
+        positions = np.searchsorted(self.row_hashes_sorted, row_hashes)
+        positions[positions == len(self.row_hashes_sorted)] = 0
+        if not (self.row_hashes_sorted[positions] == row_hashes).all():
+            return None
+        return self.row_order[positions]
+
+
+class _DatasetCache:
+    # A least-recently-used cache of binned LightGBM datasets, keyed by the
+    # parameters relevant for binning, the columns and dtypes of the data, and
+    # hashes of the data and the label.
+    #
+    # While a fit is in the caching context, construction of the training dataset
+    # by the LightGBM scikit-learn API is intercepted and served from the cache:
+    # while any fit is in the caching context, the dataset type of the LightGBM
+    # scikit-learn API is replaced by _CachingDataset, which only serves the
+    # training dataset of the fit in the current thread from the cache, and
+    # constructs all other datasets as usual.
+    # The module-level lock guards the replacement of the dataset type and the
+    # cache entries; it is not held while training, so fits using the cache can
+    # run concurrently.
+
+    # LightGBM parameters of the scikit-learn API that do not affect the binning of
+    # the data; all other parameters are part of the cache key
+    TRAINING_PARAMS = frozenset(
+        {
+            "boosting_type",
+            "class_weight",
+            "colsample_bytree",
+            "importance_type",
+            "learning_rate",
+            "max_depth",
+            "metric",
+            "min_child_weight",
+            "min_split_gain",
+            "n_estimators",
+            "n_jobs",
+            "num_class",
+            "num_leaves",
+            "objective",
+            "reg_alpha",
+            "reg_lambda",
+            "silent",
+            "subsample",
+            "subsample_freq",
+            "verbose",
+        }
+    )
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[Hashable, _CachedDataset]" = OrderedDict()
+        self._local = threading.local()
+        self._n_active = 0
+        self._dataset_type: Optional[type] = None
+
+    def clear(self) -> None:
+        with _dataset_cache_lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @contextmanager
+    def caching(self, data: pd.DataFrame, size: int) -> Iterator[None]:
+        # intercept the construction of the training dataset for the given data
+        # in the current thread
+
+        with _dataset_cache_lock:
+            if self._n_active == 0:
+                self._dataset_type = lightgbm.sklearn.Dataset
+                lightgbm.sklearn.Dataset = _CachingDataset
+            self._n_active += 1
+
+        self._local.data = data
+        self._local.new_entry = None
+
+        try:
+            yield
+
+            # the fit succeeded: cache the dataset it constructed, if any
+            new_entry: Optional[Tuple[Hashable, _CachedDataset]]
+            new_entry = self._local.new_entry
+            if new_entry is not None:
+                key, entry = new_entry
+                with _dataset_cache_lock:
+                    self._entries[key] = entry
+                    while len(self._entries) > size:
+                        self._entries.popitem(last=False)
+        finally:
+            self._local.data = None
+            self._local.new_entry = None
+            with _dataset_cache_lock:
+                self._n_active -= 1
+                if self._n_active == 0:
+                    lightgbm.sklearn.Dataset = self._dataset_type
+                    self._dataset_type = None
+
+    def make_dataset(self, data: Any = None, *args, **kwargs) -> lightgbm.Dataset:
+        # make a LightGBM dataset, serving the training dataset of a fit in the
+        # caching context of the current thread from the cache
+        dataset_type = lightgbm.Dataset
+
+        if (
+            args
+            or data is not getattr(self._local, "data", None)
+            or not isinstance(data, pd.DataFrame)
+            or kwargs.get("reference", None) is not None
+            or any(
+                kwargs.get(arg, None) is not None
+                for arg in ("weight", "group", "init_score")
+            )
+        ):
+            # only cache the training data, without additional metadata
+            return dataset_type(data, *args, **kwargs)
+
+        # only intercept the first construction in this context
+        self._local.data = None
+
+        label = np.asarray(kwargs.get("label", None))
+        params: Dict[str, Any] = kwargs.get("params", None) or {}
+        key_base = (
+            self._params_key(params),
+            repr(kwargs.get("categorical_feature", "auto")),
+            tuple(data.columns),
+            tuple(str(dtype) for dtype in data.dtypes),
+        )
+        row_hashes: np.ndarray = pd.util.hash_pandas_object(data, index=True).values
+        key = (key_base, self._digest(row_hashes, label))
+
+        with _dataset_cache_lock:
+            cached = self._entries.get(key, None)
+            if cached is not None:
+                log.debug("re-using cached LightGBM dataset")
+                self._entries.move_to_end(key)
+                return cached.dataset
+            entries = [
+                entry
+                for (entry_key_base, _), entry in reversed(self._entries.items())
+                if entry_key_base == key_base
+            ]
+
+        # look for a cached dataset with a superset of the rows
+        dataset: Optional[lightgbm.Dataset] = None
+        # the order of the rows in the dataset, relative to the data
+        row_order: Optional[np.ndarray] = None
+        for entry in entries:
+            rows = entry.get_rows(row_hashes)
+            # the label may be encoded differently for the subset, e.g., if
+            # classes are missing
+            if rows is not None and np.array_equal(entry.label[rows], label):
+                log.debug("deriving LightGBM dataset from cached dataset")
+                dataset = entry.dataset.subset(rows, params=params)
+                # the rows of the subset are in the order of the cached dataset
+                row_order = np.argsort(rows, kind="mergesort")
+                break
+
+        if dataset is None:
+            dataset = dataset_type(data, **kwargs)
+
+        if row_order is not None:
+            row_hashes = row_hashes[row_order]
+            label = label[row_order]
+
+        # the dataset is cached once the fit has succeeded, see method caching
+        self._local.new_entry = (
+            key,
+            _CachedDataset(dataset=dataset, row_hashes=row_hashes, label=label),
+        )
+
+        return dataset
+
+    @classmethod
+    def _params_key(cls, params: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(
+            sorted(
+                (name, repr(value))
+                for name, value in params.items()
+                if name not in cls.TRAINING_PARAMS
+            )
+        )
+
+    @staticmethod
+    def _digest(row_hashes: np.ndarray, label: np.ndarray) -> str:
+        digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+        digest.update(pd.util.hash_array(label.ravel()).tobytes())
+        return digest.hexdigest()
+
+
+class _CachingDatasetMeta(type):
+    # all LightGBM datasets are instances of _CachingDataset, so that it can stand
+    # in for the LightGBM dataset type
+    def __instancecheck__(cls, instance: Any) -> bool:
+        return isinstance(instance, lightgbm.Dataset)
+
+
+class _CachingDataset(lightgbm.Dataset, metaclass=_CachingDatasetMeta):
+    # Stands in for the dataset type of the LightGBM scikit-learn API while fits
+    # use the dataset cache; constructing it returns a plain LightGBM dataset,
+    # served from the cache if it is the training dataset of a fit in the caching
+    # context of the current thread
+
+    def __new__(cls, *args, **kwargs) -> lightgbm.Dataset:
+        return _dataset_cache.make_dataset(*args, **kwargs)
+
+
+# guards the replacement of the LightGBM dataset type, and the cache entries
+_dataset_cache_lock = threading.Lock()
+
+_dataset_cache = _DatasetCache()
+
+
+__tracker.validate()
@@ -0,0 +1,300 @@
+"""
+Memory footprint of fitted estimators.
+"""
+
+import logging
+import mmap
+import sys
+import types
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator
+from sklearn.tree._tree import Tree
+
+from pytools.api import AllTracker
+
+log = logging.getLogger(__name__)
+
+__all__ = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class _MemoryUsage:
+    """
+    Walks an estimator and its child estimators, and determines the memory used by
+    each of them.
+
+    Each component of the estimator tree is reported as one row, named after the path
+    of step names or attribute names leading to the component.
+    DF wrappers are reported together with the native estimators they delegate to.
+    Estimators in unnamed collections, e.g., the trees of a random forest, and
+    unfitted estimators, e.g., templates for fitted clones, are reported as part of
+    the estimator holding them.
+    Each object is counted only once, even if it is shared by multiple components.
+    Arrays memory-mapped from files can be excluded, since their memory is backed by
+    the files and is shared among all processes mapping them.
+    """
+
+    #: Name of the path of the root component.
+    ROOT = ""
+
+    #: Separator of path elements, as used by scikit-learn for nested parameters.
+    SEPARATOR = "__"
+
+    #: Column with the type of the estimator of each component.
+    COL_ESTIMATOR = "estimator"
+
+    #: Column with the bytes held in numpy arrays and sparse matrices.
+    COL_ARRAYS = "arrays"
+
+    #: Column with the bytes held in pandas indices, series, and data frames.
+    COL_INDEXES = "indexes"
+
+    #: Column with the bytes held in all other Python objects.
+    COL_OTHER = "other"
+
+    #: Column with the total bytes of each component.
+    COL_TOTAL = "total"
+
+    #: Attribute of DF wrappers referencing the native delegate estimator.
+    ATTR_DELEGATE = "_delegate_estimator"
+
+    # indices of the memory categories
+    _ARRAYS, _INDEXES, _OTHER = range(3)
+
+    # types of shared objects that are not counted
+    _SHARED_TYPES = (
+        type,
+        types.ModuleType,
+        types.FunctionType,
+        types.BuiltinFunctionType,
+        types.MethodType,
+    )
+
+    def __init__(self, deep: bool, mapped: bool = True) -> None:
+        self.deep = deep
+        self.mapped = mapped
+        self._seen: Set[int] = set()
+        self._paths: Set[str] = set()
+        self._rows: List[Dict[str, Any]] = []
+
+    def add(self, path: str, estimator: BaseEstimator) -> None:
+        """
+        Add the given estimator and all its children as components.
+
+        :param path: the path of the estimator
+        :param estimator: the estimator
+        """
+        self._paths.add(path)
+        self._seen.add(id(estimator))
+
+        sizes = np.zeros(3, dtype=np.int64)
+        children: List[Tuple[str, BaseEstimator]] = []
+        self._add_object(estimator, sizes, children)
+
+        self._rows.append(
+            {
+                "component": path,
+                self.COL_ESTIMATOR: type(estimator).__name__,
+                self.COL_ARRAYS: sizes[self._ARRAYS],
+                self.COL_INDEXES: sizes[self._INDEXES],
+                self.COL_OTHER: sizes[self._OTHER],
+            }
+        )
+
+        for name, child in children:
+            self.add(self._make_path(path, name), child)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get the memory usage of all components added so far.
+
+        :return: a data frame indexed by component path
+        """
+        memory_usage = pd.DataFrame(
+            self._rows,
+            columns=[
+                "component",
+                self.COL_ESTIMATOR,
+                self.COL_ARRAYS,
+                self.COL_INDEXES,
+                self.COL_OTHER,
+            ],
+        ).set_index("component")
+        memory_usage[self.COL_TOTAL] = memory_usage.loc[
+            :, [self.COL_ARRAYS, self.COL_INDEXES, self.COL_OTHER]
+        ].sum(axis=1)
+        return memory_usage
+
+    def _make_path(self, parent: str, name: str) -> str:
+        path = name if parent == self.ROOT else parent + self.SEPARATOR + name
+        unique_path = path
+        i = 1
+        while unique_path in self._paths:
+            i += 1
+            unique_path = f"{path}~{i}"
+        return unique_path
+
+    def _add_object(
+        self,
+        obj: Any,
+        sizes: np.ndarray,
+        children: List[Tuple[str, BaseEstimator]],
+    ) -> None:
+        # add the object and all values of its attributes
+        sizes[self._OTHER] += sys.getsizeof(obj)
+
+        try:
+            attributes = vars(obj)
+        except TypeError:
+            # the object has no __dict__
+            return
+
+        sizes[self._OTHER] += sys.getsizeof(attributes)
+
+        # visit fitted attributes before parameters, and named estimators before
+        # unnamed ones, so that fitted estimators are reported under their names
+        for name, value in sorted(
+            attributes.items(),
+            key=lambda item: (
+                not item[0].endswith("_"),
+                isinstance(item[1], list) and not _is_named_list(item[1]),
+            ),
+        ):
+            if name == self.ATTR_DELEGATE:
+                # a DF wrapper is reported together with its delegate
+                if id(value) not in self._seen:
+                    self._seen.add(id(value))
+                    self._add_object(value, sizes, children)
+            else:
+                self._add_value(value, name.lstrip("_"), sizes, children)
+
+    def _add_value(
+        self,
+        value: Any,
+        name: Optional[str],
+        sizes: np.ndarray,
+        children: List[Tuple[str, BaseEstimator]],
+    ) -> None:
+        # add the given value, and the values it contains; named estimators are
+        # added as children, unnamed estimators as part of the current component
+
+        if id(value) in self._seen or isinstance(value, self._SHARED_TYPES):
+            return
+        self._seen.add(id(value))
+
+        deep = self.deep
+
+        if isinstance(value, BaseEstimator):
+            if name is None or not _is_fitted(value):
+                # unnamed estimators, and unfitted estimators serving as templates
+                # for fitted clones, are part of the current component
+                self._add_object(value, sizes, children)
+            else:
+                children.append((name, value))
+
+        elif isinstance(value, np.ndarray):
+            if self.mapped or not _is_memory_mapped(value):
+                sizes[self._ARRAYS] += value.nbytes
+            if deep and value.dtype == object:
+                for element in value.ravel():
+                    self._add_value(element, None, sizes, children)
+
+        elif sparse.issparse(value):
+            for array_name in ("data", "indices", "indptr", "row", "col", "offsets"):
+                array = getattr(value, array_name, None)
+                if isinstance(array, np.ndarray):
+                    sizes[self._ARRAYS] += array.nbytes
+
+        elif isinstance(value, pd.Index):
+            sizes[self._INDEXES] += value.memory_usage(deep=deep)
+
+        elif isinstance(value, pd.Series):
+            sizes[self._INDEXES] += value.memory_usage(index=True, deep=deep)
+
+        elif isinstance(value, pd.DataFrame):
+            sizes[self._INDEXES] += value.memory_usage(index=True, deep=deep).sum()
+
+        elif isinstance(value, Tree):
+            # the node arrays of the tree are held in native memory
+            sizes[self._OTHER] += sys.getsizeof(value)
+            for array in value.__getstate__().values():
+                if isinstance(array, np.ndarray):
+                    sizes[self._ARRAYS] += array.nbytes
+
+        elif isinstance(value, dict):
+            sizes[self._OTHER] += sys.getsizeof(value)
+            for key, element in value.items():
+                self._add_value(key, None, sizes, children)
+                self._add_value(
+                    element, key if isinstance(key, str) else None, sizes, children
+                )
+
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            sizes[self._OTHER] += sys.getsizeof(value)
+            if (
+                isinstance(value, tuple)
+                and len(value) > 1
+                and isinstance(value[0], str)
+            ):
+                # a (name, estimator, ...) tuple as used by pipelines
+                element_name = value[0]
+            else:
+                element_name = None
+            for element in value:
+                self._add_value(element, element_name, sizes, children)
+
+        elif hasattr(value, "__dict__"):
+            self._add_object(value, sizes, children)
+
+        else:
+            sizes[self._OTHER] += sys.getsizeof(value)
+
+
+#
+# Private helpers
+#
+
+
+def _is_fitted(estimator: BaseEstimator) -> bool:
+    # check whether the given DF estimator or native estimator is fitted, using the
+    # same heuristic as scikit-learn for native estimators
+    is_fitted = getattr(estimator, "is_fitted", None)
+    if isinstance(is_fitted, bool):
+        return is_fitted
+    return any(
+        name.endswith("_") and not name.startswith("__") for name in vars(estimator)
+    )
+
+
+def _is_memory_mapped(array: np.ndarray) -> bool:
+    # check whether the given array is a view of a memory-mapped file
+    base = array.base
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return isinstance(base, mmap.mmap)
+
+
+def _is_named_list(value: List[Any]) -> bool:
+    # check whether the list contains (name, estimator, ...) tuples
+    return any(
+        isinstance(element, tuple) and len(element) > 1 and isinstance(element[0], str)
+        for element in value
+    )
+
+
+__tracker.validate()
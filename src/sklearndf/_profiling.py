@@ -0,0 +1,278 @@
+"""
+Profiling of the steps of composite estimators, e.g., pipelines.
+"""
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+from abc import ABCMeta, abstractmethod
+from typing import Any, Dict, List, Optional, TextIO, Union
+
+import numpy as np
+import pandas as pd
+
+from pytools.api import AllTracker
+
+from ._sklearndf import EstimatorDF
+from ._timing import TimingEvent, record_timings
+
+log = logging.getLogger(__name__)
+
+__all__ = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class _StepProfiler:
+    """
+    Calls the steps of a composite estimator one by one, recording the time and
+    memory spent in each step along with the shapes, dtypes, and sizes of the inputs
+    and outputs.
+    """
+
+    #: Columns of the profile returned by :meth:`.to_frame`.
+    PROFILE_COLUMNS = [
+        "estimator",
+        "method",
+        "time",
+        "wrapper_time",
+        "wrapper_share",
+        "peak_memory",
+        "shape_in",
+        "shape_out",
+        "dtypes_in",
+        "dtypes_out",
+        "bytes_out",
+    ]
+
+    def __init__(self, trace_memory: bool) -> None:
+        if (
+            trace_memory
+            and tracemalloc.is_tracing()
+            and not hasattr(tracemalloc, "reset_peak")
+        ):
+            log.warning(
+                "cannot measure the peak memory of each step while tracemalloc is "
+                "tracing memory allocations already; requires Python 3.9 or later"
+            )
+            trace_memory = False
+
+        self.trace_memory = trace_memory
+        self._steps: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+
+    # noinspection PyPep8Naming
+    def run_step(
+        self, name: str, estimator: EstimatorDF, method: str, X: pd.DataFrame
+    ) -> Union[pd.DataFrame, pd.Series]:
+        """
+        Call the given method of an estimator and profile the call.
+
+        :param name: the name of the step
+        :param estimator: the estimator of the step
+        :param method: the name of the method to call, e.g., ``"transform"``
+        :param X: the input to the method
+        :return: the output of the method
+        """
+        trace_memory = self.trace_memory
+        memory_start = 0
+        started_tracing = False
+
+        if trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                memory_start, _ = tracemalloc.get_traced_memory()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+
+        with record_timings() as timings:
+            start = time.perf_counter()
+            try:
+                output = getattr(estimator, method)(X)
+            finally:
+                duration = time.perf_counter() - start
+                if trace_memory:
+                    _, memory_peak = tracemalloc.get_traced_memory()
+                    if started_tracing:
+                        tracemalloc.stop()
+
+        wrapper_time = sum(
+            event.duration
+            for event in timings.events
+            if event.phase not in (TimingEvent.PHASE_TOTAL, TimingEvent.PHASE_DELEGATE)
+        )
+
+        self._steps.append(
+            dict(
+                step=name,
+                estimator=type(estimator).__name__,
+                method=method,
+                start=start - self._start,
+                time=duration,
+                wrapper_time=wrapper_time,
+                wrapper_share=wrapper_time / duration if duration > 0 else np.nan,
+                peak_memory=memory_peak - memory_start if trace_memory else np.nan,
+                shape_in=X.shape,
+                shape_out=output.shape,
+                dtypes_in=_get_dtypes(X),
+                dtypes_out=_get_dtypes(output),
+                bytes_out=_get_bytes(output),
+            )
+        )
+
+        return output
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get the profile of all steps run so far.
+
+        :return: a data frame with one row per step, indexed by step name
+        """
+        return pd.DataFrame(
+            data=self._steps, columns=["step", *self.PROFILE_COLUMNS]
+        ).set_index("step")
+
+    def write_chrome_trace(self, trace: Union[str, os.PathLike, TextIO]) -> None:
+        """
+        Write the profile of all steps run so far as a timeline in the Chrome trace
+        event format, for viewing in ``chrome://tracing`` or Perfetto.
+
+        :param trace: the path of the file to write to, or a text stream
+        """
+
+        def _to_json(value: Any) -> Any:
+            if isinstance(value, (np.integer, np.floating)):
+                value = value.item()
+            if isinstance(value, float) and np.isnan(value):
+                return None
+            return value
+
+        trace_events = [
+            dict(
+                name=step["step"],
+                cat=step["estimator"],
+                ph="X",
+                ts=step["start"] * 1e6,
+                dur=step["time"] * 1e6,
+                pid=os.getpid(),
+                tid=0,
+                args={
+                    column: _to_json(step[column])
+                    for column in self.PROFILE_COLUMNS
+                    if column != "time"
+                },
+            )
+            for step in self._steps
+        ]
+        trace_json = dict(traceEvents=trace_events, displayTimeUnit="ms")
+
+        if isinstance(trace, (str, os.PathLike)):
+            with open(trace, "w") as f:
+                json.dump(trace_json, f)
+        else:
+            json.dump(trace_json, trace)
+
+
+class _StepProfilingMixin(metaclass=ABCMeta):
+    """
+    Adds method :meth:`.profile` to the wrapper of a composite estimator.
+    """
+
+    # noinspection PyPep8Naming
+    def profile(
+        self,
+        X: pd.DataFrame,
+        trace: Optional[Union[str, os.PathLike, TextIO]] = None,
+        trace_memory: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Run each step of this fitted estimator once for the given input, and profile
+        the time and memory spent in each step.
+
+        Steps are run one after the other, even if the estimator is configured to
+        run steps in parallel.
+
+        The resulting data frame is indexed by step name and has columns
+
+        - ``estimator``: the type of the step's estimator
+        - ``method``: the method called, e.g., ``"transform"`` or ``"predict"``
+        - ``time``: the wall time of the step in seconds
+        - ``wrapper_time``: the part of the wall time spent in the :mod:`sklearndf`
+          wrapper layer rather than in the native estimators (see
+          :func:`.add_timing_callback`)
+        - ``wrapper_share``: the ratio of ``wrapper_time`` to ``time``
+        - ``peak_memory``: the peak of the memory allocated during the step in
+          bytes, measured using :mod:`tracemalloc`
+        - ``shape_in``, ``shape_out``: the shapes of the step's input and output
+        - ``dtypes_in``, ``dtypes_out``: the number of columns per dtype of the
+          step's input and output
+        - ``bytes_out``: the memory used by the step's output in bytes
+
+        :param X: the input data frame
+        :param trace: optional path or text stream to write a timeline of the steps
+            to, in the Chrome trace event format (for viewing in ``chrome://tracing``
+            or Perfetto)
+        :param trace_memory: if ``True``, measure the peak memory of each step;
+            tracing memory allocations slows down steps allocating many Python
+            objects, so set to ``False`` for more accurate timings
+        :return: the profile of the steps
+        """
+        # noinspection PyUnresolvedReferences
+        self._ensure_fitted()
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("arg X must be a DataFrame")
+
+        profiler = _StepProfiler(trace_memory=trace_memory)
+        self._profile_steps(profiler, X)
+
+        if trace is not None:
+            profiler.write_chrome_trace(trace)
+
+        return profiler.to_frame()
+
+    # noinspection PyPep8Naming
+    @abstractmethod
+    def _profile_steps(self, profiler: _StepProfiler, X: pd.DataFrame) -> None:
+        # run all steps of this estimator using the given profiler
+        pass
+
+
+#
+# Private helpers
+#
+
+
+def _get_dtypes(data: Union[pd.DataFrame, pd.Series, np.ndarray]) -> str:
+    # summarize the dtypes of the given data as the number of columns per dtype
+    if isinstance(data, pd.DataFrame):
+        dtype_counts = data.dtypes.astype(str).value_counts(sort=False)
+        return ", ".join(f"{dtype}: {count}" for dtype, count in dtype_counts.items())
+    else:
+        n_columns = data.shape[1] if data.ndim > 1 else 1
+        return f"{data.dtype}: {n_columns}"
+
+
+def _get_bytes(data: Union[pd.DataFrame, pd.Series, np.ndarray]) -> int:
+    # get the memory used by the given data, including the contents of objects
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True).sum())
+    elif isinstance(data, pd.Series):
+        return int(data.memory_usage(deep=True))
+    else:
+        return int(data.nbytes)
+
+
+__tracker.validate()
@@ -0,0 +1,262 @@
+"""
+Registry of fitted estimators stored as model files, for serving many models.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Generic, List, NamedTuple, Optional, Type, TypeVar, Union
+
+from pytools.api import AllTracker
+
+from ._memory import _MemoryUsage
+from ._sklearndf import EstimatorDF
+
+log = logging.getLogger(__name__)
+
+__all__ = ["ModelRegistry"]
+
+#
+# type variables
+#
+
+T_EstimatorDF = TypeVar("T_EstimatorDF", bound=EstimatorDF)
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class ModelRegistry(Generic[T_EstimatorDF]):
+    """
+    A registry of fitted estimators saved as model files (see
+    :meth:`.EstimatorDF.save`), loading each estimator when it is first requested
+    and keeping the loaded estimators in memory up to a memory budget.
+
+    When loading an estimator takes the memory used by all loaded estimators beyond
+    the budget, the least recently requested estimators are evicted from the
+    registry until the remaining estimators fit the budget again.
+    The memory used by an estimator is determined by
+    :meth:`.EstimatorDF.memory_usage`, except for arrays memory-mapped from the
+    model file (see arg ``mmap_mode``): these are backed by the model file and
+    shared with all processes mapping it, and do not count against the budget.
+
+    Estimators are loaded using :meth:`.EstimatorDF.load`, which computes their
+    lazily cached attributes, so that the first request for a newly loaded
+    estimator is as fast as subsequent requests.
+
+    Models are registered by name, either explicitly using :meth:`.register`, or
+    implicitly as files in a model directory, named after the model with suffix
+    :attr:`.MODEL_SUFFIX`.
+
+    The registry can be used by multiple threads; requests for loaded estimators
+    are not blocked while other estimators are being loaded.
+
+    Attributes :attr:`.n_hits` and :attr:`.n_misses` count the requests for loaded
+    and for unloaded estimators, respectively, and :attr:`.n_evictions` counts the
+    estimators evicted to stay within the memory budget.
+    """
+
+    #: Suffix of the model files in the model directory.
+    MODEL_SUFFIX = ".sklearndf"
+
+    def __init__(
+        self,
+        max_memory: int,
+        *,
+        directory: Union[str, os.PathLike, None] = None,
+        mmap_mode: Optional[str] = None,
+        estimator_type: Type[T_EstimatorDF] = EstimatorDF,
+    ) -> None:
+        """
+        :param max_memory: the maximum memory used by all loaded estimators, in bytes
+        :param directory: the directory with model files of models not registered
+            explicitly (optional)
+        :param mmap_mode: the memory mapping mode for loading estimators (see
+            :meth:`.EstimatorDF.load`)
+        :param estimator_type: the type of the estimators in the registry; loading
+            an estimator of any other type raises a :class:`TypeError` (default:
+            :class:`.EstimatorDF`)
+        """
+        if max_memory <= 0:
+            raise ValueError(f"arg max_memory must be positive but is {max_memory}")
+
+        self.max_memory = max_memory
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self.estimator_type = estimator_type
+
+        self._paths: Dict[str, Union[str, os.PathLike]] = {}
+        # the loaded estimators and their memory usage, from least to most recently
+        # requested
+        self._loaded: "OrderedDict[str, _LoadedModel]" = OrderedDict()
+        self._memory_usage = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_evictions = 0
+
+    @property
+    def loaded(self) -> List[str]:
+        """
+        The names of the loaded models, from least to most recently requested.
+        """
+        with self._lock:
+            return list(self._loaded)
+
+    @property
+    def memory_usage(self) -> int:
+        """
+        The memory used by all loaded estimators, in bytes.
+        """
+        return self._memory_usage
+
+    def register(self, name: str, path: Union[str, os.PathLike]) -> None:
+        """
+        Register a model file under the given name.
+
+        If an estimator is already loaded under this name, it is evicted.
+
+        :param name: the name of the model
+        :param path: the path of the model file
+        """
+        with self._lock:
+            self._paths[name] = path
+            self._evict(name)
+
+    def get(self, name: str) -> T_EstimatorDF:
+        """
+        Get the estimator of the given model, loading it if it is not loaded.
+
+        :param name: the name of the model
+        :return: the estimator
+        :raise KeyError: no model is registered under the given name, and the
+            registry has no model directory
+        :raise FileNotFoundError: the model file does not exist
+        """
+        with self._lock:
+            loaded = self._get_loaded(name)
+            if loaded is not None:
+                self.n_hits += 1
+                return loaded
+            path = self._get_path(name)
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # the estimator may have been loaded by another thread in the meantime
+                loaded = self._get_loaded(name)
+                if loaded is not None:
+                    self.n_hits += 1
+                    return loaded
+                self.n_misses += 1
+
+            try:
+                estimator: T_EstimatorDF = self.estimator_type.load(
+                    path, mmap_mode=self.mmap_mode
+                )
+                memory_usage = self._get_memory_usage(estimator)
+
+                with self._lock:
+                    # a model file registered under the same name while loading
+                    # replaces the loaded estimator, which is therefore not kept
+                    if self._get_path(name) == path:
+                        self._loaded[name] = _LoadedModel(estimator, memory_usage)
+                        self._memory_usage += memory_usage
+                        self._evict_least_recent(keep=name)
+            finally:
+                with self._lock:
+                    self._load_locks.pop(name, None)
+
+        return estimator
+
+    def __getitem__(self, name: str) -> T_EstimatorDF:
+        return self.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        try:
+            path = self._get_path(name)
+        except KeyError:
+            return False
+        return name in self._paths or os.path.exists(path)
+
+    def evict(self, name: str) -> None:
+        """
+        Evict the estimator of the given model, if it is loaded.
+
+        :param name: the name of the model
+        """
+        with self._lock:
+            self._evict(name)
+
+    def clear(self) -> None:
+        """
+        Evict all loaded estimators.
+        """
+        with self._lock:
+            for name in list(self._loaded):
+                self._evict(name)
+
+    def _get_loaded(self, name: str) -> Optional[T_EstimatorDF]:
+        # get the loaded estimator and mark it as the most recently requested,
+        # or return None if it is not loaded
+        loaded = self._loaded.get(name)
+        if loaded is None:
+            return None
+        self._loaded.move_to_end(name)
+        return loaded.estimator
+
+    def _get_path(self, name: str) -> Union[str, os.PathLike]:
+        path = self._paths.get(name)
+        if path is not None:
+            return path
+        elif self.directory is not None:
+            return os.path.join(self.directory, name + self.MODEL_SUFFIX)
+        else:
+            raise KeyError(f"no model registered under name {name!r}")
+
+    @staticmethod
+    def _get_memory_usage(estimator: EstimatorDF) -> int:
+        # get the memory used by the estimator, excluding memory-mapped arrays
+        memory_usage = _MemoryUsage(deep=True, mapped=False)
+        memory_usage.add(_MemoryUsage.ROOT, estimator)
+        return int(memory_usage.to_frame()[_MemoryUsage.COL_TOTAL].sum())
+
+    def _evict(self, name: str) -> None:
+        loaded = self._loaded.pop(name, None)
+        if loaded is not None:
+            self._memory_usage -= loaded.memory_usage
+
+    def _evict_least_recent(self, keep: str) -> None:
+        # evict the least recently requested estimators until all loaded estimators
+        # fit the memory budget; the given, most recently requested estimator is
+        # kept even if it exceeds the budget on its own
+        while self._memory_usage > self.max_memory and len(self._loaded) > 1:
+            self._evict(next(iter(self._loaded)))
+            self.n_evictions += 1
+
+        if self._memory_usage > self.max_memory:
+            log.warning(
+                f"model {keep!r} uses {self._memory_usage:,} bytes, exceeding "
+                f"the memory budget of {self.max_memory:,} bytes"
+            )
+
+
+class _LoadedModel(NamedTuple):
+    # a loaded estimator, and the memory it uses
+    estimator: EstimatorDF
+    memory_usage: int
+
+
+__tracker.validate()
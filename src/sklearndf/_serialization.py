@@ -0,0 +1,315 @@
+"""
+Saving and loading of estimators, with large arrays stored outside of the pickle
+stream so that they can be memory-mapped.
+
+A model file consists of
+
+- a fixed preamble with a magic number, the format version and the length of the
+  metadata,
+- the metadata as JSON, describing the estimator and the layout of the file,
+- the pickled estimator, where all large numpy arrays are replaced by references
+  to array blocks,
+- the array blocks, each aligned to 64 bytes.
+"""
+
+import io
+import json
+import logging
+import mmap
+import os
+import pickle
+import platform
+import struct
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import sklearn
+
+from pytools.api import AllTracker
+
+from ._memory import _MemoryUsage
+from ._version import __version__
+
+log = logging.getLogger(__name__)
+
+__all__ = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class _ModelFile:
+    """
+    Reads and writes model files.
+    """
+
+    #: Magic number at the start of each model file.
+    MAGIC = b"SKLEARNDF"
+
+    #: Version of the file format.
+    FORMAT_VERSION = 1
+
+    #: Alignment of the pickle stream and of all array blocks, in bytes.
+    ALIGNMENT = 64
+
+    #: Minimum size of arrays stored as array blocks, in bytes; smaller arrays are
+    #: stored in the pickle stream.
+    MIN_BLOCK_SIZE = 1024
+
+    #: Pickle protocol of the pickled estimator; protocol 4 is the highest protocol
+    #: supported by all Python versions supported by sklearndf.
+    PICKLE_PROTOCOL = 4
+
+    #: Supported values of arg ``mmap_mode``.
+    MMAP_MODES = {"r": mmap.ACCESS_READ, "c": mmap.ACCESS_COPY}
+
+    # format of the preamble: magic number, format version, metadata length
+    _PREAMBLE = struct.Struct(f"<{len(MAGIC)}sIQ")
+
+    @staticmethod
+    def save(estimator: Any, path: Union[str, os.PathLike]) -> None:
+        """
+        Save the given estimator to a model file.
+
+        :param estimator: the estimator to save
+        :param path: the path of the model file
+        """
+        stream = io.BytesIO()
+        pickler = _ArrayBlockPickler(stream)
+        pickler.dump(estimator)
+        pickled = stream.getbuffer()
+        blocks = pickler.blocks
+
+        align = _ModelFile._align
+
+        # offsets are relative to the end of the metadata, aligned
+        offset = align(len(pickled))
+        block_layout: List[Tuple[int, int]] = []
+        for block in blocks:
+            block_layout.append((offset, block.nbytes))
+            offset = align(offset + block.nbytes)
+
+        memory_usage = _MemoryUsage(deep=False)
+        memory_usage.add(_MemoryUsage.ROOT, estimator)
+        components = memory_usage.to_frame()
+
+        estimator_type = type(estimator)
+        estimator_type_name = (
+            f"{estimator_type.__module__}.{estimator_type.__qualname__}"
+        )
+        metadata = dict(
+            sklearndf_version=__version__,
+            sklearn_version=sklearn.__version__,
+            python_version=platform.python_version(),
+            estimator_type=estimator_type_name,
+            is_fitted=bool(getattr(estimator, "is_fitted", False)),
+            components=[
+                [component, component_type]
+                for component, component_type in components[
+                    _MemoryUsage.COL_ESTIMATOR
+                ].items()
+            ],
+            memory_usage=int(components[_MemoryUsage.COL_TOTAL].sum()),
+            pickle_protocol=_ModelFile.PICKLE_PROTOCOL,
+            pickle=[0, len(pickled)],
+            blocks=block_layout,
+        )
+        metadata_bytes = json.dumps(metadata).encode("utf-8")
+
+        with open(path, "wb") as f:
+            f.write(
+                _ModelFile._PREAMBLE.pack(
+                    _ModelFile.MAGIC, _ModelFile.FORMAT_VERSION, len(metadata_bytes)
+                )
+            )
+            f.write(metadata_bytes)
+            _ModelFile._pad(f)
+            data_start = f.tell()
+            f.write(pickled)
+            for (block_offset, _), block in zip(block_layout, blocks):
+                _ModelFile._pad(f, data_start + block_offset)
+                f.write(block.data)
+
+    @staticmethod
+    def load(path: Union[str, os.PathLike], mmap_mode: Optional[str] = None) -> Any:
+        """
+        Load an estimator from a model file.
+
+        :param path: the path of the model file
+        :param mmap_mode: if ``"r"`` or ``"c"``, memory-map the array blocks of the
+            file read-only or copy-on-write, respectively; if ``None``, read the
+            array blocks into memory
+        :return: the estimator
+        """
+        if mmap_mode is not None and mmap_mode not in _ModelFile.MMAP_MODES:
+            raise ValueError(
+                f"arg mmap_mode must be one of "
+                f"{', '.join(map(repr, _ModelFile.MMAP_MODES))} or None, "
+                f"but got: {mmap_mode!r}"
+            )
+
+        with open(path, "rb") as f:
+            metadata, data_start = _ModelFile._read_metadata(f, path)
+
+            if mmap_mode is None:
+                f.seek(0, os.SEEK_END)
+                data = bytearray(f.tell() - data_start)
+                f.seek(data_start)
+                f.readinto(data)
+                data_offset = 0
+            else:
+                data = mmap.mmap(f.fileno(), 0, access=_ModelFile.MMAP_MODES[mmap_mode])
+                data_offset = data_start
+
+        if metadata["sklearn_version"] != sklearn.__version__:
+            log.warning(
+                f"loading a model saved with scikit-learn "
+                f"{metadata['sklearn_version']} using scikit-learn "
+                f"{sklearn.__version__}"
+            )
+
+        pickle_offset, pickle_size = metadata["pickle"]
+        pickle_start = data_offset + pickle_offset
+        unpickler = _ArrayBlockUnpickler(
+            io.BytesIO(memoryview(data)[pickle_start : pickle_start + pickle_size]),
+            data=data,
+            blocks=[
+                (data_offset + block_offset, block_size)
+                for block_offset, block_size in metadata["blocks"]
+            ],
+        )
+        return unpickler.load()
+
+    @staticmethod
+    def read_metadata(path: Union[str, os.PathLike]) -> Dict[str, Any]:
+        """
+        Read the metadata of a model file, without loading the estimator.
+
+        :param path: the path of the model file
+        :return: the metadata
+        """
+        with open(path, "rb") as f:
+            metadata, _ = _ModelFile._read_metadata(f, path)
+        return metadata
+
+    @staticmethod
+    def _read_metadata(
+        f: io.BufferedReader, path: Union[str, os.PathLike]
+    ) -> Tuple[Dict[str, Any], int]:
+        # read the metadata, and return it along with the position of the data
+        preamble = f.read(_ModelFile._PREAMBLE.size)
+        if len(preamble) == _ModelFile._PREAMBLE.size:
+            magic, format_version, metadata_size = _ModelFile._PREAMBLE.unpack(preamble)
+        else:
+            magic = format_version = metadata_size = None
+
+        if magic != _ModelFile.MAGIC:
+            raise ValueError(f"not an sklearndf model file: {path}")
+        if format_version > _ModelFile.FORMAT_VERSION:
+            raise ValueError(
+                f"model file {path} has format version {format_version}, "
+                f"but this version of sklearndf supports up to version "
+                f"{_ModelFile.FORMAT_VERSION}"
+            )
+
+        metadata = json.loads(f.read(metadata_size).decode("utf-8"))
+        return metadata, _ModelFile._align(_ModelFile._PREAMBLE.size + metadata_size)
+
+    @staticmethod
+    def _align(offset: int) -> int:
+        alignment = _ModelFile.ALIGNMENT
+        return (offset + alignment - 1) // alignment * alignment
+
+    @staticmethod
+    def _pad(f: io.BufferedWriter, position: Optional[int] = None) -> None:
+        # pad the file with zeros up to the given position, or up to the alignment
+        current = f.tell()
+        if position is None:
+            position = _ModelFile._align(current)
+        f.write(b"\0" * (position - current))
+
+
+class _ArrayBlockPickler(pickle.Pickler):
+    """
+    Pickler replacing large numpy arrays with references to array blocks.
+    """
+
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file, protocol=_ModelFile.PICKLE_PROTOCOL)
+        #: The C-contiguous arrays to be stored as array blocks.
+        self.blocks: List[np.ndarray] = []
+        # persistent ids of the arrays stored so far, by object id; arrays referenced
+        # more than once are stored only once, and are restored as a single array
+        self._persistent_ids: Dict[int, Tuple[Any, ...]] = {}
+        # the arrays stored so far, kept alive so that their object ids are not reused
+        self._arrays: List[np.ndarray] = []
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[Any, ...]]:
+        """[see superclass]"""
+        if (
+            type(obj) is not np.ndarray
+            or obj.dtype.hasobject
+            or obj.nbytes < _ModelFile.MIN_BLOCK_SIZE
+        ):
+            return None
+
+        persistent_id = self._persistent_ids.get(id(obj))
+        if persistent_id is not None:
+            return persistent_id
+
+        # fortran-ordered arrays are stored transposed, without copying them
+        fortran = not obj.flags.c_contiguous and obj.flags.f_contiguous
+        block = obj.T if fortran else np.ascontiguousarray(obj)
+
+        persistent_id = ("ndarray", len(self.blocks), block.dtype, block.shape, fortran)
+        self.blocks.append(block)
+        self._arrays.append(obj)
+        self._persistent_ids[id(obj)] = persistent_id
+        return persistent_id
+
+
+class _ArrayBlockUnpickler(pickle.Unpickler):
+    """
+    Unpickler restoring numpy arrays from array blocks.
+    """
+
+    def __init__(
+        self,
+        file: io.BytesIO,
+        data: Union[bytearray, mmap.mmap],
+        blocks: List[Tuple[int, int]],
+    ) -> None:
+        super().__init__(file)
+        self._data = data
+        self._blocks = blocks
+        self._arrays: Dict[int, np.ndarray] = {}
+
+    def persistent_load(self, pid: Tuple[Any, ...]) -> np.ndarray:
+        """[see superclass]"""
+        kind, block_id, dtype, shape, fortran = pid
+        if kind != "ndarray":
+            raise pickle.UnpicklingError(f"unsupported persistent id: {kind}")
+
+        array = self._arrays.get(block_id)
+        if array is None:
+            offset, size = self._blocks[block_id]
+            array = np.frombuffer(
+                self._data, dtype=dtype, count=size // dtype.itemsize, offset=offset
+            ).reshape(shape)
+            if fortran:
+                array = array.T
+            self._arrays[block_id] = array
+
+        return array
+
+
+__tracker.validate()
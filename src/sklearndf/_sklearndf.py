@@ -2,7 +2,9 @@
 Core implementation of :mod:`sklearndf`
 """
 
+import copy
 import logging
+import os
 from abc import ABCMeta, abstractmethod
 from typing import Any, List, Mapping, Optional, Sequence, Type, TypeVar, Union, cast
 
@@ -18,6 +20,10 @@ from sklearn.base import (
 from pytools.api import AllTracker
 from pytools.fit import FittableMixin
 
+from ._memory import _MemoryUsage
+from ._serialization import _ModelFile
+from ._timing import _instrument
+
 log = logging.getLogger(__name__)
 
 __all__ = ["EstimatorDF", "LearnerDF", "ClassifierDF", "RegressorDF", "TransformerDF"]
@@ -56,6 +62,12 @@ class EstimatorDF(FittableMixin[pd.DataFrame], metaclass=ABCMeta):
     #: :meth:`~.TransformerDF.feature_names_original_`.
     COL_FEATURE_IN = "feature_in"
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # time the public methods and wrapper phases of all DF estimators
+        # (see :func:`.add_timing_callback`)
+        _instrument(cls)
+
     def __new__(cls: Type["EstimatorDF"], *args, **kwargs) -> object:
         # make sure this DF estimator also is a subclass of
         if not issubclass(cls, BaseEstimator):
@@ -147,6 +159,146 @@ class EstimatorDF(FittableMixin[pd.DataFrame], metaclass=ABCMeta):
         """
         return clone(self)
 
+    def memory_usage(self, deep: bool = True) -> pd.DataFrame:
+        """
+        Get the memory used by this estimator and by each of its child estimators.
+
+        Child estimators include the steps of pipelines, the transformers of feature
+        unions and column transformers, and the estimators of meta-estimators,
+        reported under their step names or attribute names, joined by ``"__"``
+        (this estimator itself is reported under an empty name).
+        Estimators in unnamed collections, e.g., the trees of a random forest, and
+        unfitted estimators, e.g., templates for fitted clones, are reported as part
+        of the estimator holding them.
+
+        The resulting data frame has one row per component, and columns
+
+        - ``estimator``: the type of the component's estimator
+        - ``arrays``: bytes held in numpy arrays and sparse matrices, including the
+          node arrays of decision trees
+        - ``indexes``: bytes held in pandas indices and series, e.g., the cached
+          feature names of DF estimators
+        - ``other``: bytes held in all other Python objects, including the
+          estimator objects themselves
+        - ``total``: the sum of the above
+
+        Memory allocated by native libraries outside of Python objects and numpy
+        arrays, e.g., for LightGBM boosters, is not included.
+
+        :param deep: if ``True``, include the memory used by the elements of numpy
+            arrays and pandas objects with dtype ``object``, as in
+            :meth:`pandas.DataFrame.memory_usage`
+        :return: the memory used per component, in bytes
+        """
+        memory_usage = _MemoryUsage(deep=deep)
+        memory_usage.add(_MemoryUsage.ROOT, self)
+        return memory_usage.to_frame()
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Save this estimator to a model file.
+
+        The model file holds metadata describing the estimator, its pickled
+        structure, and the contents of all large numpy arrays, e.g., coefficients
+        and the node arrays of decision trees, as separate blocks which can be
+        memory-mapped when loading the estimator.
+
+        Lazily cached attributes of the estimator and of its child estimators, e.g.,
+        the original feature names of transformers, or the compiled trees of tree
+        ensembles if option ``compile_tree_ensembles`` is set (see
+        :func:`.set_config`), are computed on a copy of the estimator before saving
+        it, so that their arrays can be memory-mapped as well; the estimator itself
+        is not modified.
+
+        The metadata can be read without loading the estimator, using
+        :meth:`.read_metadata`.
+
+        :param path: the path of the model file
+        """
+        estimator = copy.deepcopy(self)
+        _warm_up_all(estimator)
+        _ModelFile.save(estimator, path)
+
+    @classmethod
+    def load(
+        cls: Type[T_EstimatorDF],
+        path: Union[str, os.PathLike],
+        mmap_mode: Optional[str] = None,
+    ) -> T_EstimatorDF:
+        """
+        Load an estimator from a model file written by :meth:`.save`.
+
+        With memory mapping, the arrays of the estimator are backed by the model
+        file instead of being read into memory: only the parts of the arrays that
+        are accessed are read, and the operating system shares them among all
+        processes mapping the same file.
+        Memory-mapped arrays are read-only in mode ``"r"``; in mode ``"c"``, changes
+        to the arrays are kept in memory and are not written to the file.
+
+        To share a model among the worker processes of a server, load it with
+        ``mmap_mode="r"``, either in each worker or in the parent process before
+        forking the workers: the memory used by the memory-mapped arrays of the model
+        then does not grow with the number of workers.
+        Lazily cached attributes are computed when loading the estimator, rather than
+        in each worker on first use.
+        When loading models in the parent process, call :func:`gc.freeze` after
+        loading them, so that garbage collection in the workers does not touch, and
+        thereby copy, the memory pages holding the remaining Python objects of the
+        models.
+        Arrays with Python objects, e.g., string categories of encoders, and the
+        node arrays of scikit-learn decision trees, which scikit-learn copies when
+        unpickling them, are not memory-mapped.
+        Hence, tree models loaded in each worker use memory for their node arrays in
+        every worker; the compiled trees of tree ensembles are memory-mapped in
+        addition to, not instead of, the node arrays of the native trees.
+
+        As model files include pickled Python objects, only load model files from
+        trusted sources.
+
+        :param path: the path of the model file
+        :param mmap_mode: ``"r"`` or ``"c"`` to memory-map the arrays of the
+            estimator read-only or copy-on-write, respectively; ``None`` to read
+            them into memory (default: ``None``)
+        :return: the estimator
+        :raise TypeError: the model file holds an estimator that is not an instance
+            of this class
+        """
+        estimator = _ModelFile.load(path, mmap_mode=mmap_mode)
+        if not isinstance(estimator, cls):
+            raise TypeError(
+                f"expected model file {path} to hold an instance of "
+                f"{cls.__name__} but got a {type(estimator).__name__}"
+            )
+        _warm_up_all(estimator)
+        return estimator
+
+    @staticmethod
+    def read_metadata(path: Union[str, os.PathLike]) -> Mapping[str, Any]:
+        """
+        Read the metadata of a model file written by :meth:`.save`, without loading
+        the estimator.
+
+        The metadata includes
+
+        - ``estimator_type``: the fully qualified name of the estimator's class
+        - ``is_fitted``: whether the estimator is fitted
+        - ``components``: the path and the type of each component of the estimator,
+          as reported by :meth:`.memory_usage`
+        - ``memory_usage``: the total memory used by the estimator, in bytes, as
+          reported by :meth:`.memory_usage` with ``deep=False``
+        - ``sklearndf_version``, ``sklearn_version``, ``python_version``: the
+          versions used to save the estimator
+
+        :param path: the path of the model file
+        :return: the metadata
+        """
+        return _ModelFile.read_metadata(path)
+
+    def _warm_up(self) -> None:
+        # compute the lazily cached attributes of this estimator, if fitted;
+        # see function _warm_up_all
+        pass
+
     @abstractmethod
     def _get_features_in(self) -> pd.Index:
         # get the input columns as a pandas Index
@@ -256,6 +408,16 @@ class TransformerDF(EstimatorDF, TransformerMixin, metaclass=ABCMeta):
             )
         return self._features_original
 
+    def _warm_up(self) -> None:
+        super()._warm_up()
+        if self.is_fitted:
+            try:
+                # noinspection PyStatementEffect
+                self.feature_names_original_
+            except NotImplementedError:
+                # the transformer does not map output features to input features
+                pass
+
     @property
     def feature_names_out_(self) -> pd.Index:
         """
@@ -267,7 +429,9 @@ class TransformerDF(EstimatorDF, TransformerMixin, metaclass=ABCMeta):
 
     # noinspection PyPep8Naming
     @abstractmethod
-    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+    def transform(
+        self, X: pd.DataFrame, columns: Optional[Sequence[Any]] = None
+    ) -> pd.DataFrame:
         """
         Transform the given inputs.
 
@@ -276,8 +440,20 @@ class TransformerDF(EstimatorDF, TransformerMixin, metaclass=ABCMeta):
         The features can be provided in any order since they are identified by their
         column names.
 
+        If only some of the output features are needed, these can be requested
+        using arg ``columns``.
+        Transformers that can compute output features independently of each other
+        compute only the requested output features, e.g., scalers, one-hot encoders,
+        or missing indicators; all other transformers compute all output features,
+        and return the requested ones.
+
         :param X: input data frame with observations as rows and features as columns
+        :param columns: the names of the output features to return, in the order in
+            which they are to be returned (optional; defaults to all output features,
+            see :attr:`.feature_names_out_`)
         :return: the transformed inputs
+        :raises KeyError: if any of the requested columns is not an output feature of
+            this transformer
         """
         pass
 
@@ -312,6 +488,18 @@ class TransformerDF(EstimatorDF, TransformerMixin, metaclass=ABCMeta):
         """
         pass
 
+    def _validate_columns_out(self, columns: Sequence[Any]) -> pd.Index:
+        # validate the output features requested for a transform, and return them as
+        # a named index
+        features_out = self.feature_names_out_
+        columns = pd.Index(columns)
+        unknown = ~columns.isin(features_out)
+        if unknown.any():
+            raise KeyError(
+                f"unknown output features requested: {columns[unknown].tolist()}"
+            )
+        return columns.rename(self.COL_FEATURE_OUT)
+
     @abstractmethod
     def _get_features_original(self) -> pd.Series:
         # return a mapping from this transformer's output columns to the original
@@ -417,4 +605,37 @@ class ClassifierDF(LearnerDF, ClassifierMixin, metaclass=ABCMeta):
         """
 
 
+#
+# Private helpers
+#
+
+
+def _warm_up_all(estimator: EstimatorDF) -> None:
+    # compute the lazily cached attributes of the given estimator and of all DF
+    # estimators it contains, ahead of their first use; this includes their cached
+    # attributes when saving an estimator, and computes them only once when loading
+    # an estimator to be shared by forked processes
+
+    visited = set()
+
+    def _visit(value: Any) -> None:
+        if id(value) in visited:
+            return
+        visited.add(id(value))
+
+        if isinstance(value, BaseEstimator):
+            for attribute in vars(value).values():
+                _visit(attribute)
+            if isinstance(value, EstimatorDF):
+                value._warm_up()
+        elif isinstance(value, (list, tuple)):
+            for element in value:
+                _visit(element)
+        elif isinstance(value, dict):
+            for element in value.values():
+                _visit(element)
+
+    _visit(estimator)
+
+
 __tracker.validate()
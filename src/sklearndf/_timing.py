@@ -0,0 +1,316 @@
+"""
+Timing of the methods of :mod:`sklearndf` estimators.
+
+Callbacks registered with :func:`add_timing_callback` are notified of the wall time
+spent in each call of a public estimator method, e.g., ``fit``, ``transform``, or
+``predict``, and in each of the phases of such a call spent in the wrapper layer of
+:mod:`sklearndf`, e.g., validating and converting the input or converting the
+output of the native estimator to a data frame.
+
+While no callbacks are registered, estimator methods are not timed.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional
+
+import pandas as pd
+
+from pytools.api import AllTracker
+
+log = logging.getLogger(__name__)
+
+__all__ = [
+    "TimingEvent",
+    "TimingRecorder",
+    "add_timing_callback",
+    "remove_timing_callback",
+    "record_timings",
+]
+
+
+#
+# registered callbacks, and timing state of the current thread
+#
+
+_callbacks: List[Callable[["TimingEvent"], None]] = []
+
+_local = threading.local()
+
+#: Public estimator methods that are timed.
+_TIMED_METHODS = frozenset(
+    {
+        "fit",
+        "fit_transform",
+        "transform",
+        "inverse_transform",
+        "predict",
+        "fit_predict",
+        "predict_proba",
+        "predict_log_proba",
+        "decision_function",
+        "score",
+    }
+)
+
+#: Wrapper methods that are timed as phases of public estimator methods.
+_TIMED_PHASES = frozenset(
+    {
+        "_check_parameter_types",
+        "_convert_X_for_delegate",
+        "_transformed_to_df",
+        "_prediction_to_series_or_frame",
+        "_prediction_with_class_labels",
+    }
+)
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class TimingEvent(NamedTuple):
+    """
+    The wall time spent in a public method of an estimator, or in one of the phases
+    of a call to a public method.
+    """
+
+    #: The estimator whose method was called.
+    estimator: Any
+
+    #: The name of the public method, e.g., ``"transform"``.
+    method: str
+
+    #: The phase of the method call: :attr:`.PHASE_TOTAL` for the complete call,
+    #: :attr:`.PHASE_DELEGATE` for the time not spent in any of the wrapper phases,
+    #: or the name of a wrapper phase, e.g., ``"convert_X_for_delegate"``.
+    phase: str
+
+    #: The wall time in seconds.
+    duration: float
+
+    #: Phase of events timing a complete method call.
+    PHASE_TOTAL = "total"
+
+    #: Phase of events timing the part of a method call not spent in any of the
+    #: wrapper phases; for wrappers, this is mostly the time spent in the native
+    #: estimator, including any nested :mod:`sklearndf` estimators.
+    PHASE_DELEGATE = "delegate"
+
+
+class TimingRecorder:
+    """
+    Timing callback recording all timing events in memory.
+
+    See :func:`.record_timings` for recording timings within a ``with`` block.
+    """
+
+    def __init__(self) -> None:
+        #: The timing events recorded so far.
+        self.events: List[TimingEvent] = []
+
+    def __call__(self, event: TimingEvent) -> None:
+        """
+        Record the given timing event.
+
+        :param event: the timing event
+        """
+        self.events.append(event)
+
+    def reset(self) -> None:
+        """
+        Discard all timing events recorded so far.
+        """
+        self.events = []
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Aggregate the recorded timing events by estimator type, method, and phase.
+
+        :return: a data frame indexed by estimator type, method, and phase, with the
+            number of calls, the total time, and the mean time per call in seconds
+        """
+        timings = pd.DataFrame(
+            data=[
+                (type(event.estimator).__name__, event.method, event.phase)
+                + (event.duration,)
+                for event in self.events
+            ],
+            columns=["estimator", "method", "phase", "time"],
+        ).astype({"time": float})
+        return timings.groupby(["estimator", "method", "phase"], sort=False)[
+            "time"
+        ].agg(calls="count", total_time="sum", mean_time="mean")
+
+
+#
+# Function definitions
+#
+
+
+def add_timing_callback(callback: Callable[[TimingEvent], None]) -> None:
+    """
+    Register a callback to be notified of the wall time spent in estimator methods.
+
+    The callback is called with a :class:`.TimingEvent` at the end of each call to
+    a public method of an estimator, and at the end of each wrapper phase of the
+    call, e.g., to forward the timings to a metrics system.
+
+    Timing is enabled as long as at least one callback is registered.
+
+    :param callback: the callback to register
+    """
+    _callbacks.append(callback)
+
+
+def remove_timing_callback(callback: Callable[[TimingEvent], None]) -> None:
+    """
+    Unregister a callback registered with :func:`.add_timing_callback`.
+
+    :param callback: the callback to unregister
+    :raises ValueError: if the callback is not registered
+    """
+    _callbacks.remove(callback)
+
+
+@contextmanager
+def record_timings() -> Iterator[TimingRecorder]:
+    """
+    Context manager recording the timings of all estimator methods called within
+    the ``with`` block.
+
+    For example::
+
+        with record_timings() as timings:
+            pipeline.predict(X)
+
+        timings.summary()
+
+    :return: the recorder of the timings
+    """
+    recorder = TimingRecorder()
+    add_timing_callback(recorder)
+    try:
+        yield recorder
+    finally:
+        remove_timing_callback(recorder)
+
+
+#
+# Private helpers
+#
+
+
+class _Frame:
+    # the timing state of a public method call in progress
+
+    __slots__ = ["estimator", "method", "phase", "phase_time"]
+
+    def __init__(self, estimator: Any, method: str) -> None:
+        self.estimator = estimator
+        self.method = method
+        self.phase: Optional[str] = None
+        self.phase_time = 0.0
+
+
+def _get_frames() -> List[_Frame]:
+    try:
+        return _local.frames
+    except AttributeError:
+        frames = _local.frames = []
+        return frames
+
+
+def _notify(event: TimingEvent) -> None:
+    for callback in tuple(_callbacks):
+        callback(event)
+
+
+def _timed_method(name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    # time all calls of the given public method
+
+    @wraps(method)
+    def _timed(self, *args, **kwargs) -> Any:
+        if not _callbacks:
+            return method(self, *args, **kwargs)
+
+        frames = _get_frames()
+        if frames and frames[-1].estimator is self and frames[-1].method == name:
+            # the method is called from an override in a subclass
+            return method(self, *args, **kwargs)
+
+        frame = _Frame(self, name)
+        frames.append(frame)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            frames.pop()
+            _notify(TimingEvent(self, name, TimingEvent.PHASE_TOTAL, duration))
+            _notify(
+                TimingEvent(
+                    self,
+                    name,
+                    TimingEvent.PHASE_DELEGATE,
+                    max(duration - frame.phase_time, 0.0),
+                )
+            )
+
+    return _timed
+
+
+def _timed_phase(name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+    # time all calls of the given wrapper phase, attributing them to the public
+    # method call in progress
+
+    phase = name.lstrip("_")
+
+    @wraps(function)
+    def _timed(*args, **kwargs) -> Any:
+        if not _callbacks:
+            return function(*args, **kwargs)
+
+        frames = _get_frames()
+        if not frames or frames[-1].phase is not None:
+            # not called from a timed method, or called from another phase
+            return function(*args, **kwargs)
+
+        frame = frames[-1]
+        frame.phase = phase
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            frame.phase = None
+            frame.phase_time += duration
+            _notify(TimingEvent(frame.estimator, frame.method, phase, duration))
+
+    return _timed
+
+
+def _instrument(cls: type) -> None:
+    # time the public methods and wrapper phases defined by the given class
+    for name, attribute in list(vars(cls).items()):
+        if name in _TIMED_METHODS and callable(attribute):
+            setattr(cls, name, _timed_method(name, attribute))
+        elif name in _TIMED_PHASES:
+            if isinstance(attribute, staticmethod):
+                setattr(cls, name, staticmethod(_timed_phase(name, attribute.__func__)))
+            elif callable(attribute):
+                setattr(cls, name, _timed_phase(name, attribute))
+
+
+__tracker.validate()
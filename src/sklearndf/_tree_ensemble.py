@@ -0,0 +1,404 @@
+"""
+Compiled inference for scikit-learn tree ensembles.
+
+The fitted trees of a random forest, extra trees, or gradient boosting ensemble can
+be compiled into contiguous node arrays, which are evaluated for all trees and rows
+at once using batched NumPy traversal of the trees, one tree level at a time (see
+option ``compile_tree_ensembles`` of :func:`.set_config`).
+"""
+
+import logging
+from abc import ABCMeta, abstractmethod
+from typing import Any, Dict, Generic, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator
+from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
+from sklearn.ensemble._forest import ForestClassifier, ForestRegressor
+from sklearn.tree._tree import DTYPE, TREE_LEAF, Tree
+from sklearn.utils import check_array
+
+from pytools.api import AllTracker, inheritdoc
+
+from . import get_config
+from ._wrapper import T_DelegateLearner, _LearnerWrapperDF
+
+log = logging.getLogger(__name__)
+
+__all__ = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+@inheritdoc(match="[see superclass]")
+class _TreeEnsembleWrapperDF(
+    _LearnerWrapperDF[T_DelegateLearner],
+    Generic[T_DelegateLearner],
+    metaclass=ABCMeta,
+):
+    """
+    Base class for wrappers around scikit-learn tree ensembles.
+
+    If option ``compile_tree_ensembles`` is set in the global configuration, the
+    fitted trees are compiled into contiguous node arrays when first predicting, and
+    predictions are computed from the compiled trees, with the same results as the
+    native estimator.
+    This avoids traversing each tree separately, and the overhead of dispatching
+    trees to parallel jobs, reducing the latency of predictions for small batches.
+    Batches of more than :attr:`.COMPILED_MAX_ROWS` rows are predicted by the native
+    estimator, which traverses the trees faster per row.
+    """
+
+    #: The maximum number of rows predicted using the compiled trees.
+    COMPILED_MAX_ROWS = 2000
+
+    # noinspection PyPep8Naming
+    def predict(
+        self, X: pd.DataFrame, **predict_params
+    ) -> Union[pd.Series, pd.DataFrame]:
+        """[see superclass]"""
+        compiled = self._get_compiled_ensemble(X, predict_params)
+        if compiled is None:
+            return super().predict(X, **predict_params)
+
+        self._check_parameter_types(X, None)
+
+        return self._prediction_to_series_or_frame(
+            X, compiled.predict(self._convert_X_for_delegate(X))
+        )
+
+    def _reset_fit(self) -> None:
+        try:
+            # noinspection PyProtectedMember
+            super()._reset_fit()
+        finally:
+            self._compiled_ensemble = None
+
+    def _warm_up(self) -> None:
+        super()._warm_up()
+        if (
+            get_config()["compile_tree_ensembles"]
+            and self.is_fitted
+            and self._compiled_ensemble is None
+        ):
+            self._compiled_ensemble = _CompiledTreeEnsemble.from_estimator(
+                self.native_estimator
+            )
+
+    # noinspection PyPep8Naming
+    def _get_compiled_ensemble(
+        self, X: pd.DataFrame, predict_params: Dict[str, Any]
+    ) -> Optional["_CompiledTreeEnsemble"]:
+        # get the compiled ensemble, or None if predictions are to be computed by
+        # the native estimator
+        if (
+            predict_params
+            or not get_config()["compile_tree_ensembles"]
+            or not self.is_fitted
+            or not isinstance(X, pd.DataFrame)
+            or len(X) > self.COMPILED_MAX_ROWS
+        ):
+            return None
+
+        if self._compiled_ensemble is None:
+            self._compiled_ensemble = _CompiledTreeEnsemble.from_estimator(
+                self.native_estimator
+            )
+        return self._compiled_ensemble
+
+
+class _CompiledTreeEnsemble(metaclass=ABCMeta):
+    # The trees of a fitted ensemble, flattened into contiguous node arrays.
+    #
+    # Leaves are represented as nodes whose children are the leaf itself, with an
+    # infinite threshold, so that all trees can be traversed in lockstep for a fixed
+    # number of levels, without tracking which rows have already reached a leaf.
+
+    #: The maximum number of tree nodes to evaluate at once, per tree level; larger
+    #: batches of rows are evaluated in chunks.
+    CHUNK_SIZE = 1 << 18
+
+    def __init__(
+        self,
+        estimator: BaseEstimator,
+        trees: Sequence[Tree],
+        values: Sequence[np.ndarray],
+    ) -> None:
+        # trees: the fitted trees of the ensemble
+        # values: for each tree, the values to accumulate per node, as an array of
+        #     shape (n_nodes, n_values)
+        self.estimator = estimator
+
+        node_counts = np.array([tree.node_count for tree in trees], dtype=np.intp)
+        offsets = np.zeros(len(trees), dtype=np.intp)
+        np.cumsum(node_counts[:-1], out=offsets[1:])
+
+        is_leaf = np.concatenate([tree.children_left == TREE_LEAF for tree in trees])
+        node_ids = np.arange(len(is_leaf), dtype=np.intp)
+
+        # the children of each node, interleaved: [left, right] for each node
+        children = np.empty(2 * len(is_leaf), dtype=np.intp)
+        for side, attribute in enumerate(("children_left", "children_right")):
+            children[side::2] = np.where(
+                is_leaf,
+                node_ids,
+                np.concatenate(
+                    [
+                        getattr(tree, attribute) + offset
+                        for tree, offset in zip(trees, offsets)
+                    ]
+                ),
+            )
+
+        self.roots = offsets
+        self.children = children
+        self.feature = np.where(
+            is_leaf, 0, np.concatenate([tree.feature for tree in trees])
+        ).astype(np.intp)
+        self.threshold = np.where(
+            is_leaf, np.inf, np.concatenate([tree.threshold for tree in trees])
+        )
+        self.values = np.concatenate(values)
+        self.depth = max(tree.max_depth for tree in trees)
+
+    @staticmethod
+    def from_estimator(estimator: BaseEstimator) -> Optional["_CompiledTreeEnsemble"]:
+        """
+        Compile the given fitted ensemble.
+
+        :param estimator: the fitted ensemble
+        :return: the compiled ensemble, or ``None`` if the ensemble is not supported
+        """
+        if isinstance(estimator, (ForestRegressor, ForestClassifier)):
+            if isinstance(estimator, ForestClassifier) and estimator.n_outputs_ > 1:
+                return None
+            return _CompiledForest(estimator)
+        elif isinstance(
+            estimator, (GradientBoostingRegressor, GradientBoostingClassifier)
+        ):
+            if not _CompiledGradientBoosting.is_supported(estimator):
+                return None
+            return _CompiledGradientBoosting(estimator)
+        else:
+            return None
+
+    @property
+    def n_trees(self) -> int:
+        """
+        The number of trees in the ensemble.
+        """
+        return len(self.roots)
+
+    # noinspection PyPep8Naming
+    @abstractmethod
+    def predict(self, X: Any) -> np.ndarray:
+        """
+        Predict the target for the given data, with the same results as the native
+        estimator.
+        """
+        pass
+
+    # noinspection PyPep8Naming
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """
+        Predict class probabilities for the given data, with the same results as
+        the native estimator.
+        """
+        raise NotImplementedError(
+            f"{type(self.estimator).__name__} does not implement method predict_proba"
+        )
+
+    # noinspection PyPep8Naming
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Get the leaves of all trees for the given rows.
+
+        :param X: the feature values as a float32 array of shape (n_rows, n_features)
+        :return: the leaf node of each tree, for each row, as an array of shape
+            (n_trees, n_rows)
+        """
+        rows = np.arange(len(X))
+        nodes = np.repeat(self.roots[:, np.newaxis], len(X), axis=1)
+        children = self.children
+        for _ in range(self.depth):
+            # comparing float32 features with float64 thresholds, as the native
+            # trees do
+            go_right = X[rows, self.feature[nodes]] > self.threshold[nodes]
+            nodes = children[2 * nodes + go_right]
+        return nodes
+
+    # noinspection PyPep8Naming
+    def _iter_chunks(self, X: np.ndarray) -> Sequence[slice]:
+        chunk_size = max(1, self.CHUNK_SIZE // self.n_trees)
+        return [
+            slice(start, start + chunk_size) for start in range(0, len(X), chunk_size)
+        ]
+
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _to_array(X: Any) -> Any:
+        # convert numeric data frames to float32 arrays before they are validated by
+        # the native estimator: this yields the same values as the native
+        # validation, without the overhead of inspecting the data frame
+        if isinstance(X, pd.DataFrame) and all(
+            isinstance(dtype, np.dtype) and dtype.kind in "biuf" for dtype in X.dtypes
+        ):
+            return X.to_numpy(dtype=DTYPE)
+        else:
+            return X
+
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _to_dense(X: Any) -> np.ndarray:
+        return X.toarray() if sparse.issparse(X) else X
+
+
+class _CompiledForest(_CompiledTreeEnsemble):
+    # a compiled random forest, or extra trees ensemble
+
+    def __init__(self, forest: Union[ForestRegressor, ForestClassifier]) -> None:
+        trees = [tree_estimator.tree_ for tree_estimator in forest.estimators_]
+
+        if isinstance(forest, ForestClassifier):
+            # class probabilities of each leaf, normalized as in the native trees
+            n_classes = forest.n_classes_
+            values = []
+            for tree in trees:
+                proba = np.ascontiguousarray(tree.value[:, 0, :n_classes])
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer
+                values.append(proba)
+        else:
+            values = [tree.value[:, :, 0] for tree in trees]
+
+        super().__init__(estimator=forest, trees=trees, values=values)
+
+    # noinspection PyPep8Naming
+    def predict(self, X: Any) -> np.ndarray:
+        forest = self.estimator
+        if isinstance(forest, ForestClassifier):
+            return forest.classes_.take(
+                np.argmax(self.predict_proba(X), axis=1), axis=0
+            )
+        y = self._mean_values(X)
+        return y.ravel() if forest.n_outputs_ == 1 else y
+
+    # noinspection PyPep8Naming
+    def predict_proba(self, X: Any) -> np.ndarray:
+        if not isinstance(self.estimator, ForestClassifier):
+            return super().predict_proba(X)
+        return self._mean_values(X)
+
+    # noinspection PyPep8Naming
+    def _mean_values(self, X: Any) -> np.ndarray:
+        # get the mean of the leaf values of all trees
+        # noinspection PyProtectedMember
+        X = self._to_dense(self.estimator._validate_X_predict(self._to_array(X)))
+
+        out = np.empty((len(X), self.values.shape[1]), dtype=np.float64)
+        for chunk in self._iter_chunks(X):
+            # the cumulative sum adds the values of the trees one at a time, in the
+            # same order as the native forest
+            out[chunk] = np.cumsum(self.values[self.apply(X[chunk])], axis=0)[-1]
+        out /= self.n_trees
+        return out
+
+
+class _CompiledGradientBoosting(_CompiledTreeEnsemble):
+    # a compiled gradient boosting ensemble
+
+    def __init__(
+        self, estimator: Union[GradientBoostingRegressor, GradientBoostingClassifier]
+    ) -> None:
+        # the trees of all stages, stage by stage
+        trees = [
+            tree_estimator.tree_ for tree_estimator in estimator.estimators_.ravel()
+        ]
+        super().__init__(
+            estimator=estimator,
+            trees=trees,
+            values=[tree.value[:, 0, :1] for tree in trees],
+        )
+
+    @staticmethod
+    def is_supported(
+        estimator: Union[GradientBoostingRegressor, GradientBoostingClassifier]
+    ) -> bool:
+        # the compiled ensemble uses private methods of the native estimator and of
+        # its loss to compute initial predictions, and to convert raw predictions to
+        # classes and probabilities; these are not available in all versions of
+        # scikit-learn, in which case the native estimator is used for predicting
+        required = [(estimator, "_raw_predict_init")]
+        if isinstance(estimator, GradientBoostingClassifier):
+            loss = getattr(estimator, "loss_", None)
+            required += [
+                (loss, "_raw_prediction_to_decision"),
+                (loss, "_raw_prediction_to_proba"),
+            ]
+        return all(callable(getattr(obj, name, None)) for obj, name in required)
+
+    # noinspection PyPep8Naming
+    def predict(self, X: Any) -> np.ndarray:
+        estimator = self.estimator
+        if isinstance(estimator, GradientBoostingClassifier):
+            # noinspection PyProtectedMember
+            return estimator.classes_.take(
+                estimator.loss_._raw_prediction_to_decision(self._decision_function(X)),
+                axis=0,
+            )
+        return self._raw_predict(X).ravel()
+
+    # noinspection PyPep8Naming
+    def predict_proba(self, X: Any) -> np.ndarray:
+        estimator = self.estimator
+        if not isinstance(estimator, GradientBoostingClassifier):
+            return super().predict_proba(X)
+        # noinspection PyProtectedMember
+        return estimator.loss_._raw_prediction_to_proba(self._decision_function(X))
+
+    # noinspection PyPep8Naming
+    def _decision_function(self, X: Any) -> np.ndarray:
+        raw_predictions = self._raw_predict(X)
+        if raw_predictions.shape[1] == 1:
+            return raw_predictions.ravel()
+        return raw_predictions
+
+    # noinspection PyPep8Naming
+    def _raw_predict(self, X: Any) -> np.ndarray:
+        estimator = self.estimator
+        X = check_array(self._to_array(X), dtype=DTYPE, order="C", accept_sparse="csr")
+        # noinspection PyProtectedMember
+        raw_predictions = estimator._raw_predict_init(X)
+        X = self._to_dense(X)
+
+        n_stages, n_trees_per_stage = estimator.estimators_.shape
+        learning_rate = estimator.learning_rate
+        for chunk in self._iter_chunks(X):
+            # scaled tree values, by stage, tree within the stage, and row
+            values = learning_rate * self.values[self.apply(X[chunk]), 0].reshape(
+                n_stages, n_trees_per_stage, -1
+            )
+            # the cumulative sum adds the values of the trees to the initial raw
+            # predictions one stage at a time, in the same order as the native
+            # ensemble
+            raw_predictions[chunk] = np.cumsum(
+                np.concatenate([raw_predictions[chunk].T[np.newaxis], values]),
+                axis=0,
+            )[-1].T
+        return raw_predictions
+
+
+__tracker.validate()
@@ -25,6 +25,7 @@ from typing import (
     Optional,
     Sequence,
     Set,
+    Tuple,
     Type,
     TypeVar,
     Union,
@@ -42,7 +43,14 @@ from sklearn.base import (
 
 from pytools.api import inheritdoc, public_module_prefix
 
-from sklearndf import ClassifierDF, EstimatorDF, LearnerDF, RegressorDF, TransformerDF
+from sklearndf import (
+    ClassifierDF,
+    EstimatorDF,
+    LearnerDF,
+    RegressorDF,
+    TransformerDF,
+    get_config,
+)
 
 log = logging.getLogger(__name__)
 
@@ -150,13 +158,10 @@ class _EstimatorWrapperDF(
         :return: the wrapped data frame estimator
         """
 
-        class _FittedEstimator(cls):
-            def __init__(self) -> None:
-                super().__init__(_delegate_estimator=estimator)
-                self._features_in = features_in
-                self._n_outputs = n_outputs
-
-        return _FittedEstimator()
+        estimator_df = cls(_delegate_estimator=estimator)
+        estimator_df._features_in = features_in.rename(cls.COL_FEATURE_IN)
+        estimator_df._n_outputs = n_outputs
+        return estimator_df
 
     def get_params(self, deep=True) -> Mapping[str, Any]:
         """[see superclass]"""
@@ -348,14 +353,21 @@ class _TransformerWrapperDF(
     """
 
     # noinspection PyPep8Naming
-    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+    def transform(
+        self, X: pd.DataFrame, columns: Optional[Sequence[Any]] = None
+    ) -> pd.DataFrame:
         """[see superclass]"""
         self._check_parameter_types(X, None)
 
-        transformed = self._transform(X)
+        if columns is None:
+            transformed = self._transform(X)
+            columns = self.feature_names_out_
+        else:
+            columns = self._validate_columns_out(columns)
+            transformed = self._transform_columns(X, columns)
 
         return self._transformed_to_df(
-            transformed=transformed, index=X.index, columns=self.feature_names_out_
+            transformed=transformed, index=X.index, columns=columns
         )
 
     # noinspection PyPep8Naming
@@ -399,6 +411,80 @@ class _TransformerWrapperDF(
             super()._reset_fit()
         finally:
             self._features_original = None
+            self._restricted_transformer: Optional[
+                Tuple[Tuple[Any, ...], _TransformerWrapperDF[T_DelegateTransformer]]
+            ] = None
+
+    def _supports_restriction(self) -> bool:
+        # override if the delegate can be restricted to a subset of its ingoing
+        # features, see method _restrict_delegate
+        return False
+
+    def _restrict_delegate(self, positions: np.ndarray) -> T_DelegateTransformer:
+        # return a fitted copy of the delegate which transforms the ingoing features
+        # at the given positions only, producing the output features originating
+        # from these features; only called if _supports_restriction() is True
+        raise NotImplementedError(
+            f"{type(self.native_estimator).__name__} does not support restriction "
+            "to a subset of its ingoing features"
+        )
+
+    def _restrict(
+        self: T_Self, features_in: pd.Index
+    ) -> "_TransformerWrapperDF[T_DelegateTransformer]":
+        # return a fitted copy of this transformer, restricted to the given ingoing
+        # features
+        self: _TransformerWrapperDF[T_DelegateTransformer]
+        return type(self).from_fitted(
+            estimator=self._restrict_delegate(
+                self.feature_names_in_.get_indexer(features_in)
+            ),
+            features_in=features_in,
+            n_outputs=self.n_outputs_,
+        )
+
+    # noinspection PyPep8Naming
+    def _transform_columns(
+        self, X: pd.DataFrame, columns: pd.Index
+    ) -> Union[pd.DataFrame, np.ndarray]:
+        # transform the given inputs to the given subset of output features
+        if len(columns) == 0:
+            return np.empty(shape=(len(X), 0))
+        elif self._supports_restriction():
+            # only transform the ingoing features required for the requested
+            # output features
+            transformer = self._get_restricted_transformer(columns)
+        else:
+            transformer = self
+
+        # noinspection PyProtectedMember
+        transformed = transformer._transform(X)
+        positions = transformer.feature_names_out_.get_indexer(columns)
+
+        if isinstance(transformed, pd.DataFrame):
+            return transformed.iloc[:, positions]
+        else:
+            return transformed[:, positions]
+
+    def _get_restricted_transformer(
+        self, columns: pd.Index
+    ) -> "_TransformerWrapperDF[T_DelegateTransformer]":
+        # get a copy of this transformer restricted to the ingoing features required
+        # for the given output features; the most recent copy is cached
+        key = tuple(columns)
+        if self._restricted_transformer is not None:
+            key_cached, transformer = self._restricted_transformer
+            if key_cached == key:
+                return transformer
+
+        features_in = self.feature_names_in_
+        transformer = self._restrict(
+            features_in[
+                features_in.isin(self.feature_names_original_.loc[columns].values)
+            ]
+        )
+        self._restricted_transformer = key, transformer
+        return transformer
 
     @staticmethod
     def _transformed_to_df(
@@ -412,9 +498,11 @@ class _TransformerWrapperDF(
                 expected_columns=columns,
                 expected_index=index,
             )
-            return transformed
+            return _df_to_float_dtype(transformed)
         else:
-            return pd.DataFrame(data=transformed, index=index, columns=columns)
+            return pd.DataFrame(
+                data=_array_to_float_dtype(transformed), index=index, columns=columns
+            )
 
     # noinspection PyPep8Naming
     def _transform(self, X: pd.DataFrame) -> np.ndarray:
@@ -454,6 +542,11 @@ class _LearnerWrapperDF(
     #: See :meth:`~.LearnerDF.predict`.
     COL_PREDICTION = "prediction"
 
+    # noinspection PyPep8Naming
+    def _convert_X_for_delegate(self, X: pd.DataFrame) -> Any:
+        # convert floating point features to the configured float dtype, if any
+        return _df_to_float_dtype(super()._convert_X_for_delegate(X))
+
     # noinspection PyPep8Naming
     def predict(
         self, X: pd.DataFrame, **predict_params
@@ -821,6 +914,55 @@ class _StackingRegressorWrapperDF(
     pass
 
 
+#
+# conversion of floating point data according to the global configuration
+#
+
+
+def _array_to_float_dtype(array: np.ndarray) -> np.ndarray:
+    # convert a floating point array to the configured float dtype, if any
+    float_dtype: Optional[np.dtype] = get_config()["float_dtype"]
+    if (
+        float_dtype is None
+        or not isinstance(array, np.ndarray)
+        or array.dtype.kind != "f"
+        or array.dtype == float_dtype
+    ):
+        return array
+    else:
+        return array.astype(float_dtype)
+
+
+def _df_to_float_dtype(df: pd.DataFrame) -> pd.DataFrame:
+    # convert all floating point columns of a data frame to the configured float
+    # dtype, if any
+    float_dtype: Optional[np.dtype] = get_config()["float_dtype"]
+    if float_dtype is None:
+        return df
+
+    convert: List[bool] = [
+        isinstance(dtype, np.dtype) and dtype.kind == "f" and dtype != float_dtype
+        for dtype in df.dtypes
+    ]
+
+    if not any(convert):
+        return df
+    elif all(convert):
+        return df.astype(float_dtype)
+    elif df.columns.is_unique:
+        return df.astype(
+            {column: float_dtype for column, c in zip(df.columns, convert) if c}
+        )
+    else:
+        return pd.concat(
+            [
+                df.iloc[:, i].astype(float_dtype) if c else df.iloc[:, i]
+                for i, c in enumerate(convert)
+            ],
+            axis=1,
+        )
+
+
 #
 # decorator for wrapping scikit-learn estimators
 #
@@ -3,7 +3,7 @@ Core implementation of :mod:`sklearndf.classification`
 """
 import logging
 from abc import ABCMeta
-from typing import Any, List, Optional, Sequence, Union
+from typing import Any, Generic, List, Optional, Sequence, Union
 
 import numpy as np
 import pandas as pd
@@ -49,10 +49,16 @@ from sklearn.semi_supervised import LabelPropagation, LabelSpreading
 from sklearn.svm import SVC, LinearSVC, NuSVC
 from sklearn.tree import DecisionTreeClassifier, ExtraTreeClassifier
 
-from pytools.api import AllTracker
+from pytools.api import AllTracker, inheritdoc
 
 from .. import ClassifierDF
-from .._wrapper import _ClassifierWrapperDF, _MetaClassifierWrapperDF, df_estimator
+from .._tree_ensemble import _TreeEnsembleWrapperDF
+from .._wrapper import (
+    T_DelegateClassifier,
+    _ClassifierWrapperDF,
+    _MetaClassifierWrapperDF,
+    df_estimator,
+)
 
 log = logging.getLogger(__name__)
 
@@ -188,8 +194,35 @@ class VotingClassifierDF(ClassifierDF, VotingClassifier):
 #
 
 
+@inheritdoc(match="[see superclass]")
+class _TreeEnsembleClassifierWrapperDF(
+    _TreeEnsembleWrapperDF[T_DelegateClassifier],
+    _ClassifierWrapperDF[T_DelegateClassifier],
+    Generic[T_DelegateClassifier],
+    metaclass=ABCMeta,
+):
+    """
+    Wraps a random forest, extra trees, or gradient boosting classifier.
+    """
+
+    # noinspection PyPep8Naming
+    def predict_proba(
+        self, X: pd.DataFrame, **predict_params
+    ) -> Union[pd.DataFrame, List[pd.DataFrame]]:
+        """[see superclass]"""
+        compiled = self._get_compiled_ensemble(X, predict_params)
+        if compiled is None:
+            return super().predict_proba(X, **predict_params)
+
+        self._check_parameter_types(X, None)
+
+        return self._prediction_with_class_labels(
+            X, compiled.predict_proba(self._convert_X_for_delegate(X))
+        )
+
+
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ClassifierWrapperDF)
+@df_estimator(df_wrapper_type=_TreeEnsembleClassifierWrapperDF)
 class RandomForestClassifierDF(ClassifierDF, RandomForestClassifier):
     """
     Wraps :class:`sklearn.ensemble.forest.RandomForestClassifier`; accepts and returns
@@ -200,7 +233,7 @@ class RandomForestClassifierDF(ClassifierDF, RandomForestClassifier):
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ClassifierWrapperDF)
+@df_estimator(df_wrapper_type=_TreeEnsembleClassifierWrapperDF)
 class ExtraTreesClassifierDF(ClassifierDF, ExtraTreesClassifier):
     """
     Wraps :class:`sklearn.ensemble.forest.ExtraTreesClassifier`; accepts and returns
@@ -211,7 +244,7 @@ class ExtraTreesClassifierDF(ClassifierDF, ExtraTreesClassifier):
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ClassifierWrapperDF)
+@df_estimator(df_wrapper_type=_TreeEnsembleClassifierWrapperDF)
 class GradientBoostingClassifierDF(ClassifierDF, GradientBoostingClassifier):
     """
     Wraps :class:`sklearn.ensemble.gradient_boosting.GradientBoostingClassifier`;
@@ -3,8 +3,12 @@ Core implementation of :mod:`sklearndf.classification.extra`
 """
 import logging
 import warnings
+from abc import ABCMeta
+from typing import List, Union
 
-from pytools.api import AllTracker
+import pandas as pd
+
+from pytools.api import AllTracker, inheritdoc
 
 from ... import ClassifierDF
 from ..._wrapper import _ClassifierWrapperDF, df_estimator
@@ -18,6 +22,8 @@ warnings.filterwarnings(
 )
 from lightgbm.sklearn import LGBMClassifier
 
+from ..._lgbm import _LGBMWrapperDF
+
 log = logging.getLogger(__name__)
 
 __all__ = ["LGBMClassifierDF"]
@@ -41,8 +47,22 @@ __tracker = AllTracker(globals())
 #
 
 
+@inheritdoc(match="[see superclass]")
+class _LGBMClassifierWrapperDF(
+    _LGBMWrapperDF[LGBMClassifier],
+    _ClassifierWrapperDF[LGBMClassifier],
+    metaclass=ABCMeta,
+):
+    # noinspection PyPep8Naming
+    def predict_proba(
+        self, X: pd.DataFrame, **predict_params
+    ) -> Union[pd.DataFrame, List[pd.DataFrame]]:
+        """[see superclass]"""
+        return super().predict_proba(X, **self._with_num_threads(X, predict_params))
+
+
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ClassifierWrapperDF)
+@df_estimator(df_wrapper_type=_LGBMClassifierWrapperDF)
 class LGBMClassifierDF(ClassifierDF, LGBMClassifier):
     """
     Wraps :class:`lightgbm.sklearn.LGBMClassifier`; accepts and returns data frames.
@@ -0,0 +1,309 @@
+"""
+Algebraic fusion of consecutive affine steps in fitted pipelines.
+
+Imputers filling missing values with a constant per column, and scalers applying a
+linear transformation per column, can be composed into a single map
+
+``x -> fill if x is missing else scale * x + offset``
+
+applied element-wise to each column.
+Linear models can absorb the scale and offset of a preceding map into their
+coefficients and intercepts, leaving at most the filling of missing values.
+"""
+
+import copy
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import (
+    ElasticNet,
+    Lasso,
+    LinearRegression,
+    LogisticRegression,
+    Ridge,
+)
+from sklearn.preprocessing import (
+    MaxAbsScaler,
+    MinMaxScaler,
+    RobustScaler,
+    StandardScaler,
+)
+from sklearn.utils import check_array
+from sklearn.utils.validation import FLOAT_DTYPES
+
+from pytools.api import AllTracker
+
+from .. import EstimatorDF, LearnerDF, TransformerDF
+from .._wrapper import df_estimator
+from ..transformation._wrapper import _ColumnWiseTransformerWrapperDF
+
+log = logging.getLogger(__name__)
+
+__all__ = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class _AffineTransformer(BaseEstimator, TransformerMixin):
+    """
+    Fill missing values, then scale and shift each column by fixed amounts.
+
+    Each of the parameters is an array with one value per column, or ``None`` to skip
+    the corresponding operation.
+    Missing values in columns with a ``NaN`` fill value remain missing.
+    """
+
+    def __init__(
+        self,
+        fill: Optional[np.ndarray] = None,
+        scale: Optional[np.ndarray] = None,
+        offset: Optional[np.ndarray] = None,
+    ) -> None:
+        self.fill = fill
+        self.scale = scale
+        self.offset = offset
+
+    # noinspection PyPep8Naming,PyUnusedLocal
+    def fit(self, X, y=None, **fit_params) -> "_AffineTransformer":
+        # all parameters are fixed, there is nothing to learn
+        return self
+
+    # noinspection PyPep8Naming
+    def transform(self, X) -> np.ndarray:
+        X = check_array(X, dtype=FLOAT_DTYPES, force_all_finite="allow-nan")
+
+        transformed = X
+        if self.scale is not None:
+            transformed = transformed * self.scale
+        if self.offset is not None:
+            transformed = transformed + self.offset
+        if self.fill is not None:
+            missing = np.isnan(X)
+            if missing.any():
+                if transformed is X:
+                    transformed = X.copy()
+                transformed[missing] = np.broadcast_to(self.fill, X.shape)[missing]
+
+        return transformed
+
+
+# noinspection PyAbstractClass
+@df_estimator(df_wrapper_type=_ColumnWiseTransformerWrapperDF)
+class _AffineTransformerDF(TransformerDF, _AffineTransformer):
+    """
+    Fused affine steps of a fitted :class:`.PipelineDF`.
+    """
+
+    pass
+
+
+class _AffineMap:
+    """
+    A per-column map ``x -> fill if x is missing else scale * x + offset``.
+
+    A ``NaN`` fill value designates a column whose missing values remain missing.
+    """
+
+    #: Fitted native transformers which can be represented as an affine map.
+    AFFINE_TRANSFORMER_TYPES = (
+        SimpleImputer,
+        StandardScaler,
+        MinMaxScaler,
+        RobustScaler,
+        MaxAbsScaler,
+    )
+
+    #: Fitted native linear models whose decision function is
+    #: ``X @ coef_.T + intercept_``.
+    LINEAR_MODEL_TYPES = (
+        LinearRegression,
+        Ridge,
+        Lasso,
+        ElasticNet,
+        LogisticRegression,
+    )
+
+    def __init__(self, fill: np.ndarray, scale: np.ndarray, offset: np.ndarray):
+        self.fill = fill
+        self.scale = scale
+        self.offset = offset
+
+    @classmethod
+    def identity(cls, n_features: int) -> "_AffineMap":
+        """
+        Create the identity map for the given number of columns.
+        """
+        return cls(
+            fill=np.full(n_features, np.nan),
+            scale=np.ones(n_features),
+            offset=np.zeros(n_features),
+        )
+
+    @staticmethod
+    def is_affine(transformer: EstimatorDF) -> bool:
+        """
+        Check whether the given fitted transformer can be represented as an affine
+        map.
+        """
+        return _AffineMap._get_step_parameters(transformer) is not None
+
+    def then(self, transformer: TransformerDF) -> "_AffineMap":
+        """
+        Compose this map with the affine map of the given transformer, applied
+        after this map.
+
+        :param transformer: a fitted transformer for which :meth:`.is_affine` is
+            ``True``
+        :return: the composed map
+        """
+        step_fill, step_scale, step_offset = self._get_step_parameters(transformer)
+
+        # missing values which are not filled yet are filled by the next step;
+        # filled values are mapped by the next step like any other value
+        fill = self.fill * step_scale + step_offset
+        fill = np.where(np.isnan(self.fill), step_fill, fill)
+
+        return _AffineMap(
+            fill=fill,
+            scale=self.scale * step_scale,
+            offset=self.offset * step_scale + step_offset,
+        )
+
+    def to_transformer(self, features_in: pd.Index) -> _AffineTransformerDF:
+        """
+        Create a fitted transformer applying this map.
+
+        :param features_in: the names of the columns this map applies to
+        :return: the fitted transformer
+        """
+        transformer = _AffineTransformerDF(
+            fill=None if np.isnan(self.fill).all() else self.fill,
+            scale=None if (self.scale == 1.0).all() else self.scale,
+            offset=None if (self.offset == 0.0).all() else self.offset,
+        )
+        # the parameters are fixed, so fitting only records the ingoing features
+        return transformer.fit(pd.DataFrame(columns=features_in))
+
+    def fold_into(
+        self, learner: LearnerDF
+    ) -> Optional[Tuple[Optional["_AffineMap"], LearnerDF]]:
+        """
+        Fold the scale and offset of this map into the coefficients and intercept of
+        the given fitted linear model.
+
+        :param learner: the fitted learner following this map
+        :return: a map that only fills missing values in the original input space,
+            or ``None`` if no values need to be filled, along with a modified copy of
+            the learner; or ``None`` if the map cannot be folded into the learner
+        """
+        native = learner.native_estimator
+        if not (
+            isinstance(native, _AffineMap.LINEAR_MODEL_TYPES)
+            and hasattr(native, "coef_")
+        ):
+            return None
+
+        filled = ~np.isnan(self.fill)
+        if (self.scale[filled] == 0.0).any():
+            # we cannot map fill values back to the original input space
+            return None
+
+        coef = np.asarray(native.coef_)
+        intercept = native.intercept_
+
+        # (scale * x + offset) @ coef.T + intercept
+        # = x @ (coef * scale).T + (offset @ coef.T + intercept)
+        learner_folded = copy.deepcopy(learner)
+        native_folded = learner_folded.native_estimator
+        native_folded.coef_ = coef * self.scale
+        native_folded.intercept_ = intercept + coef @ self.offset
+
+        if not filled.any():
+            return None, learner_folded
+
+        fill = np.full_like(self.fill, np.nan)
+        fill[filled] = (self.fill[filled] - self.offset[filled]) / self.scale[filled]
+        return (
+            _AffineMap(
+                fill=fill,
+                scale=np.ones_like(self.scale),
+                offset=np.zeros_like(self.offset),
+            ),
+            learner_folded,
+        )
+
+    @staticmethod
+    def _get_step_parameters(
+        transformer: EstimatorDF,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        # get the fill values, scale and offset of the given fitted transformer,
+        # or None if the transformer does not represent an affine map
+
+        if not (
+            isinstance(transformer, TransformerDF)
+            and transformer.is_fitted
+            and isinstance(
+                transformer.native_estimator, _AffineMap.AFFINE_TRANSFORMER_TYPES
+            )
+            and transformer.feature_names_out_.equals(transformer.feature_names_in_)
+        ):
+            return None
+
+        native = transformer.native_estimator
+        n_features = len(transformer.feature_names_in_)
+        fill = np.full(n_features, np.nan)
+        scale = np.ones(n_features)
+        offset = np.zeros(n_features)
+
+        if isinstance(native, SimpleImputer):
+            missing_values = native.missing_values
+            if native.add_indicator or not (
+                isinstance(missing_values, float) and np.isnan(missing_values)
+            ):
+                return None
+            try:
+                fill = np.asarray(native.statistics_, dtype=np.float64)
+            except (TypeError, ValueError):
+                # non-numeric fill values
+                return None
+
+        elif isinstance(native, StandardScaler):
+            if native.with_std:
+                scale = 1.0 / native.scale_
+            if native.with_mean:
+                offset = -native.mean_ * scale
+
+        elif isinstance(native, RobustScaler):
+            if native.with_scaling:
+                scale = 1.0 / native.scale_
+            if native.with_centering:
+                offset = -native.center_ * scale
+
+        elif isinstance(native, MinMaxScaler):
+            if getattr(native, "clip", False):
+                # clipping is not an affine map
+                return None
+            scale = native.scale_
+            offset = native.min_
+
+        elif isinstance(native, MaxAbsScaler):
+            scale = 1.0 / native.scale_
+
+        return fill, scale, offset
+
+
+__tracker.validate()
@@ -4,7 +4,7 @@ GAMMA custom two-step pipelines
 
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Any, Generic, List, Optional, Sequence, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, TypeVar, Union
 
 import pandas as pd
 from sklearn.base import BaseEstimator
@@ -300,6 +300,15 @@ class ClassifierPipelineDF(
     mandatory classification step.
     """
 
+    #: Names of the prediction methods that can be requested from
+    #: :meth:`.predict_all`.
+    PREDICTION_METHODS = (
+        "predict",
+        "predict_proba",
+        "predict_log_proba",
+        "decision_function",
+    )
+
     def __init__(
         self,
         *,
@@ -360,5 +369,47 @@ class ClassifierPipelineDF(
             self._pre_transform(X), **predict_params
         )
 
+    # noinspection PyPep8Naming
+    def predict_all(
+        self,
+        X: pd.DataFrame,
+        outputs: Sequence[str] = ("predict", "predict_proba"),
+        **predict_params,
+    ) -> Dict[str, Union[pd.Series, pd.DataFrame, List[pd.DataFrame]]]:
+        """
+        Compute multiple kinds of predictions for the given inputs, running the
+        preprocessing step only once.
+
+        This is equivalent to calling each of the requested prediction methods
+        separately, but avoids transforming the same inputs repeatedly.
+
+        :param X: input data frame with observations as rows and features as columns
+        :param outputs: names of the prediction methods to call, any of
+            ``"predict"``, ``"predict_proba"``, ``"predict_log_proba"``, and
+            ``"decision_function"`` (default: ``("predict", "predict_proba")``)
+        :param predict_params: optional keyword parameters as required by specific
+            learner implementations
+        :return: a dictionary mapping the name of each requested prediction method to
+            its result
+        """
+        if isinstance(outputs, str):
+            raise TypeError("arg outputs must be a sequence of method names")
+
+        unknown_outputs = [
+            output for output in outputs if output not in self.PREDICTION_METHODS
+        ]
+        if unknown_outputs:
+            raise ValueError(
+                f"unknown prediction methods in arg outputs: "
+                f"{', '.join(unknown_outputs)}"
+            )
+
+        X_preprocessed = self._pre_transform(X)
+
+        return {
+            output: getattr(self.classifier, output)(X_preprocessed, **predict_params)
+            for output in outputs
+        }
+
 
 __tracker.validate()
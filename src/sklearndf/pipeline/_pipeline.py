@@ -4,7 +4,7 @@ Core implementation of :mod:`sklearndf.pipeline`
 
 import logging
 from abc import ABCMeta
-from typing import Iterator, List, Sequence, Tuple, Union, cast
+from typing import Iterator, List, Optional, Sequence, Tuple, Union, cast
 
 import numpy as np
 import pandas as pd
@@ -14,12 +14,16 @@ from sklearn.pipeline import FeatureUnion, Pipeline
 from pytools.api import AllTracker
 
 from .. import ClassifierDF, EstimatorDF, RegressorDF, TransformerDF
+from .._profiling import _StepProfiler, _StepProfilingMixin
 from .._wrapper import (
+    T_Self,
     _ClassifierWrapperDF,
     _RegressorWrapperDF,
     _TransformerWrapperDF,
     df_estimator,
 )
+from ._affine import _AffineMap
+from ._pruning import _FeaturePruning
 
 log = logging.getLogger(__name__)
 
@@ -42,6 +46,7 @@ class _PipelineWrapperDF(
     _ClassifierWrapperDF[Pipeline],
     _RegressorWrapperDF[Pipeline],
     _TransformerWrapperDF[Pipeline],
+    _StepProfilingMixin,
     metaclass=ABCMeta,
 ):
     #: Placeholder that can be used in place of an estimator to designate a pipeline
@@ -120,6 +125,234 @@ class _PipelineWrapperDF(
         else:
             return self.native_estimator[ind]
 
+    def fuse_affine_steps(self: T_Self, fold_into_final: bool = True) -> T_Self:
+        """
+        Create an equivalent fitted pipeline for inference, where runs of consecutive
+        per-column affine steps are fused into a single step.
+
+        Steps qualifying for fusion are fitted
+        :class:`~sklearndf.transformation.SimpleImputerDF` transformers imputing
+        ``NaN`` values with numerical statistics or constants, and fitted
+        :class:`~sklearndf.transformation.StandardScalerDF`,
+        :class:`~sklearndf.transformation.MinMaxScalerDF`,
+        :class:`~sklearndf.transformation.RobustScalerDF`, and
+        :class:`~sklearndf.transformation.MaxAbsScalerDF` transformers.
+        A run of such steps is replaced by a single step, which fills missing values
+        and then applies one scale and offset per column, avoiding the intermediate
+        data frames of the individual steps.
+        Steps designated as ``"passthrough"`` are removed, except for the final step.
+
+        If the final step is a linear model (linear, ridge, lasso, or elastic net
+        regression, or logistic regression) immediately preceded by fused steps, and
+        ``fold_into_final`` is ``True``, the scale and offset are folded into the
+        coefficients and intercept of the linear model, leaving at most a step to fill
+        missing values.
+
+        Outputs of the fused pipeline equal outputs of this pipeline up to floating
+        point rounding; this pipeline is not modified, but the fused pipeline shares
+        all steps not affected by fusion with this pipeline.
+
+        :param fold_into_final: if ``True``, fold fused steps into the coefficients
+            of a final linear model, if possible (default: ``True``)
+        :return: the fused pipeline
+        """
+
+        self: _PipelineWrapperDF  # support type hinting in PyCharm
+
+        self._ensure_fitted()
+
+        steps = self.steps
+        fused_steps: List[Tuple[str, EstimatorDF]] = []
+        run: List[Tuple[str, TransformerDF]] = []
+        affine_map: Optional[_AffineMap] = None
+
+        for i, (name, estimator) in enumerate(steps):
+            is_final = i == len(steps) - 1
+
+            if self._is_passthrough(estimator) and not is_final:
+                continue
+
+            if _AffineMap.is_affine(estimator):
+                if affine_map is None:
+                    affine_map = _AffineMap.identity(len(estimator.feature_names_in_))
+                affine_map = affine_map.then(estimator)
+                run.append((name, estimator))
+                continue
+
+            if run:
+                folded = (
+                    affine_map.fold_into(estimator)
+                    if fold_into_final and is_final
+                    else None
+                )
+                if folded is None:
+                    fused_steps.extend(self._fuse_run(run, affine_map))
+                else:
+                    fill_map, estimator = folded
+                    if fill_map is not None:
+                        fused_steps.extend(self._fuse_run(run, fill_map, force=True))
+                run, affine_map = [], None
+
+            fused_steps.append((name, estimator))
+
+        if run:
+            fused_steps.extend(self._fuse_run(run, affine_map))
+
+        return self._make_fitted_pipeline(
+            steps=fused_steps, features_in=self.feature_names_in_
+        )
+
+    def prune_features(self: T_Self) -> T_Self:
+        """
+        Create an equivalent fitted pipeline for inference, which only reads and
+        processes the ingoing features that affect the output of this pipeline.
+
+        Traces the lineage of the features required by the final step back to the
+        ingoing features of this pipeline (see :attr:`.feature_names_original_`).
+        Feature selectors, e.g.,
+        :class:`~sklearndf.transformation.SelectKBestDF`,
+        :class:`~sklearndf.transformation.VarianceThresholdDF`,
+        :class:`~sklearndf.transformation.RFEDF`,
+        :class:`~sklearndf.transformation.SelectFromModelDF`, or
+        :class:`~sklearndf.transformation.extra.BorutaDF`, restrict the features
+        required upstream to the selected features.
+        Transformers preserving all columns and transforming each column
+        independently (imputers, scalers, and fused affine steps, see
+        :meth:`.fuse_affine_steps`) are restricted to the required features, making
+        the selectors redundant; these are replaced with ``"passthrough"`` steps.
+        All other steps require all their ingoing features, and are kept as they are.
+
+        The :attr:`.feature_names_in_` of the pruned pipeline are the minimal set of
+        ingoing features; data frames passed to the pruned pipeline must have exactly
+        these columns, e.g., ``X[pipeline_pruned.feature_names_in_]``.
+
+        The outputs of the pruned pipeline are the same as the outputs of this
+        pipeline; this pipeline is not modified, but the pruned pipeline shares all
+        steps not affected by the pruning with this pipeline.
+
+        :return: the pruned pipeline
+        """
+
+        self: _PipelineWrapperDF  # support type hinting in PyCharm
+
+        self._ensure_fitted()
+
+        steps = self.steps
+        if len(steps) == 0:
+            return self
+
+        # trace back the required features from the last to the first step
+
+        final_estimator = steps[-1][1]
+        if self._is_passthrough(final_estimator) or isinstance(
+            final_estimator, TransformerDF
+        ):
+            features_required = self.feature_names_out_
+        else:
+            features_required = final_estimator.feature_names_in_
+
+        steps_required_in: List[pd.Index] = []
+        for name, estimator in reversed(steps):
+            if self._is_passthrough(estimator):
+                pass
+            elif _FeaturePruning.is_selector(
+                estimator
+            ) or _FeaturePruning.is_column_wise(estimator):
+                features_required = _FeaturePruning.get_required_features_in(
+                    estimator, features_required
+                )
+            else:
+                features_required = estimator.feature_names_in_
+            steps_required_in.append(features_required)
+        steps_required_in.reverse()
+
+        features_in = self.feature_names_in_
+        features_in = features_in[features_in.isin(steps_required_in[0])]
+
+        # restrict steps to the required features where the preceding steps
+        # provide exactly the required features
+
+        pruned_steps: List[Tuple[str, EstimatorDF]] = []
+        features_available = features_in
+
+        for (name, estimator), features_required in zip(steps, steps_required_in):
+            if self._is_passthrough(estimator):
+                pruned_steps.append((name, estimator))
+                continue
+
+            if set(features_available) == set(features_required):
+                if _FeaturePruning.is_selector(estimator):
+                    pruned_steps.append((name, self.PASSTHROUGH))
+                    continue
+                elif _FeaturePruning.is_column_wise(estimator):
+                    if len(features_required) < len(estimator.feature_names_in_):
+                        estimator = _FeaturePruning.prune_column_wise(
+                            estimator, features_required
+                        )
+                    pruned_steps.append((name, estimator))
+                    continue
+
+            pruned_steps.append((name, estimator))
+            if isinstance(estimator, TransformerDF):
+                features_available = estimator.feature_names_out_
+
+        return self._make_fitted_pipeline(steps=pruned_steps, features_in=features_in)
+
+    def _make_fitted_pipeline(
+        self: T_Self, steps: List[Tuple[str, EstimatorDF]], features_in: pd.Index
+    ) -> T_Self:
+        # make a new pipeline with the given fitted steps
+
+        self: _PipelineWrapperDF  # support type hinting in PyCharm
+
+        base_pipeline = self.native_estimator
+        return self.__class__.from_fitted(
+            estimator=Pipeline(
+                steps=steps, memory=base_pipeline.memory, verbose=base_pipeline.verbose
+            ),
+            features_in=features_in,
+            n_outputs=self.n_outputs_,
+        )
+
+    # noinspection PyPep8Naming
+    def _profile_steps(self, profiler: _StepProfiler, X: pd.DataFrame) -> None:
+        steps = self.steps
+        if len(steps) == 0:
+            return
+
+        for name, transformer in steps[:-1]:
+            if not self._is_passthrough(transformer):
+                X = profiler.run_step(name, transformer, "transform", X)
+
+        final_name, final_estimator = steps[-1]
+        if not self._is_passthrough(final_estimator):
+            profiler.run_step(
+                final_name,
+                final_estimator,
+                "transform"
+                if isinstance(final_estimator, TransformerDF)
+                else "predict",
+                X,
+            )
+
+    @staticmethod
+    def _fuse_run(
+        run: List[Tuple[str, TransformerDF]],
+        affine_map: _AffineMap,
+        force: bool = False,
+    ) -> List[Tuple[str, TransformerDF]]:
+        # replace a run of affine steps with a single step applying the given map;
+        # keep a single step as it is unless the fusion is forced
+        if len(run) == 1 and not force:
+            return run
+        else:
+            return [
+                (
+                    "+".join(name for name, _ in run),
+                    affine_map.to_transformer(run[0][1].feature_names_in_),
+                )
+            ]
+
     @staticmethod
     def _is_passthrough(estimator: Union[EstimatorDF, str, None]) -> bool:
         # return True if the estimator is a "passthrough" (i.e. identity) transformer
@@ -207,7 +440,9 @@ class PipelineDF(ClassifierDF, RegressorDF, TransformerDF, Pipeline):
     pass
 
 
-class _FeatureUnionWrapperDF(_TransformerWrapperDF[FeatureUnion], metaclass=ABCMeta):
+class _FeatureUnionWrapperDF(
+    _TransformerWrapperDF[FeatureUnion], _StepProfilingMixin, metaclass=ABCMeta
+):
     @staticmethod
     def _prepend_features_out(features_out: pd.Index, name_prefix: str) -> pd.Index:
         return pd.Index(data=f"{name_prefix}__" + features_out.astype(str))
@@ -240,6 +475,12 @@ class _FeatureUnionWrapperDF(_TransformerWrapperDF[FeatureUnion], metaclass=ABCM
             )
         )
 
+    # noinspection PyPep8Naming
+    def _profile_steps(self, profiler: _StepProfiler, X: pd.DataFrame) -> None:
+        # noinspection PyProtectedMember
+        for name, transformer, _ in self.native_estimator._iter():
+            profiler.run_step(name, transformer, "transform", X)
+
     def _get_features_out(self) -> pd.Index:
         # concatenate output columns from all included transformers other than
         # ones stated as ``None`` or ``"drop"`` or any other string
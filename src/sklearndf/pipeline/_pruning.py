@@ -0,0 +1,101 @@
+"""
+Pruning of the ingoing features of fitted pipelines.
+
+Feature selectors make upstream transformations of unselected features redundant.
+Transformers which transform each column independently of all other columns can be
+restricted to the columns required downstream, and feature selectors become
+redundant once their input is restricted to the selected features.
+"""
+
+import logging
+
+import pandas as pd
+from boruta import BorutaPy
+from sklearn.feature_selection import SelectorMixin
+
+from pytools.api import AllTracker
+
+from .. import EstimatorDF, TransformerDF
+from .._wrapper import _TransformerWrapperDF
+
+log = logging.getLogger(__name__)
+
+__all__ = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class _FeaturePruning:
+    """
+    Utilities to restrict fitted transformers to a subset of their ingoing features.
+    """
+
+    #: Native feature selectors whose output is a subset of their input columns.
+    SELECTOR_TYPES = (SelectorMixin, BorutaPy)
+
+    @staticmethod
+    def is_selector(estimator: EstimatorDF) -> bool:
+        """
+        Check whether the given estimator is a fitted feature selector.
+        """
+        return isinstance(estimator, TransformerDF) and isinstance(
+            estimator.native_estimator, _FeaturePruning.SELECTOR_TYPES
+        )
+
+    @staticmethod
+    def is_column_wise(estimator: EstimatorDF) -> bool:
+        """
+        Check whether the given estimator is a fitted transformer which transforms
+        each column independently of all other columns, preserving all columns, and
+        which can be restricted to a subset of its columns.
+        """
+        # noinspection PyProtectedMember
+        return (
+            isinstance(estimator, _TransformerWrapperDF)
+            and estimator._supports_restriction()
+            and estimator.feature_names_out_.equals(estimator.feature_names_in_)
+        )
+
+    @staticmethod
+    def get_required_features_in(
+        transformer: TransformerDF, features_out: pd.Index
+    ) -> pd.Index:
+        """
+        Get the ingoing features of a selector or column-wise transformer required to
+        produce the given output features, using the features' lineage.
+
+        :param transformer: the fitted selector or column-wise transformer
+        :param features_out: the required output features
+        :return: the required ingoing features, in their original order
+        """
+        features_in = transformer.feature_names_in_
+        return features_in[
+            features_in.isin(transformer.feature_names_original_.loc[features_out])
+        ]
+
+    @staticmethod
+    def prune_column_wise(
+        transformer: _TransformerWrapperDF, features_in: pd.Index
+    ) -> TransformerDF:
+        """
+        Restrict a fitted column-wise transformer to the given ingoing features.
+
+        :param transformer: the fitted column-wise transformer
+        :param features_in: the ingoing features to keep
+        :return: a fitted copy of the transformer, restricted to the given features
+        """
+        # noinspection PyProtectedMember
+        return transformer._restrict(features_in)
+
+
+__tracker.validate()
@@ -57,6 +57,7 @@ from sklearn.tree import DecisionTreeRegressor, ExtraTreeRegressor
 from pytools.api import AllTracker
 
 from .. import RegressorDF, TransformerDF
+from .._tree_ensemble import _TreeEnsembleWrapperDF
 from .._wrapper import _MetaRegressorWrapperDF, _RegressorWrapperDF, df_estimator
 
 # noinspection PyProtectedMember
@@ -558,6 +559,19 @@ class LassoLarsCVDF(RegressorDF, LassoLarsCV):
 #
 
 
+class _TreeEnsembleRegressorWrapperDF(
+    _TreeEnsembleWrapperDF[T_Regressor],
+    _RegressorWrapperDF[T_Regressor],
+    Generic[T_Regressor],
+    metaclass=ABCMeta,
+):
+    """
+    Wraps a random forest, extra trees, or gradient boosting regressor.
+    """
+
+    pass
+
+
 # noinspection PyAbstractClass
 @df_estimator(df_wrapper_type=_RegressorWrapperDF)
 class BaggingRegressorDF(RegressorDF, BaggingRegressor):
@@ -582,7 +596,7 @@ class VotingRegressorDF(RegressorDF, VotingRegressor):
 
 # noinspection PyAbstractClass
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_RegressorWrapperDF)
+@df_estimator(df_wrapper_type=_TreeEnsembleRegressorWrapperDF)
 class GradientBoostingRegressorDF(RegressorDF, GradientBoostingRegressor):
     """
     Wraps :class:`sklearn.ensemble.gradient_boosting.GradientBoostingRegressor`; accepts
@@ -602,7 +616,7 @@ class AdaBoostRegressorDF(RegressorDF, AdaBoostRegressor):
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_RegressorWrapperDF)
+@df_estimator(df_wrapper_type=_TreeEnsembleRegressorWrapperDF)
 class RandomForestRegressorDF(RegressorDF, RandomForestRegressor):
     """
     Wraps :class:`sklearn.ensemble.forest.RandomForestRegressor`; accepts and returns
@@ -613,7 +627,7 @@ class RandomForestRegressorDF(RegressorDF, RandomForestRegressor):
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_RegressorWrapperDF)
+@df_estimator(df_wrapper_type=_TreeEnsembleRegressorWrapperDF)
 class ExtraTreesRegressorDF(RegressorDF, ExtraTreesRegressor):
     """
     Wraps :class:`sklearn.ensemble.forest.ExtraTreesRegressor`; accepts and returns data
@@ -3,6 +3,7 @@ Core implementation of :mod:`sklearndf.regression.extra`
 """
 import logging
 import warnings
+from abc import ABCMeta
 
 from pytools.api import AllTracker
 
@@ -18,6 +19,8 @@ warnings.filterwarnings(
 )
 from lightgbm.sklearn import LGBMRegressor
 
+from ..._lgbm import _LGBMWrapperDF
+
 log = logging.getLogger(__name__)
 
 __all__ = ["LGBMRegressorDF"]
@@ -41,8 +44,14 @@ __tracker = AllTracker(globals())
 #
 
 
+class _LGBMRegressorWrapperDF(
+    _LGBMWrapperDF[LGBMRegressor], _RegressorWrapperDF[LGBMRegressor], metaclass=ABCMeta
+):
+    pass
+
+
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_RegressorWrapperDF)
+@df_estimator(df_wrapper_type=_LGBMRegressorWrapperDF)
 class LGBMRegressorDF(RegressorDF, LGBMRegressor):
     """
     Wraps :class:`lightgbm.sklearn.LGBMRegressor`; accepts and returns data frames.
@@ -19,7 +19,7 @@ Core implementation of :mod:`sklearndf.transformation`
 import logging
 from abc import ABCMeta
 from functools import reduce
-from typing import Iterable, List, TypeVar
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
 
 import numpy as np
 import pandas as pd
@@ -91,14 +91,20 @@ from sklearn.random_projection import GaussianRandomProjection, SparseRandomProj
 from pytools.api import AllTracker
 
 from .. import TransformerDF
+from .._profiling import _StepProfiler, _StepProfilingMixin
 from .._wrapper import _TransformerWrapperDF, df_estimator
 from ._wrapper import (
     _BaseDimensionalityReductionWrapperDF,
     _BaseMultipleInputsPerOutputTransformerWrapperDF,
+    _BinaryOutputTransformerWrapperDF,
+    _CategoricalEncoderWrapperDF,
+    _CategoryPreservingTransformerWrapperDF,
     _ColumnPreservingTransformerWrapperDF,
+    _ColumnWiseTransformerWrapperDF,
     _ComponentsDimensionalityReductionWrapperDF,
     _FeatureSelectionWrapperDF,
     _NComponentsDimensionalityReductionWrapperDF,
+    _restrict_feature_arrays,
 )
 
 log = logging.getLogger(__name__)
@@ -204,7 +210,7 @@ class FeatureAgglomerationDF(TransformerDF, FeatureAgglomeration):
 
 
 class _ColumnTransformerWrapperDF(
-    _TransformerWrapperDF[ColumnTransformer], metaclass=ABCMeta
+    _TransformerWrapperDF[ColumnTransformer], _StepProfilingMixin, metaclass=ABCMeta
 ):
     """
     Wrap :class:`sklearn.compose.ColumnTransformer` and return a DataFrame.
@@ -250,19 +256,119 @@ class _ColumnTransformerWrapperDF(
         return reduce(
             lambda x, y: x.append(y),
             (
-                df_transformer.feature_names_original_
-                for df_transformer in self._inner_transformers()
+                self._get_passthrough_features_original(columns)
+                if df_transformer == "passthrough"
+                else df_transformer.feature_names_original_
+                for df_transformer, columns in self._inner_transformers()
             ),
         )
 
-    def _inner_transformers(self) -> Iterable[_TransformerWrapperDF]:
+    def _get_passthrough_features_original(self, columns: Any) -> pd.Series:
+        # passed-through columns are mapped to themselves
+        features = self._get_column_features(columns, self.feature_names_in_)
+        return pd.Series(index=features, data=features.values)
+
+    @staticmethod
+    def _get_column_features(columns: Any, features_in: pd.Index) -> pd.Index:
+        # get the names of the ingoing features selected by the given column spec
+        if isinstance(columns, slice):
+            if isinstance(columns.start, str) or isinstance(columns.stop, str):
+                # slices of feature names include the stop feature
+                columns = features_in.slice_indexer(
+                    columns.start, columns.stop, columns.step
+                )
+            return features_in[columns]
+        if np.ndim(columns) == 0:
+            columns = [columns]
+        if all(isinstance(column, str) for column in columns):
+            return pd.Index(columns)
+        else:
+            # column positions, or a boolean mask
+            return features_in[columns]
+
+    def _inner_transformers(
+        self,
+    ) -> Iterable[Tuple[Union[_TransformerWrapperDF, str], Any]]:
         return (
-            df_transformer
+            (df_transformer, columns)
             for _, df_transformer, columns in self.native_estimator.transformers_
-            if len(columns) > 0
+            if len(np.atleast_1d(columns)) > 0
             if df_transformer != "drop"
         )
 
+    # noinspection PyPep8Naming
+    def _profile_steps(self, profiler: _StepProfiler, X: pd.DataFrame) -> None:
+        for name, df_transformer, columns in self.native_estimator.transformers_:
+            if isinstance(df_transformer, str) or len(np.atleast_1d(columns)) == 0:
+                # dropped or passed-through columns
+                continue
+            profiler.run_step(
+                name,
+                df_transformer,
+                "transform",
+                X.loc[:, self._get_column_features(columns, self.feature_names_in_)],
+            )
+
+    # noinspection PyPep8Naming
+    def _transform(self, X: pd.DataFrame) -> Union[pd.DataFrame, np.ndarray]:
+        if not self._supports_stacking():
+            return super()._transform(X)
+        return self._stack_transformed(self._convert_X_for_delegate(X))
+
+    # noinspection PyPep8Naming
+    def _fit_transform(
+        self, X: pd.DataFrame, y: Optional[pd.Series], **fit_params
+    ) -> Union[pd.DataFrame, np.ndarray]:
+        if not self._supports_stacking():
+            return super()._fit_transform(X, y, **fit_params)
+        # the native column transformer stacks the outputs of the inner transformers
+        # as a single numpy array when fitting, so we transform the input again to
+        # get the outputs with their original dtypes
+        X = self._convert_X_for_delegate(X)
+        self.native_estimator.fit(X, self._convert_y_for_delegate(y), **fit_params)
+        return self._stack_transformed(X)
+
+    @staticmethod
+    def _transformed_to_df(
+        transformed: Union[pd.DataFrame, np.ndarray], index: pd.Index, columns: pd.Index
+    ) -> pd.DataFrame:
+        if isinstance(transformed, pd.DataFrame) and len(transformed.columns) == len(
+            columns
+        ):
+            # the data frame was created by stacking the outputs of the inner
+            # transformers, so we can safely rename its columns
+            transformed.columns = columns
+        return _TransformerWrapperDF._transformed_to_df(
+            transformed=transformed, index=index, columns=columns
+        )
+
+    def _supports_stacking(self) -> bool:
+        # transformer weights and parallel transforms are only supported by the
+        # native column transformer, which upcasts all outputs to a common dtype
+        column_transformer: ColumnTransformer = self.native_estimator
+        return column_transformer.transformer_weights is None and (
+            column_transformer.n_jobs in (None, 1)
+        )
+
+    # noinspection PyPep8Naming
+    def _stack_transformed(self, X: pd.DataFrame) -> Union[pd.DataFrame, np.ndarray]:
+        # transform the given input using the fitted inner transformers, and
+        # concatenate their output data frames; unlike the native column
+        # transformer, this preserves the dtype of each column, where numpy would
+        # upcast all columns to a common dtype
+        transformed = [
+            X.loc[:, features]
+            if df_transformer == "passthrough"
+            else df_transformer.transform(X.loc[:, features])
+            for df_transformer, features in (
+                (df_transformer, self._get_column_features(columns, X.columns))
+                for df_transformer, columns in self._inner_transformers()
+            )
+        ]
+        if len(transformed) == 0:
+            return np.zeros((len(X), 0))
+        return pd.concat(transformed, axis=1)
+
 
 # noinspection PyAbstractClass,DuplicatedCode
 @df_estimator(df_wrapper_type=_ColumnTransformerWrapperDF)
@@ -342,7 +448,9 @@ class TfidfTransformerDF(TransformerDF, TfidfTransformer):
 # we cannot move this to package _wrapper as it references MissingIndicatorDF
 
 
-class _ImputerWrapperDF(_TransformerWrapperDF[T_Imputer], metaclass=ABCMeta):
+class _ImputerWrapperDF(
+    _CategoryPreservingTransformerWrapperDF[T_Imputer], metaclass=ABCMeta
+):
     """
     Impute missing values with data frames as input and output.
 
@@ -352,6 +460,22 @@ class _ImputerWrapperDF(_TransformerWrapperDF[T_Imputer], metaclass=ABCMeta):
     :class:`impute.SimpleImputer`.
     """
 
+    def _supports_restriction(self) -> bool:
+        # simple imputers impute each column independently; missing indicators are
+        # not supported
+        delegate_estimator = self.native_estimator
+        return (
+            isinstance(delegate_estimator, SimpleImputer)
+            and not delegate_estimator.add_indicator
+        )
+
+    def _restrict_delegate(self, positions: np.ndarray) -> T_Imputer:
+        return _restrict_feature_arrays(
+            self.native_estimator,
+            positions=positions,
+            n_features=len(self.feature_names_in_),
+        )
+
     def _get_features_original(self) -> pd.Series:
         # get the columns that were dropped during imputation
         delegate_estimator = self.native_estimator
@@ -411,8 +535,25 @@ class SimpleImputerDF(TransformerDF, SimpleImputer):
 
 
 class _MissingIndicatorWrapperDF(
-    _TransformerWrapperDF[MissingIndicator], metaclass=ABCMeta
+    _BinaryOutputTransformerWrapperDF[MissingIndicator], metaclass=ABCMeta
 ):
+    def _supports_restriction(self) -> bool:
+        return True
+
+    def _restrict_delegate(self, positions: np.ndarray) -> MissingIndicator:
+        # keep the indicators of the remaining features
+        features_with_indicator = self.native_estimator.features_
+        delegate_estimator = _restrict_feature_arrays(
+            self.native_estimator,
+            positions=positions,
+            n_features=len(self.feature_names_in_),
+        )
+        delegate_estimator.features_ = np.flatnonzero(
+            np.isin(positions, features_with_indicator)
+        )
+        delegate_estimator._n_features = len(positions)
+        return delegate_estimator
+
     def _get_features_original(self) -> pd.Series:
         features_original: np.ndarray = self.feature_names_in_[
             self.native_estimator.features_
@@ -502,7 +643,7 @@ class NeighborhoodComponentsAnalysisDF(TransformerDF, NeighborhoodComponentsAnal
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ColumnPreservingTransformerWrapperDF)
+@df_estimator(df_wrapper_type=_ColumnWiseTransformerWrapperDF)
 class MinMaxScalerDF(TransformerDF, MinMaxScaler):
     """
     Wraps :class:`sklearn.preprocessing.MinMaxScaler`;
@@ -513,7 +654,7 @@ class MinMaxScalerDF(TransformerDF, MinMaxScaler):
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ColumnPreservingTransformerWrapperDF)
+@df_estimator(df_wrapper_type=_ColumnWiseTransformerWrapperDF)
 class StandardScalerDF(TransformerDF, StandardScaler):
     """
     Wraps :class:`sklearn.preprocessing.StandardScaler`;
@@ -524,7 +665,7 @@ class StandardScalerDF(TransformerDF, StandardScaler):
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ColumnPreservingTransformerWrapperDF)
+@df_estimator(df_wrapper_type=_ColumnWiseTransformerWrapperDF)
 class MaxAbsScalerDF(TransformerDF, MaxAbsScaler):
     """
     Wraps :class:`sklearn.preprocessing.MaxAbsScaler`;
@@ -535,7 +676,7 @@ class MaxAbsScalerDF(TransformerDF, MaxAbsScaler):
 
 
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ColumnPreservingTransformerWrapperDF)
+@df_estimator(df_wrapper_type=_ColumnWiseTransformerWrapperDF)
 class RobustScalerDF(TransformerDF, RobustScaler):
     """
     Wraps :class:`sklearn.preprocessing.RobustScaler`;
@@ -579,9 +720,16 @@ class NormalizerDF(TransformerDF, Normalizer):
     pass
 
 
+class _BinarizerWrapperDF(
+    _BinaryOutputTransformerWrapperDF[Binarizer],
+    _ColumnPreservingTransformerWrapperDF[Binarizer],
+    metaclass=ABCMeta,
+):
+    pass
+
+
 # noinspection PyAbstractClass
-# noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ColumnPreservingTransformerWrapperDF)
+@df_estimator(df_wrapper_type=_BinarizerWrapperDF)
 class BinarizerDF(TransformerDF, Binarizer):
     """
     Wraps :class:`sklearn.preprocessing.Binarizer`;
@@ -668,7 +816,11 @@ class MultiLabelBinarizerDF(TransformerDF, MultiLabelBinarizer):
     pass
 
 
-class _OneHotEncoderWrapperDF(_TransformerWrapperDF[OneHotEncoder], metaclass=ABCMeta):
+class _OneHotEncoderWrapperDF(
+    _BinaryOutputTransformerWrapperDF[OneHotEncoder],
+    _CategoricalEncoderWrapperDF[OneHotEncoder],
+    metaclass=ABCMeta,
+):
     """
     One-hot encoder with dataframes as input and output.
 
@@ -682,6 +834,82 @@ class _OneHotEncoderWrapperDF(_TransformerWrapperDF[OneHotEncoder], metaclass=AB
         if self.native_estimator.sparse:
             raise NotImplementedError("sparse matrices not supported; use sparse=False")
 
+    def _supports_direct_encoding(self) -> bool:
+        # dropped and infrequent categories do not map to one output column per
+        # fitted category
+        native = self.native_estimator
+        return (
+            getattr(native, "drop", None) is None
+            and not getattr(native, "_infrequent_enabled", False)
+            and all(
+                categories is None
+                for categories in getattr(native, "infrequent_categories_", [])
+            )
+        )
+
+    # attributes of the encoder with one list element per ingoing feature, across
+    # the supported versions of scikit-learn
+    _FEATURE_LISTS = (
+        "categories",
+        "drop",
+        "categories_",
+        "_n_features_outs",
+        "_infrequent_indices",
+        "_default_to_infrequent_mappings",
+    )
+
+    def _supports_restriction(self) -> bool:
+        # the encoder can only be restricted if all its lists with one element per
+        # ingoing feature are known; otherwise, all features are transformed
+        n_features = len(self.feature_names_in_)
+        return all(
+            name in self._FEATURE_LISTS
+            for name, value in vars(self.native_estimator).items()
+            if isinstance(value, list) and len(value) == n_features
+        )
+
+    def _restrict_delegate(self, positions: np.ndarray) -> OneHotEncoder:
+        n_features = len(self.feature_names_in_)
+        delegate_estimator = _restrict_feature_arrays(
+            self.native_estimator, positions=positions, n_features=n_features
+        )
+        # keep the categories and other per-feature state of the remaining features
+        for name in self._FEATURE_LISTS:
+            value = getattr(delegate_estimator, name, None)
+            if isinstance(value, list) and len(value) == n_features:
+                setattr(
+                    delegate_estimator,
+                    name,
+                    [value[position] for position in positions],
+                )
+        return delegate_estimator
+
+    def _ignores_unknown_categories(self) -> bool:
+        return self.native_estimator.handle_unknown == "ignore"
+
+    def _encode_indices(
+        self, category_indices: Sequence[np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        # set the one-hot columns by scattering ones into a zero matrix
+        n_categories = [
+            len(categories) for categories in self.native_estimator.categories_
+        ]
+        offsets = np.cumsum([0, *n_categories[:-1]])
+        encoded = np.zeros(
+            shape=(n_rows, sum(n_categories)), dtype=self.native_estimator.dtype
+        )
+        rows = np.arange(n_rows)
+
+        for offset, indices in zip(offsets, category_indices):
+            known = indices >= 0
+            if known.all():
+                encoded[rows, offset + indices] = 1
+            else:
+                # unknown categories are encoded as all zeros
+                encoded[rows[known], offset + indices[known]] = 1
+
+        return encoded
+
     def _get_features_original(self) -> pd.Series:
         """
         Return the series mapping output column names to original columns names.
@@ -689,16 +917,25 @@ class _OneHotEncoderWrapperDF(_TransformerWrapperDF[OneHotEncoder], metaclass=AB
         :return: the series with index the column names of the output dataframe and
         values the corresponding input column names.
         """
+        delegate_estimator = self.native_estimator
+
+        # dropped categories do not produce an output column
+        drop_idx = getattr(delegate_estimator, "drop_idx_", None)
+        if drop_idx is None:
+            n_dropped = [0] * len(delegate_estimator.categories_)
+        else:
+            n_dropped = [0 if idx is None else 1 for idx in drop_idx]
+
         return pd.Series(
             index=pd.Index(
-                self.native_estimator.get_feature_names(self.feature_names_in_)
+                delegate_estimator.get_feature_names(self.feature_names_in_)
             ),
             data=[
                 column_original
-                for column_original, category in zip(
-                    self.feature_names_in_, self.native_estimator.categories_
+                for column_original, category, n in zip(
+                    self.feature_names_in_, delegate_estimator.categories_, n_dropped
                 )
-                for _ in category
+                for _ in range(len(category) - n)
             ],
         )
 
@@ -714,8 +951,24 @@ class OneHotEncoderDF(TransformerDF, OneHotEncoder):
     pass
 
 
+class _OrdinalEncoderWrapperDF(
+    _CategoricalEncoderWrapperDF[OrdinalEncoder],
+    _ColumnPreservingTransformerWrapperDF[OrdinalEncoder],
+    metaclass=ABCMeta,
+):
+    def _encode_indices(
+        self, category_indices: Sequence[np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        encoded = np.empty(
+            shape=(n_rows, len(category_indices)), dtype=self.native_estimator.dtype
+        )
+        for position, indices in enumerate(category_indices):
+            encoded[:, position] = indices
+        return encoded
+
+
 # noinspection PyAbstractClass
-@df_estimator(df_wrapper_type=_ColumnPreservingTransformerWrapperDF)
+@df_estimator(df_wrapper_type=_OrdinalEncoderWrapperDF)
 class OrdinalEncoderDF(TransformerDF, OrdinalEncoder):
     """
     Wraps :class:`sklearn.preprocessing.OrdinalEncoder`;
@@ -726,7 +979,7 @@ class OrdinalEncoderDF(TransformerDF, OrdinalEncoder):
 
 
 class _KBinsDiscretizerWrapperDF(
-    _TransformerWrapperDF[KBinsDiscretizer], metaclass=ABCMeta
+    _BinaryOutputTransformerWrapperDF[KBinsDiscretizer], metaclass=ABCMeta
 ):
     def _validate_delegate_estimator(self) -> None:
         if self.native_estimator.encode == "onehot":
@@ -735,6 +988,10 @@ class _KBinsDiscretizerWrapperDF(
                 'consider using "onehot-dense" instead'
             )
 
+    def _has_binary_output(self) -> bool:
+        # ordinal encoding produces bin indices, not binary outputs
+        return self.native_estimator.encode == "onehot-dense"
+
     def _get_features_original(self) -> pd.Series:
         """
         Return the series mapping output column names to original columns names.
@@ -2,14 +2,17 @@
 Specialised transformer wrappers.
 """
 
+import copy
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Any, Generic, Optional, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar, Union
 
+import numpy as np
 import pandas as pd
 from sklearn.base import TransformerMixin
 
-from .._wrapper import _TransformerWrapperDF
+from .. import get_config
+from .._wrapper import _df_to_float_dtype, _TransformerWrapperDF
 
 log = logging.getLogger(__name__)
 
@@ -18,6 +21,7 @@ log = logging.getLogger(__name__)
 # type variables
 #
 
+T_Estimator = TypeVar("T_Estimator")
 T_Transformer = TypeVar("T_Transformer", bound=TransformerMixin)
 
 
@@ -34,11 +38,107 @@ class _NDArrayTransformerWrapperDF(
 
     Wraps around the delegate transformer and converts the data frame to an array when
     needed.
+
+    Only numeric features are supported. The data frame is converted one dtype block
+    at a time, so that mixed numeric frames (e.g., combining boolean, integer,
+    floating point, or categorical columns with numeric categories) are converted to
+    a numeric array without first being upcast to an array of Python objects.
     """
 
     # noinspection PyPep8Naming
     def _convert_X_for_delegate(self, X: pd.DataFrame) -> Any:
-        return super()._convert_X_for_delegate(X).values
+        X = super()._convert_X_for_delegate(X)
+
+        non_numeric_columns = [
+            column
+            for column, dtype in X.dtypes.items()
+            if not self._is_numeric_dtype(dtype)
+        ]
+        if non_numeric_columns:
+            raise TypeError(
+                f"{type(self.native_estimator).__name__} only supports numeric "
+                f"features, but got non-numeric columns: "
+                f"{', '.join(map(str, non_numeric_columns))}"
+            )
+
+        return self._to_numeric_array(X)
+
+    @staticmethod
+    def _is_numeric_dtype(dtype: Any) -> bool:
+        if isinstance(dtype, pd.CategoricalDtype):
+            return dtype.categories.dtype.kind in "biuf"
+        else:
+            return pd.api.types.is_bool_dtype(dtype) or (
+                pd.api.types.is_numeric_dtype(dtype)
+                and not pd.api.types.is_timedelta64_dtype(dtype)
+            )
+
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _to_numeric_array(X: pd.DataFrame) -> np.ndarray:
+        # convert a data frame with numeric columns to a numpy array, converting
+        # the columns one dtype block at a time
+
+        # group the column positions by dtype
+        blocks: Dict[Any, List[int]] = {}
+        for position, dtype in enumerate(X.dtypes):
+            blocks.setdefault(dtype, []).append(position)
+
+        block_dtypes = {
+            dtype: _NDArrayTransformerWrapperDF._numpy_dtype(dtype, X, positions)
+            for dtype, positions in blocks.items()
+        }
+
+        if len(blocks) == 1:
+            # homogeneous frame: pandas converts this without any upcasting
+            (dtype,) = blocks
+            if isinstance(dtype, np.dtype):
+                return X.values
+
+        if len(blocks) == 0:
+            result_dtype = np.float64
+        else:
+            result_dtype = np.result_type(*block_dtypes.values())
+
+        array = np.empty(shape=X.shape, dtype=result_dtype)
+
+        for dtype, positions in blocks.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                # take values straight from the categories, one column at a time
+                for position in positions:
+                    column: pd.Series = X.iloc[:, position]
+                    codes = column.cat.codes.values
+                    values = dtype.categories.values.astype(result_dtype)[codes]
+                    missing = codes < 0
+                    if missing.any():
+                        values[missing] = np.nan
+                    array[:, position] = values
+            elif isinstance(dtype, np.dtype):
+                array[:, positions] = X.iloc[:, positions].values
+            else:
+                # nullable extension dtype: missing values become NaN
+                array[:, positions] = X.iloc[:, positions].astype(result_dtype).values
+
+        return array
+
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _numpy_dtype(dtype: Any, X: pd.DataFrame, positions: List[int]) -> np.dtype:
+        # get the numpy dtype required to represent columns of the given dtype
+        if isinstance(dtype, np.dtype):
+            return dtype
+        elif isinstance(dtype, pd.CategoricalDtype):
+            categories_dtype = dtype.categories.dtype
+            if any(
+                (X.iloc[:, position].cat.codes.values < 0).any()
+                for position in positions
+            ):
+                # missing values need to be represented as NaN
+                return np.result_type(categories_dtype, np.float64)
+            else:
+                return categories_dtype
+        else:
+            return np.dtype(np.float64)
 
     def _convert_y_for_delegate(
         self, y: Optional[Union[pd.Series, pd.DataFrame]]
@@ -47,6 +147,219 @@ class _NDArrayTransformerWrapperDF(
         return None if y is None else y.values
 
 
+class _BinaryOutputTransformerWrapperDF(
+    _TransformerWrapperDF[T_Transformer], Generic[T_Transformer], metaclass=ABCMeta
+):
+    """
+    ``TransformerDF`` whose delegate transformer produces only zeros and ones.
+
+    Converts the output of the delegate transformer to the ``binary_dtype`` of the
+    global configuration (see :func:`.set_config`), if set.
+    """
+
+    # noinspection PyPep8Naming
+    def _transform(self, X: pd.DataFrame) -> np.ndarray:
+        return self._to_binary_dtype(super()._transform(X))
+
+    # noinspection PyPep8Naming
+    def _fit_transform(
+        self, X: pd.DataFrame, y: Optional[pd.Series], **fit_params
+    ) -> np.ndarray:
+        return self._to_binary_dtype(super()._fit_transform(X, y, **fit_params))
+
+    def _has_binary_output(self) -> bool:
+        # override if the delegate produces binary outputs only for some parameters
+        return True
+
+    def _to_binary_dtype(
+        self, transformed: Union[np.ndarray, pd.DataFrame]
+    ) -> Union[np.ndarray, pd.DataFrame]:
+        binary_dtype: Optional[np.dtype] = get_config()["binary_dtype"]
+        if (
+            binary_dtype is None
+            or not self._has_binary_output()
+            or not isinstance(transformed, (np.ndarray, pd.DataFrame))
+        ):
+            return transformed
+        else:
+            return transformed.astype(binary_dtype)
+
+
+class _CategoryPreservingTransformerWrapperDF(
+    _TransformerWrapperDF[T_Transformer], Generic[T_Transformer], metaclass=ABCMeta
+):
+    """
+    ``TransformerDF`` whose delegate passes the values of input columns through to
+    output columns of the same name, e.g., an imputer.
+
+    Delegates return mixed-dtype data frames as arrays of Python objects; the dtypes
+    of output columns are restored from their input columns.
+    Categorical input columns remain categorical if all their output values are
+    categories of the input column, e.g., after imputing the most frequent category.
+    """
+
+    # noinspection PyPep8Naming
+    def transform(
+        self, X: pd.DataFrame, columns: Optional[Sequence[Any]] = None
+    ) -> pd.DataFrame:
+        """[see superclass]"""
+        return self._restore_dtypes(X, super().transform(X, columns=columns))
+
+    # noinspection PyPep8Naming
+    def fit_transform(
+        self, X: pd.DataFrame, y: Optional[pd.Series] = None, **fit_params
+    ) -> pd.DataFrame:
+        """[see superclass]"""
+        return self._restore_dtypes(X, super().fit_transform(X, y, **fit_params))
+
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _restore_dtypes(X: pd.DataFrame, transformed: pd.DataFrame) -> pd.DataFrame:
+        input_dtypes: pd.Series = X.dtypes
+        restore: List[Any] = [
+            column
+            for column, dtype in transformed.dtypes.items()
+            if dtype == object
+            and column in input_dtypes.index
+            and input_dtypes[column] != object
+        ]
+        if not restore or not transformed.columns.is_unique:
+            return transformed
+
+        transformed = transformed.copy(deep=False)
+        for column in restore:
+            values: pd.Series = transformed[column]
+            input_dtype = input_dtypes[column]
+            if isinstance(input_dtype, pd.CategoricalDtype):
+                if values[values.notna()].isin(input_dtype.categories).all():
+                    transformed[column] = values.astype(input_dtype)
+            else:
+                transformed[column] = values.infer_objects()
+
+        return _df_to_float_dtype(transformed)
+
+
+class _CategoricalEncoderWrapperDF(
+    _TransformerWrapperDF[T_Transformer], Generic[T_Transformer], metaclass=ABCMeta
+):
+    """
+    ``TransformerDF`` whose delegate encodes categorical features, e.g., an ordinal or
+    one-hot encoder.
+
+    If all features are pandas categoricals, the features are encoded directly from
+    their integer category codes, without first converting them to arrays of
+    category values and looking up each value among the fitted categories.
+    For each input column, the category codes of the input dtype are mapped to the
+    indices of the categories learned during fitting; these mappings are computed
+    once per input dtype and are reused across transforms.
+
+    Inputs not suitable for the direct encoding, e.g., with missing values or with
+    unknown categories, are passed on to the delegate encoder.
+
+    Implementations must define :meth:`_encode_indices`.
+    """
+
+    # noinspection PyPep8Naming
+    def _transform(self, X: pd.DataFrame) -> np.ndarray:
+        if self._is_categorical(X) and self._supports_direct_encoding():
+            category_indices = self._category_indices(self._convert_X_for_delegate(X))
+            if category_indices is not None:
+                return self._encode_indices(
+                    category_indices=category_indices, n_rows=len(X)
+                )
+
+        return super()._transform(X)
+
+    # noinspection PyPep8Naming
+    def _fit_transform(
+        self, X: pd.DataFrame, y: Optional[pd.Series], **fit_params
+    ) -> np.ndarray:
+        if self._is_categorical(X) and self._supports_direct_encoding():
+            self.native_estimator.fit(
+                self._convert_X_for_delegate(X),
+                self._convert_y_for_delegate(y),
+                **fit_params,
+            )
+            return self._transform(X)
+        else:
+            return super()._fit_transform(X, y, **fit_params)
+
+    def _reset_fit(self) -> None:
+        try:
+            # noinspection PyProtectedMember
+            super()._reset_fit()
+        finally:
+            self._category_index_maps: Dict[Tuple[int, Any], np.ndarray] = {}
+
+    def _supports_direct_encoding(self) -> bool:
+        # override to restrict direct encoding to specific encoder parameters
+        return True
+
+    def _ignores_unknown_categories(self) -> bool:
+        # override if the encoder encodes unknown categories as all zeros
+        return False
+
+    @abstractmethod
+    def _encode_indices(
+        self, category_indices: Sequence[np.ndarray], n_rows: int
+    ) -> np.ndarray:
+        # encode the features given the indices of their values in the fitted
+        # categories; unknown categories have index -1
+        pass
+
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _is_categorical(X: pd.DataFrame) -> bool:
+        return len(X.columns) > 0 and all(
+            isinstance(dtype, pd.CategoricalDtype) for dtype in X.dtypes
+        )
+
+    # noinspection PyPep8Naming
+    def _category_indices(self, X: pd.DataFrame) -> Optional[List[np.ndarray]]:
+        # get the indices of the feature values in the fitted categories, for each
+        # feature; return None if direct encoding is not possible for the given input
+
+        # noinspection PyUnresolvedReferences
+        fitted_categories: List[np.ndarray] = self.native_estimator.categories_
+        ignore_unknown = self._ignores_unknown_categories()
+
+        category_indices: List[np.ndarray] = []
+
+        for position, (dtype, categories) in enumerate(
+            zip(X.dtypes, fitted_categories)
+        ):
+            codes: np.ndarray = X.iloc[:, position].cat.codes.values
+
+            if (codes < 0).any():
+                # missing values are handled by the delegate encoder
+                return None
+
+            index_map = self._category_index_map(
+                position=position, dtype=dtype, fitted_categories=categories
+            )
+            indices = index_map[codes]
+
+            if not ignore_unknown and (indices < 0).any():
+                # unknown categories are handled by the delegate encoder
+                return None
+
+            category_indices.append(indices)
+
+        return category_indices
+
+    def _category_index_map(
+        self, position: int, dtype: pd.CategoricalDtype, fitted_categories: np.ndarray
+    ) -> np.ndarray:
+        # map the category codes of the given input dtype to the indices of the
+        # fitted categories, or to -1 for unknown categories
+        key = (position, dtype)
+        index_map = self._category_index_maps.get(key, None)
+        if index_map is None:
+            index_map = pd.Index(fitted_categories).get_indexer(dtype.categories)
+            self._category_index_maps[key] = index_map
+        return index_map
+
+
 class _ColumnSubsetTransformerWrapperDF(
     _TransformerWrapperDF[T_Transformer], Generic[T_Transformer], metaclass=ABCMeta
 ):
@@ -86,6 +399,30 @@ class _ColumnPreservingTransformerWrapperDF(
         return self.feature_names_in_
 
 
+class _ColumnWiseTransformerWrapperDF(
+    _ColumnPreservingTransformerWrapperDF[T_Transformer],
+    Generic[T_Transformer],
+    metaclass=ABCMeta,
+):
+    """
+    Transform each column of a data frame independently of all other columns, keeping
+    exactly the same columns, e.g., a scaler.
+
+    The fitted state of the delegate transformer consists of arrays with one value per
+    column, so that the transformer can be restricted to a subset of its columns.
+    """
+
+    def _supports_restriction(self) -> bool:
+        return True
+
+    def _restrict_delegate(self, positions: np.ndarray) -> T_Transformer:
+        return _restrict_feature_arrays(
+            self.native_estimator,
+            positions=positions,
+            n_features=len(self.feature_names_in_),
+        )
+
+
 class _BaseMultipleInputsPerOutputTransformerWrapperDF(
     _TransformerWrapperDF[T_Transformer], Generic[T_Transformer], metaclass=ABCMeta
 ):
@@ -194,3 +531,22 @@ class _FeatureSelectionWrapperDF(
     def _get_features_out(self) -> pd.Index:
         get_support = getattr(self.native_estimator, self._ATTR_GET_SUPPORT)
         return self.feature_names_in_[get_support()]
+
+
+#
+# private functions
+#
+
+
+def _restrict_feature_arrays(
+    estimator: T_Estimator, positions: np.ndarray, n_features: int
+) -> T_Estimator:
+    # make a shallow copy of the given estimator, restricting all arrays with one
+    # value per ingoing feature to the features at the given positions
+    restricted = copy.copy(estimator)
+    for name, value in vars(estimator).items():
+        if isinstance(value, np.ndarray) and value.shape[:1] == (n_features,):
+            setattr(restricted, name, value[positions])
+    if hasattr(restricted, "n_features_in_"):
+        restricted.n_features_in_ = len(positions)
+    return restricted
@@ -0,0 +1,485 @@
+"""
+Boruta feature selection engine used by :class:`.BorutaDF`.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import lightgbm
+import numpy as np
+from boruta import BorutaPy
+from joblib import Parallel, delayed, effective_n_jobs
+from lightgbm.sklearn import LGBMClassifier, LGBMModel, LGBMRegressor
+from sklearn.base import BaseEstimator, clone
+from sklearn.utils import check_random_state
+
+from pytools.api import AllTracker
+
+log = logging.getLogger(__name__)
+
+__all__: List[str] = []
+
+
+#
+# Ensure all symbols introduced below are included in __all__
+#
+
+__tracker = AllTracker(globals())
+
+
+#
+# Class definitions
+#
+
+
+class _ShadowBuffer:
+    # a preallocated array holding the current features in its leading columns,
+    # followed by their shuffled copies (the "shadow" features)
+
+    # the minimum number of shadow features, as per BorutaPy
+    MIN_SHADOWS = 5
+
+    def __init__(self, n_rows: int, n_features: int, dtype: np.dtype) -> None:
+        n_shadows_max = max(n_features, 2 * (self.MIN_SHADOWS - 1))
+        # use column-major order so that each feature is a contiguous column
+        self.data = np.empty(
+            shape=(n_rows, n_features + n_shadows_max), dtype=dtype, order="F"
+        )
+        # the features currently stored in the buffer, or None if the buffer holds
+        # a subsample of rows that must not be reused
+        self.features: Optional[np.ndarray] = None
+        # a LightGBM dataset holding the bin mappers for the current features and
+        # their shadows, along with the features it was constructed for
+        self.lgbm_reference: Optional[lightgbm.Dataset] = None
+        self.lgbm_reference_features: Optional[np.ndarray] = None
+
+    def fill(
+        self,
+        X: np.ndarray,
+        features: np.ndarray,
+        rows: Optional[np.ndarray],
+        random_state: np.random.RandomState,
+    ) -> np.ndarray:
+        # copy the given features and rows of X into the buffer and add freshly
+        # shuffled shadow features; return the view of the buffer that is in use
+
+        n_features = len(features)
+        n_shadows = n_features
+        while n_shadows < self.MIN_SHADOWS:
+            n_shadows *= 2
+
+        data = self.data[:, : n_features + n_shadows]
+
+        if (
+            rows is not None
+            or self.features is None
+            or not np.array_equal(self.features, features)
+        ):
+            for column, feature in enumerate(features):
+                if rows is None:
+                    data[:, column] = X[:, feature]
+                else:
+                    np.take(X[:, feature], rows, out=data[:, column])
+            self.features = features if rows is None else None
+
+        for column in range(n_shadows):
+            shadow = data[:, n_features + column]
+            shadow[:] = data[:, column % n_features]
+            random_state.shuffle(shadow)
+
+        return data
+
+
+class _ParallelBorutaPy(BorutaPy):
+    """
+    Boruta feature selection, extending :class:`BorutaPy` with parallel
+    importance fits, row subsampling, and re-use of the shadow feature matrix.
+
+    Independent importance fits are run in batches of ``n_jobs`` parallel threads,
+    each re-using its own preallocated matrix of real and shadow features;
+    the hits of each batch are then tested iteration by iteration, as in
+    :class:`BorutaPy`.
+    Feature selection stops as soon as all features are either confirmed or
+    rejected.
+    """
+
+    def __init__(
+        self,
+        estimator: BaseEstimator,
+        n_estimators: Union[int, str] = 1000,
+        perc: int = 100,
+        alpha: float = 0.05,
+        two_step: bool = True,
+        max_iter: int = 100,
+        random_state: Union[int, np.random.RandomState, None] = None,
+        verbose: int = 0,
+        early_stopping: bool = False,
+        n_iter_no_change: int = 20,
+        n_jobs: Optional[int] = None,
+        max_samples: Union[int, float, None] = None,
+    ) -> None:
+        # we set all parameters here rather than passing them on to BorutaPy,
+        # since older versions of BorutaPy do not support all of them
+        # noinspection PyTypeChecker
+        super().__init__(estimator=estimator)
+        self.n_estimators = n_estimators
+        self.perc = perc
+        self.alpha = alpha
+        self.two_step = two_step
+        self.max_iter = max_iter
+        self.random_state = random_state
+        self.verbose = verbose
+        self.early_stopping = early_stopping
+        self.n_iter_no_change = n_iter_no_change
+        self.n_jobs = n_jobs
+        self.max_samples = max_samples
+
+    # noinspection PyPep8Naming
+    def _fit(self, X: np.ndarray, y: np.ndarray) -> "_ParallelBorutaPy":
+        self._check_params(X, y)
+
+        if not isinstance(X, np.ndarray):
+            X = self._validate_pandas_input(X)
+        if not isinstance(y, np.ndarray):
+            y = self._validate_pandas_input(y)
+
+        random_state = check_random_state(self.random_state)
+
+        n_samples, n_features = X.shape
+        n_rows = self._get_n_rows(n_samples)
+        n_jobs = effective_n_jobs(self.n_jobs)
+
+        early_stopping = self.early_stopping and self.n_iter_no_change < self.max_iter
+        n_same_iter = 1
+        dec_reg_last: Optional[np.ndarray] = None
+
+        # decisions for each feature: 0 = tentative, 1 = confirmed, -1 = rejected
+        dec_reg = np.zeros(n_features, dtype=int)
+        # the number of times each feature was more important than the shadows
+        hit_reg = np.zeros(n_features, dtype=int)
+        imp_history: List[np.ndarray] = [np.zeros(n_features)]
+        sha_max_history: List[float] = []
+
+        buffers = [
+            _ShadowBuffer(
+                n_rows=n_rows,
+                n_features=n_features,
+                dtype=X.dtype if X.dtype.kind == "f" else np.float64,
+            )
+            for _ in range(n_jobs)
+        ]
+
+        _iter = 1
+        stop = False
+
+        with Parallel(n_jobs=n_jobs, prefer="threads") as parallel:
+            while not stop and np.any(dec_reg == 0) and _iter < self.max_iter:
+                features = np.flatnonzero(dec_reg >= 0)
+                n_fits = min(n_jobs, self.max_iter - _iter)
+                seeds = random_state.randint(np.iinfo(np.int32).max, size=(n_fits, 2))
+
+                # create all tasks up front, so estimators are created in this
+                # thread
+                tasks = [
+                    delayed(self._get_importances)(
+                        X,
+                        y,
+                        features=features,
+                        buffer=buffer,
+                        estimator=self._make_estimator(
+                            n_features=len(features), seed=seed_estimator
+                        ),
+                        random_state=np.random.RandomState(seed_shuffle),
+                    )
+                    for buffer, (seed_estimator, seed_shuffle) in zip(buffers, seeds)
+                ]
+                importances: List[Tuple[np.ndarray, np.ndarray]] = parallel(tasks)
+
+                for imp_features, imp_shadows in importances:
+                    imp_real = np.full(n_features, np.nan)
+                    imp_real[features] = imp_features
+                    # ignore features rejected by an earlier fit in this batch
+                    imp_real[dec_reg < 0] = np.nan
+
+                    imp_sha_max = np.percentile(imp_shadows, self.perc)
+                    sha_max_history.append(imp_sha_max)
+                    imp_history.append(imp_real)
+
+                    hit_reg[np.nan_to_num(imp_real) > imp_sha_max] += 1
+                    dec_reg = self._do_tests(dec_reg, hit_reg, _iter)
+
+                    if self.verbose > 0:
+                        self._print_results(dec_reg, _iter, 0)
+                    _iter += 1
+
+                    if early_stopping:
+                        if dec_reg_last is not None and np.array_equal(
+                            dec_reg_last, dec_reg
+                        ):
+                            n_same_iter += 1
+                        else:
+                            n_same_iter = 1
+                            dec_reg_last = dec_reg.copy()
+                        if n_same_iter > self.n_iter_no_change:
+                            stop = True
+
+                    if stop or not np.any(dec_reg == 0):
+                        stop = True
+                        break
+
+        self._set_results(
+            dec_reg=dec_reg,
+            imp_history=np.vstack(imp_history),
+            sha_max_history=sha_max_history,
+        )
+
+        if self.verbose > 0:
+            self._print_results(dec_reg, _iter, 1)
+
+        return self
+
+    def _get_n_rows(self, n_samples: int) -> int:
+        max_samples = self.max_samples
+        if max_samples is None:
+            return n_samples
+        elif isinstance(max_samples, (int, np.integer)) and not isinstance(
+            max_samples, bool
+        ):
+            if not 1 <= max_samples <= n_samples:
+                raise ValueError(
+                    f"arg max_samples must be in the range [1, {n_samples}] "
+                    f"but is {max_samples}"
+                )
+            return int(max_samples)
+        elif isinstance(max_samples, float):
+            if not 0.0 < max_samples <= 1.0:
+                raise ValueError(
+                    f"arg max_samples must be in the range (0.0, 1.0] "
+                    f"but is {max_samples}"
+                )
+            return max(round(n_samples * max_samples), 1)
+        else:
+            raise TypeError(
+                f"arg max_samples must be an int, a float, or None "
+                f"but is a {type(max_samples).__name__}"
+            )
+
+    def _make_estimator(self, n_features: int, seed: int) -> BaseEstimator:
+        estimator: BaseEstimator = clone(self.estimator)
+
+        if self.n_estimators == "auto":
+            n_estimators = self._get_tree_num(n_features)
+        else:
+            n_estimators = self.n_estimators
+
+        return estimator.set_params(n_estimators=n_estimators, random_state=seed)
+
+    # noinspection PyPep8Naming
+    def _get_importances(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        *,
+        features: np.ndarray,
+        buffer: _ShadowBuffer,
+        estimator: BaseEstimator,
+        random_state: np.random.RandomState,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # fit the estimator to the current features and their shadows, and return
+        # the importances of the current features and of the shadow features
+
+        n_samples = len(X)
+        n_rows = len(buffer.data)
+
+        if n_rows < n_samples:
+            rows = np.sort(random_state.choice(n_samples, size=n_rows, replace=False))
+            y = y[rows]
+        else:
+            rows = None
+
+        X_fit = buffer.fill(X, features=features, rows=rows, random_state=random_state)
+
+        try:
+            if _is_lgbm_native_supported(estimator):
+                importances = _get_lgbm_importances(
+                    estimator, X=X_fit, y=y, features=features, buffer=buffer
+                )
+            else:
+                estimator.fit(X_fit, y)
+                importances = None
+        except Exception as e:
+            raise ValueError(
+                "Please check your X and y variable. The provided "
+                "estimator cannot be fitted to your data.\n" + str(e)
+            )
+
+        if importances is None:
+            importances = self._get_feature_importances(estimator)
+        n_features = len(features)
+        return importances[:n_features], importances[n_features:]
+
+    def _get_tree_num(self, n_feat: int) -> int:
+        # as in BorutaPy, but treating non-positive depths like unlimited depth,
+        # as LightGBM does
+        params = self.estimator.get_params()
+        if "max_depth" not in params:
+            log.warning(
+                "The estimator does not have a max_depth property, as a result "
+                "the number of trees to use cannot be estimated automatically."
+            )
+        depth = params.get("max_depth", None)
+        if depth is None or depth <= 0:
+            depth = 10
+        # consider each feature 100 times on average, among the real and shadow
+        # features
+        return int(100 * (n_feat * 2) / (np.sqrt(n_feat * 2) * depth))
+
+    @staticmethod
+    def _get_feature_importances(estimator: Any) -> np.ndarray:
+        try:
+            return estimator.feature_importances_
+        except Exception:
+            raise ValueError(
+                "Only methods with feature_importance_ attribute "
+                "are currently supported in BorutaPy."
+            )
+
+    def _set_results(
+        self,
+        dec_reg: np.ndarray,
+        imp_history: np.ndarray,
+        sha_max_history: List[float],
+    ) -> None:
+        # set the fitted attributes from the decisions and importance history,
+        # as in BorutaPy
+
+        n_features = len(dec_reg)
+
+        # apply the rough fix for tentative features, as in the Boruta R package
+        confirmed = np.flatnonzero(dec_reg == 1)
+        tentative = np.flatnonzero(dec_reg == 0)
+        # ignore the first row of zeros
+        tentative_median = np.median(imp_history[1:, tentative], axis=0)
+        tentative = tentative[tentative_median > np.median(sha_max_history)]
+
+        self.n_features_ = len(confirmed)
+        self.support_ = np.zeros(n_features, dtype=bool)
+        self.support_[confirmed] = True
+        self.support_weak_ = np.zeros(n_features, dtype=bool)
+        self.support_weak_[tentative] = True
+
+        # confirmed features are rank 1, tentative features rank 2
+        self.ranking_ = np.ones(n_features, dtype=int)
+        self.ranking_[tentative] = 2
+
+        # rank all rejected features by their importance history
+        selected = np.hstack((confirmed, tentative))
+        not_selected = np.setdiff1d(np.arange(n_features), selected)
+
+        if len(not_selected) > 0:
+            # large importance values should have lower ranks
+            imp_history_rejected = imp_history[1:, not_selected] * -1
+            # rank features in each iteration, then take the median of ranks
+            iter_ranks = self._nanrankdata(imp_history_rejected, axis=1)
+            rank_medians = np.nanmedian(iter_ranks, axis=0)
+            ranks = self._nanrankdata(rank_medians, axis=0)
+            self.ranking_[not_selected] = (
+                ranks - np.min(ranks) + (3 if len(tentative) > 0 else 2)
+            )
+        else:
+            # all features are selected
+            self.support_ = np.ones(n_features, dtype=bool)
+
+        self.importance_history_ = imp_history
+
+
+#
+# LightGBM importance backend
+#
+
+
+def _is_lgbm_native_supported(estimator: BaseEstimator) -> bool:
+    # we train LightGBM boosters directly for LightGBM regressors and classifiers
+    # with standard objectives; all other estimators are fitted using their own
+    # fit method
+    return (
+        isinstance(estimator, (LGBMRegressor, LGBMClassifier))
+        and not callable(estimator.objective)
+        and estimator.class_weight is None
+    )
+
+
+# noinspection PyPep8Naming
+def _get_lgbm_importances(
+    estimator: LGBMModel,
+    X: np.ndarray,
+    y: np.ndarray,
+    features: np.ndarray,
+    buffer: _ShadowBuffer,
+) -> np.ndarray:
+    # train a LightGBM booster with the parameters of the given estimator, and
+    # return the gain or split importances as per the estimator's importance type;
+    # the bin mappers of the features and their shadows are re-used for as long as
+    # the current features remain unchanged: since shadow features are
+    # permutations of the real features, they share the same bins
+
+    params, label = _get_lgbm_params(estimator, y)
+
+    reference = buffer.lgbm_reference
+    if reference is None or not np.array_equal(
+        buffer.lgbm_reference_features, features
+    ):
+        reference = None
+
+    train_set = lightgbm.Dataset(
+        X, label=label, reference=reference, params=params, free_raw_data=True
+    )
+
+    booster = lightgbm.train(
+        params=params, train_set=train_set, num_boost_round=estimator.n_estimators
+    )
+
+    if reference is None:
+        # keep the constructed dataset as the reference for subsequent fits,
+        # dropping its binned data
+        buffer.lgbm_reference = lightgbm.Dataset(
+            X[:1], label=label[:1], reference=train_set, params=params
+        ).construct()
+        buffer.lgbm_reference_features = features
+
+    booster.free_dataset()
+
+    return booster.feature_importance(importance_type=estimator.importance_type)
+
+
+def _get_lgbm_params(
+    estimator: LGBMModel, y: np.ndarray
+) -> Tuple[Dict[str, Any], np.ndarray]:
+    # get the LightGBM training parameters and the label, as in LGBMModel.fit
+
+    params: Dict[str, Any] = estimator.get_params()
+    for param in ("silent", "importance_type", "n_estimators", "class_weight"):
+        params.pop(param, None)
+    if not any(alias in params for alias in ("verbose", "verbosity")):
+        params["verbose"] = -1
+
+    objective = params.pop("objective", None)
+
+    if isinstance(estimator, LGBMClassifier):
+        classes, label = np.unique(y, return_inverse=True)
+        if len(classes) > 2:
+            params["num_class"] = len(classes)
+            if objective is None:
+                objective = "multiclass"
+        elif objective is None:
+            objective = "binary"
+    else:
+        label = y
+        if objective is None:
+            objective = "regression"
+
+    params["objective"] = objective
+    return params, label
+
+
+__tracker.validate()
@@ -4,17 +4,18 @@ Core implementation of :mod:`sklearndf.transformation.extra`
 
 import logging
 from abc import ABCMeta
-from typing import Optional, TypeVar, Union
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 
+import numpy as np
 import pandas as pd
-from boruta import BorutaPy
 from sklearn.base import BaseEstimator
 
 from pytools.api import AllTracker, inheritdoc
 
 from ... import TransformerDF
-from ..._wrapper import _MetaEstimatorWrapperDF, df_estimator
+from ..._wrapper import _df_to_float_dtype, _MetaEstimatorWrapperDF, df_estimator
 from .._wrapper import _ColumnSubsetTransformerWrapperDF, _NDArrayTransformerWrapperDF
+from ._boruta import _ParallelBorutaPy
 
 log = logging.getLogger(__name__)
 
@@ -49,19 +50,53 @@ class OutlierRemoverDF(TransformerDF, BaseEstimator):
     :math:`[Q_1 - iqr\\_ multiple(Q_3-Q_1), Q_3 + iqr\\_ multiple(Q_3-Q_1)]`
     where :math:`Q_1` and :math:`Q_3` are the lower and upper quartiles.
 
+    The quartiles can be determined approximately, using a mergeable quantile sketch
+    of bounded size for each feature.
+    This way, the outlier remover can be fitted incrementally on chunks of data
+    using :meth:`.partial_fit`, and outlier removers fitted on separate partitions
+    of the data can be combined using :meth:`.merge`.
+
     :param iqr_multiple: the multiple used to define the range of non-outlier
       samples in the above explanation (defaults to 3.0 as per Tukey's definition of
       far outliers)
+    :param approximate: if ``True``, determine approximate quartiles also when
+      fitting with :meth:`.fit`; if ``False``, :meth:`.fit` determines exact
+      quartiles (default: ``False``).
+      Fitting with :meth:`.partial_fit` always uses approximate quartiles
+    :param sketch_size: the size parameter of the quantile sketches used for
+      approximate quartiles; the sketch for each feature holds at most about three
+      times this many values, and the rank error of the approximate quartiles
+      is inversely proportional to the sketch size (default: 200)
+    :param copy: if ``False``, :meth:`.transform` replaces outliers in the values of
+      the input dataframe in place where possible, and may return a dataframe
+      sharing its values with the input; if ``True``, the input is never modified
+      (default: ``True``)
     """
 
-    def __init__(self, iqr_multiple: float = 3.0):
+    #: the approximate number of values processed at a time when detecting
+    #: outliers, bounding the size of temporary arrays
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(
+        self,
+        iqr_multiple: float = 3.0,
+        approximate: bool = False,
+        sketch_size: int = 200,
+        copy: bool = True,
+    ):
         super().__init__()
         if iqr_multiple < 0.0:
             raise ValueError(f"arg iqr_multiple is negative: {iqr_multiple}")
+        if sketch_size < 2:
+            raise ValueError(f"arg sketch_size must be at least 2: {sketch_size}")
         self.iqr_multiple = iqr_multiple
+        self.approximate = approximate
+        self.sketch_size = sketch_size
+        self.copy = copy
         self.threshold_low_ = None
         self.threshold_high_ = None
         self._features_original = None
+        self._sketches: Optional[List[_QuantileSketch]] = None
 
     # noinspection PyPep8Naming
     def fit(
@@ -78,22 +113,176 @@ class OutlierRemoverDF(TransformerDF, BaseEstimator):
 
         self: OutlierRemoverDF  # support type hinting in PyCharm
 
+        if self.approximate:
+            self._sketches = None
+            return self.partial_fit(X)
+
         q1: pd.Series = X.quantile(q=0.25)
         q3: pd.Series = X.quantile(q=0.75)
-        threshold_iqr: pd.Series = (q3 - q1) * self.iqr_multiple
-        self.threshold_low_ = q1 - threshold_iqr
-        self.threshold_high_ = q3 + threshold_iqr
+        self._set_thresholds(q1=q1, q3=q3)
         self._features_original = X.columns.to_series()
+        self._sketches = None
+        return self
+
+    # noinspection PyPep8Naming
+    def partial_fit(
+        self: T_Self,
+        X: pd.DataFrame,
+        y: Optional[Union[pd.Series, pd.DataFrame]] = None,
+        **fit_params,
+    ) -> T_Self:
+        """
+        Fit the transformer incrementally on a chunk of data, using approximate
+        quartiles.
+
+        The first call to this method after construction, or after fitting with
+        :meth:`.fit` using exact quartiles, starts a new fit; subsequent calls
+        update the approximate quartiles and must pass the same columns, in any
+        order.
+
+        :param X: a chunk of the input data
+        :param y: ignored
+        :param fit_params: ignored
+        :return: ``self``
+        """
+
+        self: OutlierRemoverDF  # support type hinting in PyCharm
+
+        if self._sketches is None:
+            self._sketches = [_QuantileSketch(k=self.sketch_size) for _ in X.columns]
+            self._features_original = X.columns.to_series()
+        else:
+            X = self._align_columns(X)
+
+        for sketch, (_, values) in zip(self._sketches, X.items()):
+            sketch.update(values.values)
+
+        self._set_thresholds_from_sketches()
+        return self
+
+    def merge(self: T_Self, other: "OutlierRemoverDF") -> T_Self:
+        """
+        Merge the approximate quartiles of another outlier remover into this
+        outlier remover, e.g., to combine outlier removers fitted on separate
+        partitions of the data.
+
+        Both outlier removers must have been fitted with approximate quartiles, on
+        the same columns.
+
+        :param other: the outlier remover to merge into this outlier remover; remains
+            unchanged
+        :return: ``self``
+        """
+
+        self: OutlierRemoverDF  # support type hinting in PyCharm
+
+        for outlier_remover in (self, other):
+            if outlier_remover._sketches is None:
+                raise ValueError(
+                    "only outlier removers fitted with approximate quartiles "
+                    "can be merged"
+                )
+        features = self._features_original.index
+        self._check_columns(other._features_original.index)
+
+        for sketch, position_other in zip(
+            self._sketches, other._features_original.index.get_indexer(features)
+        ):
+            sketch.merge(other._sketches[position_other])
+
+        self._set_thresholds_from_sketches()
         return self
 
     # noinspection PyPep8Naming
-    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+    def transform(
+        self, X: pd.DataFrame, columns: Optional[Sequence[Any]] = None
+    ) -> pd.DataFrame:
         """
         Return ``X`` with outliers are replaced by ``NaN``.
 
+        If arg ``columns`` is given, outliers are only detected and replaced in the
+        requested columns.
+
+        :param X: the input data
+        :param columns: the columns to return (optional; defaults to all columns)
         :return: the ``X`` where outliers are replaced by ``NaN``
         """
-        return X.where(cond=(X >= self.threshold_low_) & (X <= self.threshold_high_))
+        X = self._align_columns(X)
+
+        if columns is not None:
+            columns = self._validate_columns_out(columns)
+            return _df_to_float_dtype(
+                pd.DataFrame(
+                    {
+                        position: self._remove_outliers_from_column(
+                            X.loc[:, column], low, high
+                        )
+                        for position, (column, low, high) in enumerate(
+                            zip(
+                                columns,
+                                self.threshold_low_.loc[columns].values,
+                                self.threshold_high_.loc[columns].values,
+                            )
+                        )
+                    },
+                    index=X.index,
+                ).set_axis(columns.rename(X.columns.name), axis=1)
+            )
+
+        if self._float_dtype(X) is None and len(X.columns) > 0:
+            # columns of different dtypes: replace outliers column by column,
+            # converting only columns with outliers to floating point values
+            return _df_to_float_dtype(
+                pd.concat(
+                    [
+                        self._remove_outliers_from_column(column, low, high)
+                        for (_, column), low, high in zip(
+                            X.items(),
+                            self.threshold_low_.values,
+                            self.threshold_high_.values,
+                        )
+                    ],
+                    axis=1,
+                ).rename_axis(columns=X.columns.name)
+            )
+
+        values: np.ndarray = X.to_numpy(copy=self.copy)
+
+        for rows, mask in self._iter_outlier_masks(X, values=values):
+            np.putmask(values[rows], mask, np.nan)
+
+        return _df_to_float_dtype(
+            pd.DataFrame(data=values, index=X.index, columns=X.columns, copy=False)
+        )
+
+    # noinspection PyPep8Naming
+    def outlier_counts(self, X: pd.DataFrame) -> pd.Series:
+        """
+        Count the outliers in each row of ``X``.
+
+        Unlike :meth:`.transform`, this does not create a copy of ``X``.
+
+        :param X: the input data
+        :return: a series with the number of outliers in each row of ``X``
+        """
+        counts = np.empty(len(X), dtype=np.intp)
+
+        for rows, mask in self._iter_outlier_masks(X):
+            mask.sum(axis=1, out=counts[rows])
+
+        return pd.Series(data=counts, index=X.index, name="outliers")
+
+    # noinspection PyPep8Naming
+    def outlier_rows(self, X: pd.DataFrame) -> pd.Series:
+        """
+        Determine which rows of ``X`` contain at least one outlier.
+
+        Unlike :meth:`.transform`, this does not create a copy of ``X``.
+
+        :param X: the input data
+        :return: a boolean series indicating the rows of ``X`` with outliers
+        """
+        return self.outlier_counts(X) > 0
 
     # noinspection PyPep8Naming
     def inverse_transform(self, X: pd.DataFrame) -> pd.DataFrame:
@@ -109,6 +298,106 @@ class OutlierRemoverDF(TransformerDF, BaseEstimator):
         """[see superclass]"""
         return self.threshold_low_ is not None
 
+    # noinspection PyPep8Naming
+    @staticmethod
+    def _float_dtype(X: pd.DataFrame) -> Optional[np.dtype]:
+        # get the floating point dtype shared by all columns, or None if the columns
+        # are not all of the same floating point dtype
+        dtypes = X.dtypes.unique()
+        if (
+            len(dtypes) == 1
+            and isinstance(dtypes[0], np.dtype)
+            and dtypes[0].kind == "f"
+        ):
+            return dtypes[0]
+        else:
+            return None
+
+    def _remove_outliers_from_column(
+        self, column: pd.Series, low: float, high: float
+    ) -> pd.Series:
+        values = column.to_numpy()
+        mask = values < low
+        mask |= values > high
+        if not mask.any():
+            return column.copy() if self.copy else column
+
+        if values.dtype.kind == "f":
+            if self.copy:
+                values = values.copy()
+        else:
+            values = values.astype(np.float64)
+        values[mask] = np.nan
+        return pd.Series(data=values, index=column.index, name=column.name)
+
+    # noinspection PyPep8Naming
+    def _iter_outlier_masks(
+        self, X: pd.DataFrame, values: Optional[np.ndarray] = None
+    ) -> Iterator[Tuple[slice, np.ndarray]]:
+        # detect outliers in chunks of rows, re-using the same temporary arrays
+        # for all chunks; yield the slice of rows of each chunk along with a
+        # boolean array indicating the outliers in the chunk
+
+        X = self._align_columns(X)
+        if values is None and self._float_dtype(X) is not None:
+            values = X.values
+
+        threshold_low = self.threshold_low_.values
+        threshold_high = self.threshold_high_.values
+
+        n_rows, n_columns = X.shape
+        chunk_rows = max(1, min(n_rows, self.CHUNK_SIZE // max(n_columns, 1)))
+        mask = np.empty((chunk_rows, n_columns), dtype=bool)
+        mask_high = np.empty((chunk_rows, n_columns), dtype=bool)
+
+        for start in range(0, n_rows, chunk_rows):
+            rows = slice(start, min(start + chunk_rows, n_rows))
+            if values is None:
+                chunk = X.iloc[rows].to_numpy(dtype=np.float64)
+            else:
+                chunk = values[rows]
+            chunk_mask = mask[: len(chunk)]
+            chunk_mask_high = mask_high[: len(chunk)]
+            np.less(chunk, threshold_low, out=chunk_mask)
+            np.greater(chunk, threshold_high, out=chunk_mask_high)
+            np.logical_or(chunk_mask, chunk_mask_high, out=chunk_mask)
+            yield rows, chunk_mask
+
+    def _set_thresholds(self, q1: pd.Series, q3: pd.Series) -> None:
+        threshold_iqr: pd.Series = (q3 - q1) * self.iqr_multiple
+        self.threshold_low_ = q1 - threshold_iqr
+        self.threshold_high_ = q3 + threshold_iqr
+
+    def _set_thresholds_from_sketches(self) -> None:
+        index = self._features_original.index
+        self._set_thresholds(
+            q1=pd.Series(
+                [sketch.quantile(0.25) for sketch in self._sketches], index=index
+            ),
+            q3=pd.Series(
+                [sketch.quantile(0.75) for sketch in self._sketches], index=index
+            ),
+        )
+
+    def _check_columns(self, columns: pd.Index) -> None:
+        # check that the given columns are the fitted columns, in any order
+        features = self._features_original.index
+        if len(columns) != len(features) or not features.isin(columns).all():
+            raise ValueError(
+                "columns do not match the columns of the previous fit: "
+                f"expected {features.tolist()} "
+                f"but got {columns.tolist()}"
+            )
+
+    # noinspection PyPep8Naming
+    def _align_columns(self, X: pd.DataFrame) -> pd.DataFrame:
+        # arrange the columns of X in the order of the fitted columns
+        features = self._features_original.index
+        if X.columns.equals(features):
+            return X
+        self._check_columns(X.columns)
+        return X.loc[:, features]
+
     def _get_features_original(self) -> pd.Series:
         return self._features_original
 
@@ -119,10 +408,97 @@ class OutlierRemoverDF(TransformerDF, BaseEstimator):
         return 0
 
 
+class _QuantileSketch:
+    # A mergeable sketch for approximate quantiles of a stream of values, using
+    # the KLL algorithm (Karnin, Lang, and Liberty, 2016):
+    # values are stored in a hierarchy of compactors, where each value at level h
+    # represents 2^h of the original values; when a level exceeds its capacity,
+    # it is sorted and every other value is promoted to the next level.
+    # The capacities decrease geometrically from the top level down, so the size
+    # of the sketch is bounded by about 3k values.
+    # Missing values are ignored.
+
+    _CAPACITY_DECAY = 2 / 3
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        # compactions promote either the values at odd or at even positions, chosen
+        # at random to avoid biased results; use a fixed seed for reproducibility
+        self.random_state = np.random.RandomState(0)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other: "_QuantileSketch") -> None:
+        for level, other_values in enumerate(other.levels):
+            if level < len(self.levels):
+                self.levels[level] = np.concatenate((self.levels[level], other_values))
+            else:
+                self.levels.append(other_values.copy())
+        self._compress()
+
+    def quantile(self, q: float) -> float:
+        weights = np.concatenate(
+            [
+                np.full(len(values), 2**level, dtype=np.float64)
+                for level, values in enumerate(self.levels)
+            ]
+        )
+        if len(weights) == 0:
+            return np.nan
+
+        values = np.concatenate(self.levels)
+        order = np.argsort(values, kind="mergesort")
+        values = values[order]
+        weights = weights[order]
+
+        # the rank of each value is the center of the ranks it represents;
+        # as long as no values have been compacted, this yields the same results
+        # as linear interpolation by pandas and numpy
+        cumulative_weights = np.cumsum(weights)
+        ranks = cumulative_weights - (weights + 1) / 2
+        return float(np.interp(q * (cumulative_weights[-1] - 1), ranks, values))
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * self._CAPACITY_DECAY**depth)), 2)
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                values = np.sort(values)
+                if len(values) % 2 == 1:
+                    # keep one value at this level, so an even number is compacted
+                    self.levels[level] = values[-1:]
+                    values = values[:-1]
+                else:
+                    self.levels[level] = values[:0]
+
+                offset = self.random_state.randint(2)
+                self.levels[level + 1] = np.concatenate(
+                    (self.levels[level + 1], values[offset::2])
+                )
+
+                # the capacities of the lower levels may have decreased with the
+                # new top level, so start over
+                level = 0
+            else:
+                level += 1
+
+
 class _BorutaPyWrapperDF(
-    _MetaEstimatorWrapperDF[BorutaPy],
-    _NDArrayTransformerWrapperDF[BorutaPy],
-    _ColumnSubsetTransformerWrapperDF[BorutaPy],
+    _MetaEstimatorWrapperDF[_ParallelBorutaPy],
+    _NDArrayTransformerWrapperDF[_ParallelBorutaPy],
+    _ColumnSubsetTransformerWrapperDF[_ParallelBorutaPy],
     metaclass=ABCMeta,
 ):
     def _get_features_out(self) -> pd.Index:
@@ -131,7 +507,7 @@ class _BorutaPyWrapperDF(
 
 # noinspection PyAbstractClass,PyUnresolvedReferences
 @df_estimator(df_wrapper_type=_BorutaPyWrapperDF)
-class BorutaDF(TransformerDF, BorutaPy):
+class BorutaDF(TransformerDF, _ParallelBorutaPy):
     """
     Feature Selection with the Boruta method with dataframes as input and output.
 
@@ -144,6 +520,13 @@ class BorutaDF(TransformerDF, BorutaPy):
     <https://github.com/scikit-learn-contrib/boruta_py>` with dataframes
     as input and output.
 
+    Unlike :class:`BorutaPy`, :class:`BorutaDF` can run several importance fits in
+    parallel (see parameter ``n_jobs``), and can fit each iteration on a random
+    subsample of rows (see parameter ``max_samples``).
+    The real and shadow features are stored in a preallocated matrix that is
+    re-used across iterations, and feature selection stops as soon as all
+    features are either confirmed or rejected.
+
     The parameters are the parameters from the boruta :class:`BorutaPy`. For
     convenience we list below the description of the parameters as they appear in
     https://github.com/scikit-learn-contrib/boruta_py.
@@ -152,6 +535,11 @@ class BorutaDF(TransformerDF, BorutaPy):
         A supervised learning estimator, with a 'fit' method that returns the
         ``feature_importances_`` attribute. Important features must correspond to
         high absolute values in the ``feature_importances_``.
+        For LightGBM regressors and classifiers (except with class weights or
+        custom objectives), boosters are trained directly on LightGBM datasets,
+        re-using the feature bins across iterations, and feature importances are
+        determined as per the estimator's ``importance_type`` (``"split"`` or
+        ``"gain"``).
     :param n_estimators: int or string, default = 1000
         If int sets the number of estimators in the chosen ensemble method.
         If 'auto' this is determined automatically based on the size of the
@@ -182,6 +570,28 @@ class BorutaDF(TransformerDF, BorutaPy):
         - 0: no output
         - 1: displays iteration number
         - 2: which features have been selected already
+    :param early_stopping: bool, default = False
+        Whether to use early stopping to terminate the selection process
+        before reaching `max_iter` iterations if the algorithm cannot confirm
+        or reject a tentative feature for `n_iter_no_change` iterations.
+    :param n_iter_no_change: int, default = 20
+        The number of iterations without a change in the decisions about the
+        tentative features, after which selection stops if ``early_stopping``
+        is ``True``.
+    :param n_jobs: int or None, default = None
+        The number of importance fits to run in parallel threads, each with
+        a random permutation of the shadow features; -1 means using all
+        processors.
+        The hits of all fits in a batch of parallel fits are tested one after the
+        other, so a feature can be rejected one batch later than in sequential
+        execution; results depend on ``random_state`` and ``n_jobs``.
+        Each parallel fit re-uses its own matrix of real and shadow features,
+        so memory use grows with the number of jobs. Consider setting the
+        ``n_jobs`` parameter of the estimator to 1 to avoid oversubscription.
+    :param max_samples: int, float or None, default = None
+        If set, fit the estimator in each iteration on a random subsample of
+        ``max_samples`` rows (if int) or of ``max_samples * n_samples`` rows (if
+        float) drawn without replacement; if None, use all rows.
     """
 
     pass
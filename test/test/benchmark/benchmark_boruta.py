@@ -0,0 +1,113 @@
+"""
+Benchmark Boruta feature selection with :class:`sklearndf.transformation.extra.BorutaDF`
+against the plain :class:`boruta.BorutaPy` engine it used to delegate to.
+
+Selects features of a wide synthetic classification problem with a small number of
+informative features, running :class:`BorutaDF` sequentially, with parallel
+importance fits, and with parallel importance fits on row subsamples.
+With option ``--lgbm``, uses a LightGBM classifier instead of a random forest, for
+which :class:`BorutaDF` trains LightGBM boosters directly.
+
+Run from the ``test`` directory, e.g.::
+
+    python -m test.benchmark.benchmark_boruta --rows 2000 --cols 500 --jobs 4
+"""
+
+import argparse
+import logging
+import time
+from typing import Callable, Set
+
+import pandas as pd
+from boruta import BorutaPy
+from lightgbm import LGBMClassifier
+from sklearn.base import ClassifierMixin
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from sklearndf.transformation.extra import BorutaDF
+
+log = logging.getLogger(__name__)
+
+
+def _time(label: str, select: Callable[[], Set[str]], informative: Set[str]) -> float:
+    start = time.perf_counter()
+    selected = select()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<28}{elapsed:10.3f} s    "
+        f"selected={len(selected):<5}"
+        f"informative selected={len(selected & informative)}"
+    )
+    return elapsed
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--cols", type=int, default=500)
+    parser.add_argument("--informative", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--max-samples", type=float, default=0.5)
+    parser.add_argument("--lgbm", action="store_true")
+    args = parser.parse_args()
+
+    X_array, y_array = make_classification(
+        n_samples=args.rows,
+        n_features=args.cols,
+        n_informative=args.informative,
+        n_redundant=0,
+        shuffle=False,
+        random_state=42,
+    )
+    X = pd.DataFrame(X_array, columns=[f"x{i}" for i in range(args.cols)])
+    y = pd.Series(y_array, name="target")
+    informative = set(X.columns[: args.informative])
+
+    print(
+        f"{args.rows:,} rows, {args.cols:,} features "
+        f"of which {args.informative} informative"
+    )
+
+    def _estimator() -> ClassifierMixin:
+        if args.lgbm:
+            return LGBMClassifier(num_leaves=15, n_jobs=1)
+        else:
+            return RandomForestClassifier(max_depth=5, n_jobs=1)
+
+    params = dict(n_estimators=100, max_iter=args.iterations, random_state=42)
+
+    def _boruta_py() -> Set[str]:
+        boruta = BorutaPy(estimator=_estimator(), **params).fit(X.values, y.values)
+        return set(X.columns[boruta.support_])
+
+    def _boruta_df(**boruta_params) -> Callable[[], Set[str]]:
+        def _select() -> Set[str]:
+            boruta = BorutaDF(estimator=_estimator(), **params, **boruta_params)
+            return set(boruta.fit(X, y).feature_names_out_)
+
+        return _select
+
+    t_boruta_py = _time("BorutaPy", _boruta_py, informative)
+    _time("BorutaDF", _boruta_df(), informative)
+    t_parallel = _time(
+        f"BorutaDF(n_jobs={args.jobs})", _boruta_df(n_jobs=args.jobs), informative
+    )
+    t_subsampled = _time(
+        f"  + max_samples={args.max_samples}",
+        _boruta_df(n_jobs=args.jobs, max_samples=args.max_samples),
+        informative,
+    )
+
+    print(
+        f"speedup: {t_boruta_py / t_parallel:.1f}x parallel, "
+        f"{t_boruta_py / t_subsampled:.1f}x parallel with subsampling"
+    )
+
+
+if __name__ == "__main__":
+    main()
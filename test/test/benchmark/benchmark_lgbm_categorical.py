@@ -0,0 +1,138 @@
+"""
+Benchmark passing pandas categorical features through to
+:class:`sklearndf.regression.extra.LGBMRegressorDF`, against one-hot encoding them
+with :class:`sklearndf.transformation.OneHotEncoderDF`.
+
+Fits a preprocessing pipeline and LightGBM regressor to synthetic data with
+high-cardinality categorical features, and reports the fit time, the peak memory
+allocated by Python while fitting, and the memory used by the preprocessed features.
+
+Run from the ``test`` directory, e.g.::
+
+    python -m test.benchmark.benchmark_lgbm_categorical --rows 100000 --categories 100
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from sklearndf.pipeline import PipelineDF, RegressorPipelineDF
+from sklearndf.regression.extra import LGBMRegressorDF
+from sklearndf.transformation import (
+    ColumnTransformerDF,
+    OneHotEncoderDF,
+    SimpleImputerDF,
+)
+
+
+def _make_data(
+    n_rows: int, n_numeric: int, n_categorical: int, n_categories: int
+) -> Tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.RandomState(42)
+    X = pd.DataFrame(
+        rng.randn(n_rows, n_numeric), columns=[f"x{i}" for i in range(n_numeric)]
+    )
+    y = X.sum(axis=1) + rng.randn(n_rows) * 0.1
+
+    categories = [f"c{i}" for i in range(n_categories)]
+    for i in range(n_categorical):
+        codes = rng.randint(n_categories, size=n_rows)
+        y += np.sin(codes)
+        # 1% missing values
+        codes[rng.rand(n_rows) < 0.01] = -1
+        X[f"cat{i}"] = pd.Categorical.from_codes(codes, categories=categories)
+
+    return X, y.rename("target")
+
+
+def _make_pipeline(
+    numeric: pd.Index, categorical: pd.Index, one_hot: bool
+) -> RegressorPipelineDF:
+    impute = SimpleImputerDF(strategy="most_frequent")
+    if one_hot:
+        encode = PipelineDF(
+            steps=[
+                ("impute", impute),
+                ("encode", OneHotEncoderDF(sparse=False, dtype=np.uint8)),
+            ]
+        )
+    else:
+        encode = impute
+    return RegressorPipelineDF(
+        preprocessing=ColumnTransformerDF(
+            transformers=[
+                ("categorical", encode, list(categorical)),
+                ("numeric", "passthrough", list(numeric)),
+            ]
+        ),
+        regressor=LGBMRegressorDF(n_estimators=100, n_jobs=1),
+    )
+
+
+def _run(
+    label: str, pipeline: RegressorPipelineDF, X: pd.DataFrame, y: pd.Series
+) -> float:
+    tracemalloc.start()
+    start = time.perf_counter()
+    pipeline.fit(X, y)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    features = pipeline.preprocessing.transform(X)
+    print(
+        f"{label:<16}{elapsed:10.3f} s"
+        f"{peak / 2 ** 20:12.1f} MiB peak"
+        f"{features.memory_usage(deep=True).sum() / 2 ** 20:12.1f} MiB features"
+        f"{len(features.columns):8} columns"
+    )
+    return elapsed
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--numeric", type=int, default=10)
+    parser.add_argument("--categorical", type=int, default=5)
+    parser.add_argument("--categories", type=int, default=100)
+    args = parser.parse_args()
+
+    X, y = _make_data(
+        n_rows=args.rows,
+        n_numeric=args.numeric,
+        n_categorical=args.categorical,
+        n_categories=args.categories,
+    )
+    categorical = X.columns[X.dtypes == "category"]
+    numeric = X.columns.difference(categorical)
+
+    print(
+        f"{args.rows:,} rows, {args.numeric} numeric features, "
+        f"{args.categorical} categorical features with {args.categories} categories"
+    )
+
+    t_one_hot = _run(
+        "one-hot",
+        _make_pipeline(numeric=numeric, categorical=categorical, one_hot=True),
+        X,
+        y,
+    )
+    t_categorical = _run(
+        "categorical",
+        _make_pipeline(numeric=numeric, categorical=categorical, one_hot=False),
+        X,
+        y,
+    )
+
+    print(f"speedup: {t_one_hot / t_categorical:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
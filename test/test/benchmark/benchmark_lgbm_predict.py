@@ -0,0 +1,96 @@
+"""
+Benchmark the latency and throughput of
+:class:`sklearndf.regression.extra.LGBMRegressorDF` predictions across batch sizes,
+using a single thread, all cores, or choosing the number of threads depending on the
+batch size (see option ``lgbm_parallel_predict_min_rows`` of
+:func:`sklearndf.set_config`).
+
+Run from the ``test`` directory, e.g.::
+
+    python -m test.benchmark.benchmark_lgbm_predict --min-rows 1000
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from joblib import cpu_count
+
+from sklearndf import config_context
+from sklearndf.regression.extra import LGBMRegressorDF
+
+
+def _time_predict(
+    regressor: LGBMRegressorDF,
+    X: pd.DataFrame,
+    min_time: float,
+    **predict_params: Any,
+) -> float:
+    # return the median latency of a prediction, in seconds
+    latencies: List[float] = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time or len(latencies) < 5:
+        t = time.perf_counter()
+        regressor.predict(X, **predict_params)
+        latencies.append(time.perf_counter() - t)
+    return float(np.median(latencies))
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--estimators", type=int, default=200)
+    parser.add_argument("--min-rows", type=int, default=1000)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(42)
+    X = pd.DataFrame(
+        rng.randn(args.rows, args.cols), columns=[f"x{i}" for i in range(args.cols)]
+    )
+    y = X.iloc[:, :5].sum(axis=1) + rng.randn(args.rows) * 0.1
+
+    regressor = LGBMRegressorDF(n_estimators=args.estimators).fit(X, y)
+
+    n_cores = cpu_count()
+    print(
+        f"{args.estimators} trees, {args.cols} features, {n_cores} cores, "
+        f"single-threaded below {args.min_rows:,} rows"
+    )
+
+    policies: Dict[str, Dict[str, Any]] = {
+        "1 thread": dict(num_threads=1),
+        "all cores": dict(num_threads=n_cores),
+        "auto": {},
+    }
+
+    print(
+        f"{'batch size':>12}"
+        + "".join(f"{name + ' [ms]':>18}" for name in policies)
+        + "".join(f"{name + ' [rows/s]':>22}" for name in policies)
+    )
+
+    batch_size = 1
+    while batch_size <= args.rows:
+        X_batch = X.iloc[:batch_size]
+        with config_context(lgbm_parallel_predict_min_rows=args.min_rows):
+            latencies = [
+                _time_predict(regressor, X_batch, args.min_time, **predict_params)
+                for predict_params in policies.values()
+            ]
+        print(
+            f"{batch_size:>12,}"
+            + "".join(f"{latency * 1000:>18.3f}" for latency in latencies)
+            + "".join(f"{batch_size / latency:>22,.0f}" for latency in latencies)
+        )
+        batch_size *= 10
+
+
+if __name__ == "__main__":
+    main()
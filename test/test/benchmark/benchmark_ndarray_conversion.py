@@ -0,0 +1,88 @@
+"""
+Benchmark the conversion of mixed-dtype data frames to numpy arrays, as done by
+:class:`sklearndf.transformation._wrapper._NDArrayTransformerWrapperDF`.
+
+Compares converting the data frame as a whole using ``DataFrame.values`` (which upcasts
+mixed boolean, numeric and categorical columns to an array of Python objects) against
+the block-wise conversion of the wrapper, each followed by scikit-learn's
+``check_array`` as applied by most native estimators.
+
+Run from the ``test`` directory, e.g.::
+
+    python -m test.benchmark.benchmark_ndarray_conversion --rows 1000000 --cols 500
+"""
+
+import argparse
+import logging
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from sklearn.utils import check_array
+
+from sklearndf.transformation._wrapper import _NDArrayTransformerWrapperDF
+
+log = logging.getLogger(__name__)
+
+
+def make_mixed_frame(n_rows: int, n_cols: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Make a data frame with boolean, integer, floating point, and numeric categorical
+    columns, in equal shares.
+    """
+    rng = np.random.RandomState(seed)
+    categories = np.array([0.5, 1.5, 2.5, 3.5])
+
+    def _make_column(i: int) -> np.ndarray:
+        kind = i % 5
+        if kind == 0:
+            return rng.randn(n_rows)
+        elif kind == 1:
+            return rng.randn(n_rows).astype(np.float32)
+        elif kind == 2:
+            return rng.randint(0, 100, size=n_rows)
+        elif kind == 3:
+            return rng.randint(0, 2, size=n_rows).astype(bool)
+        else:
+            return pd.Categorical.from_codes(
+                rng.randint(0, len(categories), size=n_rows), categories=categories
+            )
+
+    return pd.DataFrame({f"x{i}": _make_column(i) for i in range(n_cols)})
+
+
+def _time(label: str, convert: Callable[[], np.ndarray]) -> float:
+    start = time.perf_counter()
+    array = check_array(convert(), force_all_finite=False)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<12}{elapsed:10.3f} s    "
+        f"dtype={array.dtype}    {array.nbytes / 2 ** 20:,.0f} MiB"
+    )
+    return elapsed
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=500)
+    args = parser.parse_args()
+
+    X = make_mixed_frame(n_rows=args.rows, n_cols=args.cols)
+    print(f"frame with {args.rows:,} rows and {args.cols:,} mixed-dtype columns")
+
+    # noinspection PyProtectedMember
+    t_blocks = _time(
+        "block-wise", lambda: _NDArrayTransformerWrapperDF._to_numeric_array(X)
+    )
+    t_values = _time(".values", lambda: X.values)
+
+    print(f"speedup: {t_values / t_blocks:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark the latency of predictions of a pipeline of an imputer, four scalers and a
+linear regressor, before and after fusing the affine steps of the fitted pipeline
+(see :meth:`sklearndf.pipeline.PipelineDF.fuse_affine_steps`), across batch sizes.
+
+Run from the ``test`` directory, e.g.::
+
+    python -m test.benchmark.benchmark_pipeline_fusion --cols 100
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from sklearndf.pipeline import PipelineDF
+from sklearndf.regression import RidgeDF
+from sklearndf.transformation import (
+    MaxAbsScalerDF,
+    MinMaxScalerDF,
+    RobustScalerDF,
+    SimpleImputerDF,
+    StandardScalerDF,
+)
+
+
+def _median_latency(predict: Callable[[], object], min_time: float) -> float:
+    latencies: List[float] = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time or len(latencies) < 5:
+        t = time.perf_counter()
+        predict()
+        latencies.append(time.perf_counter() - t)
+    return float(np.median(latencies))
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--missing", type=float, default=0.05)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(42)
+    X = pd.DataFrame(
+        rng.randn(args.rows, args.cols), columns=[f"x{i}" for i in range(args.cols)]
+    )
+    y = X.iloc[:, :5].sum(axis=1) + rng.randn(args.rows) * 0.1
+    X = X.mask(rng.rand(*X.shape) < args.missing)
+
+    pipeline = PipelineDF(
+        [
+            ("impute", SimpleImputerDF()),
+            ("standard", StandardScalerDF()),
+            ("min_max", MinMaxScalerDF()),
+            ("robust", RobustScalerDF()),
+            ("max_abs", MaxAbsScalerDF()),
+            ("regressor", RidgeDF()),
+        ]
+    ).fit(X, y)
+    pipelines = {
+        "original": pipeline,
+        "fused": pipeline.fuse_affine_steps(fold_into_final=False),
+        "folded": pipeline.fuse_affine_steps(),
+    }
+
+    print(f"{args.cols} features, {args.missing:.0%} missing values")
+    print(
+        f"{'batch size':>12}"
+        + "".join(f"{name + ' [ms]':>16}" for name in pipelines)
+        + f"{'speedup':>10}"
+    )
+
+    batch_size = 1
+    while batch_size <= args.rows:
+        X_batch = X.iloc[:batch_size]
+        latencies = [
+            _median_latency(lambda: p.predict(X_batch), args.min_time)
+            for p in pipelines.values()
+        ]
+        print(
+            f"{batch_size:>12,}"
+            + "".join(f"{latency * 1000:>16.3f}" for latency in latencies)
+            + f"{latencies[0] / latencies[-1]:>9.1f}x"
+        )
+        batch_size *= 10
+
+
+if __name__ == "__main__":
+    main()
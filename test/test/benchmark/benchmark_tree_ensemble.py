@@ -0,0 +1,99 @@
+"""
+Benchmark the latency of predictions of scikit-learn tree ensembles, computed by the
+native estimators and by the compiled trees (see option ``compile_tree_ensembles``
+of :func:`sklearndf.set_config`), across batch sizes.
+
+The compiled trees are used for all batch sizes, to calibrate the maximum batch size
+for which the tree ensemble wrappers use the compiled trees.
+
+Run from the ``test`` directory, e.g.::
+
+    python -m test.benchmark.benchmark_tree_ensemble --estimators 100 --jobs 4
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from sklearndf import LearnerDF, config_context
+from sklearndf.classification import RandomForestClassifierDF
+from sklearndf.regression import GradientBoostingRegressorDF, RandomForestRegressorDF
+
+
+def _median_latency(predict: Callable[[], object], min_time: float) -> float:
+    latencies: List[float] = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time or len(latencies) < 5:
+        t = time.perf_counter()
+        predict()
+        latencies.append(time.perf_counter() - t)
+    return float(np.median(latencies))
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--estimators", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=10)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(42)
+    X = pd.DataFrame(
+        rng.randn(args.rows, args.cols), columns=[f"x{i}" for i in range(args.cols)]
+    )
+    y = X.iloc[:, :5].sum(axis=1) + rng.randn(args.rows) * 0.1
+
+    learners: List[LearnerDF] = [
+        RandomForestRegressorDF(
+            n_estimators=args.estimators, max_depth=args.max_depth, n_jobs=args.jobs
+        ).fit(X, y),
+        RandomForestClassifierDF(
+            n_estimators=args.estimators, max_depth=args.max_depth, n_jobs=args.jobs
+        ).fit(X, y > 0),
+        GradientBoostingRegressorDF(n_estimators=args.estimators, max_depth=5).fit(
+            X, y
+        ),
+    ]
+
+    print(
+        f"{args.estimators} trees, max depth {args.max_depth}, {args.cols} features, "
+        f"n_jobs={args.jobs}"
+    )
+    print(
+        f"{'learner':<32}{'batch size':>12}"
+        f"{'native [ms]':>14}{'compiled [ms]':>16}{'speedup':>10}"
+    )
+
+    for learner in learners:
+        # use the compiled trees for all batch sizes
+        type(learner).COMPILED_MAX_ROWS = args.rows
+
+        batch_size = 1
+        while batch_size <= args.rows:
+            X_batch = X.iloc[:batch_size]
+            latency_native = _median_latency(
+                lambda: learner.predict(X_batch), args.min_time
+            )
+            with config_context(compile_tree_ensembles=True):
+                latency_compiled = _median_latency(
+                    lambda: learner.predict(X_batch), args.min_time
+                )
+            print(
+                f"{type(learner).__name__:<32}{batch_size:>12,}"
+                f"{latency_native * 1000:>14.3f}{latency_compiled * 1000:>16.3f}"
+                f"{latency_native / latency_compiled:>9.1f}x"
+            )
+            batch_size *= 10
+
+
+if __name__ == "__main__":
+    main()
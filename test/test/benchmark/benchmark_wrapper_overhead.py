@@ -0,0 +1,332 @@
+"""
+Benchmark the overhead of the :mod:`sklearndf` wrappers over the native scikit-learn
+estimators they wrap, for all wrapped classifiers, regressors and transformers, and
+for methods ``fit``, ``transform``, ``predict``, and ``predict_proba``, across row
+and column counts.
+
+Wrappers are called with data frames, native estimators with the equivalent numpy
+arrays.
+Results can be saved as CSV, and compared against the results of an earlier run to
+detect regressions of the wrapper overhead, e.g., before a release.
+
+Combinations of rows and columns exceeding ``--max-bytes`` are skipped, as are larger
+row counts for estimators whose calls take longer than ``--max-time`` seconds.
+
+Run from the ``test`` directory, e.g.::
+
+    python -m test.benchmark.benchmark_wrapper_overhead --rows 1 1000 \\
+        --cols 10 --estimators "Linear.*|StandardScaler.*" --save overhead.csv
+
+    python -m test.benchmark.benchmark_wrapper_overhead --baseline overhead.csv
+"""
+
+import argparse
+import logging
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.linear_model import (
+    LinearRegression,
+    MultiTaskElasticNet,
+    MultiTaskElasticNetCV,
+    MultiTaskLasso,
+    MultiTaskLassoCV,
+)
+from sklearn.multioutput import (
+    ClassifierChain,
+    MultiOutputClassifier,
+    MultiOutputRegressor,
+    RegressorChain,
+)
+
+import sklearndf.classification as classification
+import sklearndf.regression as regression
+import sklearndf.transformation as transformation
+from sklearndf import ClassifierDF, EstimatorDF, RegressorDF, TransformerDF
+from test.sklearndf import list_classes
+from test.sklearndf.test_classification import CLASSIFIER_INIT_PARAMETERS
+from test.sklearndf.test_regression import DEFAULT_REGRESSOR_PARAMETERS
+
+log = logging.getLogger(__name__)
+
+#: Methods to benchmark, in order; ``fit`` must come first.
+METHODS = ["fit", "transform", "predict", "predict_proba"]
+
+TRANSFORMER_INIT_PARAMETERS = {
+    "OneHotEncoderDF": {"sparse": False},
+    "RFEDF": {"estimator": LinearRegression()},
+    "RFECVDF": {"estimator": LinearRegression()},
+    "SelectFromModelDF": {"estimator": LinearRegression()},
+}
+
+INIT_PARAMETERS = {
+    **CLASSIFIER_INIT_PARAMETERS,
+    **DEFAULT_REGRESSOR_PARAMETERS,
+    **TRANSFORMER_INIT_PARAMETERS,
+}
+
+#: Native estimators requiring a target with multiple columns.
+MULTI_OUTPUT_TYPES = (
+    ClassifierChain,
+    MultiOutputClassifier,
+    MultiOutputRegressor,
+    MultiTaskElasticNet,
+    MultiTaskElasticNetCV,
+    MultiTaskLasso,
+    MultiTaskLassoCV,
+    RegressorChain,
+)
+
+
+def _median_time(call: Callable[[], object], min_time: float, min_repeat: int) -> float:
+    timings: List[float] = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time or len(timings) < min_repeat:
+        t = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - t)
+    return float(np.median(timings))
+
+
+def _to_native(value: Any) -> Any:
+    # replace all DF estimators in the given parameter value with native estimators
+    if isinstance(value, EstimatorDF):
+        return clone(value.native_estimator)
+    elif isinstance(value, dict):
+        return {key: _to_native(element) for key, element in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_to_native(element) for element in value)
+    else:
+        return value
+
+
+def _list_estimators(pattern: Optional[str]) -> List[Type[EstimatorDF]]:
+    df_classes = list_classes(
+        from_modules=[classification, regression, transformation],
+        matching=r".*DF",
+        excluding=[
+            ClassifierDF.__name__,
+            RegressorDF.__name__,
+            TransformerDF.__name__,
+            r".*WrapperDF",
+        ],
+    )
+    return sorted(
+        (
+            df_class
+            for df_class in df_classes
+            if hasattr(df_class, "__wrapped__")
+            and (pattern is None or re.fullmatch(pattern, df_class.__name__))
+        ),
+        key=lambda df_class: df_class.__name__,
+    )
+
+
+def _make_data(n_rows: int, n_cols: int, seed: int = 42) -> Dict[str, Any]:
+    # non-negative features, for transformers such as NMF or chi2 selectors
+    rng = np.random.RandomState(seed)
+    X = pd.DataFrame(rng.rand(n_rows, n_cols), columns=[f"x{i}" for i in range(n_cols)])
+    y_regression = pd.Series(
+        X.iloc[:, :5].sum(axis=1) + rng.randn(n_rows) * 0.1, name="target"
+    )
+    y_classification = (y_regression > y_regression.median()).rename("target")
+    return dict(
+        X=X,
+        y_regression=y_regression,
+        y_classification=y_classification,
+        y_multi_output=pd.DataFrame(
+            dict(target_1=y_classification, target_2=~y_classification)
+        ).astype(int),
+    )
+
+
+def _benchmark_estimator(
+    df_class: Type[EstimatorDF],
+    data: Dict[str, Any],
+    data_fit: Dict[str, Any],
+    min_time: float,
+    min_repeat: int,
+) -> List[Dict[str, Any]]:
+    # benchmark all methods of one estimator for one data set, returning one result
+    # per method
+
+    params = INIT_PARAMETERS.get(df_class.__name__, {})
+    estimator_df = df_class(**params)
+    estimator_native: BaseEstimator = df_class.__wrapped__(**_to_native(params))
+
+    if isinstance(estimator_native, MULTI_OUTPUT_TYPES):
+        y_key = "y_multi_output"
+    elif isinstance(estimator_df, RegressorDF):
+        y_key = "y_regression"
+    else:
+        y_key = "y_classification"
+
+    results: List[Dict[str, Any]] = []
+
+    def _add_result(method: str, call_df: Callable, call_native: Callable) -> None:
+        time_native = _median_time(call_native, min_time, min_repeat)
+        time_df = _median_time(call_df, min_time, min_repeat)
+        results.append(
+            dict(
+                method=method,
+                native=time_native,
+                df=time_df,
+                overhead=time_df - time_native,
+                ratio=time_df / time_native,
+            )
+        )
+
+    X, y = data["X"], data[y_key]
+    X_values, y_values = X.values, y.values
+
+    try:
+        _add_result(
+            "fit",
+            lambda: estimator_df.fit(X, y),
+            lambda: estimator_native.fit(X_values, y_values),
+        )
+    except Exception:
+        # too few rows to fit the estimator; fit it on the reference data instead
+        X_fit, y_fit = data_fit["X"], data_fit[y_key]
+        estimator_df.fit(X_fit, y_fit)
+        estimator_native.fit(X_fit.values, y_fit.values)
+
+    for method in METHODS[1:]:
+        if not (hasattr(estimator_df, method) and hasattr(estimator_native, method)):
+            continue
+        method_df = getattr(estimator_df, method)
+        method_native = getattr(estimator_native, method)
+        try:
+            method_native(X_values)
+        except (AttributeError, NotImplementedError):
+            # the method is not supported, e.g., predict_proba for SVC by default
+            continue
+        _add_result(method, lambda: method_df(X), lambda: method_native(X_values))
+
+    return results
+
+
+def main() -> None:
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 1_000, 1_000_000])
+    parser.add_argument("--cols", type=int, nargs="+", default=[10, 1_000])
+    parser.add_argument(
+        "--estimators",
+        type=str,
+        default=None,
+        help="regular expression matching the names of the DF estimators to include",
+    )
+    parser.add_argument("--fit-rows", type=int, default=1_000)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--min-repeat", type=int, default=3)
+    parser.add_argument("--max-time", type=float, default=10.0)
+    parser.add_argument("--max-bytes", type=float, default=2e9)
+    parser.add_argument("--save", type=str, default=None, help="CSV file for results")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="CSV file with results of an earlier run to compare against",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative increase of the overhead ratio reported as a regression",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    df_classes = _list_estimators(args.estimators)
+    print(f"{len(df_classes)} estimators")
+    print(
+        f"{'estimator':<40}{'method':<16}{'rows':>10}{'cols':>8}"
+        f"{'native [ms]':>14}{'df [ms]':>12}{'overhead [ms]':>16}{'ratio':>8}"
+    )
+
+    results: List[Dict[str, Any]] = []
+    failures: List[str] = []
+
+    for n_cols in args.cols:
+        data_fit = _make_data(args.fit_rows, n_cols)
+        too_slow = set()
+        for n_rows in sorted(args.rows):
+            if n_rows * n_cols * 8 > args.max_bytes:
+                log.warning(f"skipping {n_rows} rows x {n_cols} columns: --max-bytes")
+                continue
+            data = _make_data(n_rows, n_cols)
+            for df_class in df_classes:
+                name = df_class.__name__
+                if name in too_slow:
+                    continue
+                try:
+                    estimator_results = _benchmark_estimator(
+                        df_class, data, data_fit, args.min_time, args.min_repeat
+                    )
+                except Exception as e:
+                    failures.append(
+                        f"{name} ({n_rows:,} rows x {n_cols:,} columns): "
+                        + f"{type(e).__name__}: {e}".split("\n")[0][:100]
+                    )
+                    continue
+                for result in estimator_results:
+                    result = dict(estimator=name, rows=n_rows, cols=n_cols, **result)
+                    results.append(result)
+                    print(
+                        f"{name:<40}{result['method']:<16}{n_rows:>10,}{n_cols:>8,}"
+                        f"{result['native'] * 1000:>14.3f}{result['df'] * 1000:>12.3f}"
+                        f"{result['overhead'] * 1000:>16.3f}{result['ratio']:>8.2f}"
+                    )
+                    if max(result["native"], result["df"]) > args.max_time:
+                        too_slow.add(name)
+
+    if failures:
+        print(f"\n{len(failures)} failed benchmarks:")
+        for failure in failures:
+            print(f"  {failure}")
+
+    results_df = pd.DataFrame(
+        results,
+        columns=["estimator", "method", "rows", "cols", "native", "df", "overhead"]
+        + ["ratio"],
+    )
+
+    if args.save:
+        results_df.to_csv(args.save, index=False)
+
+    if args.baseline:
+        regressions = _compare(results_df, pd.read_csv(args.baseline), args.tolerance)
+        if len(regressions) > 0:
+            print(f"\n{len(regressions)} overhead regressions:")
+            print(regressions.to_string())
+            sys.exit(1)
+        else:
+            print("\nno overhead regressions")
+
+
+def _compare(
+    results: pd.DataFrame, baseline: pd.DataFrame, tolerance: float
+) -> pd.DataFrame:
+    # get all results whose ratio of wrapper time to native time increased by more
+    # than the given tolerance, relative to the baseline
+    keys: Iterable[str] = ["estimator", "method", "rows", "cols"]
+    compared = results.merge(
+        baseline, on=list(keys), how="inner", suffixes=("", "_baseline")
+    )
+    regressed = compared["ratio"] > compared["ratio_baseline"] * (1 + tolerance)
+    return compared.loc[
+        regressed, [*keys, "ratio_baseline", "ratio", "overhead_baseline", "overhead"]
+    ]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import logging
+from typing import List
 
 import numpy as np
 import pandas as pd
@@ -18,6 +19,34 @@ log = logging.getLogger(__name__)
 UNSUPPORTED_SKLEARN_PACKAGES = [sklearn.cluster, sklearn.manifold, sklearn.neighbors]
 
 
+def pytest_addoption(parser: "pytest.Parser") -> None:
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="run the timing benchmarks, which are deselected by default",
+    )
+
+
+def pytest_configure(config: "pytest.Config") -> None:
+    config.addinivalue_line(
+        "markers", "benchmark: timing benchmark, only run with option --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(
+    config: "pytest.Config", items: List[pytest.Item]
+) -> None:
+    # timing benchmarks are sensitive to the load of the machine, so they are only
+    # run on request
+    if config.getoption("--benchmark"):
+        return
+    deselected = [item for item in items if "benchmark" in item.keywords]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if "benchmark" not in item.keywords]
+
+
 @pytest.fixture
 def boston_target() -> str:
     return "price"
@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 import numpy as np
 import pandas as pd
 import pytest
+from pandas.testing import assert_frame_equal, assert_series_equal
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import OneHotEncoder
 
@@ -32,3 +35,44 @@ def test_classification_pipeline_df(
         ClassifierPipelineDF(
             classifier=RandomForestClassifier(), preprocessing=OneHotEncoder()
         )
+
+
+def test_classification_pipeline_df_predict_all(
+    iris_features: pd.DataFrame, iris_target_sr: pd.DataFrame
+) -> None:
+
+    cls_p_df = ClassifierPipelineDF(
+        classifier=RandomForestClassifierDF(random_state=42),
+        preprocessing=make_simple_transformer(
+            impute_median_columns=iris_features.columns
+        ),
+    ).fit(X=iris_features, y=iris_target_sr)
+
+    # count the calls to the preprocessing step
+    preprocessing_type = type(cls_p_df.preprocessing)
+    with patch.object(
+        preprocessing_type,
+        "transform",
+        autospec=True,
+        side_effect=preprocessing_type.transform,
+    ) as transform:
+        predictions = cls_p_df.predict_all(
+            X=iris_features, outputs=("predict", "predict_proba", "predict_log_proba")
+        )
+        assert transform.call_count == 1
+
+    assert set(predictions) == {"predict", "predict_proba", "predict_log_proba"}
+    assert_series_equal(predictions["predict"], cls_p_df.predict(X=iris_features))
+    assert_frame_equal(
+        predictions["predict_proba"], cls_p_df.predict_proba(X=iris_features)
+    )
+    assert_frame_equal(
+        predictions["predict_log_proba"], cls_p_df.predict_log_proba(X=iris_features)
+    )
+
+    with pytest.raises(ValueError):
+        cls_p_df.predict_all(X=iris_features, outputs=("predict", "transform"))
+
+    with pytest.raises(TypeError):
+        # noinspection PyTypeChecker
+        cls_p_df.predict_all(X=iris_features, outputs="predict")
@@ -2,6 +2,8 @@
 Test module for PipelineDF inspired by:
 https://github.com/scikit-learn/scikit-learn/blob/master/sklearn/tests/test_pipeline.py
 """
+import io
+import json
 import shutil
 import time
 from tempfile import mkdtemp
@@ -10,22 +12,39 @@ from typing import Any, Dict, Mapping
 import joblib
 import numpy as np
 import pandas as pd
+import pytest
 from numpy.testing import (
     assert_array_equal,
     assert_no_warnings,
     assert_raises,
     assert_raises_regex,
 )
+from pandas.testing import assert_frame_equal, assert_series_equal
 from sklearn import clone
 from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.feature_selection import f_classif
+from sklearn.feature_selection import f_classif, f_regression
+from sklearn.linear_model import LinearRegression
+
+from pytools.fit import NotFittedError
 
 from sklearndf import TransformerDF
 from sklearndf._wrapper import df_estimator
 from sklearndf.classification import SVCDF, LogisticRegressionDF
-from sklearndf.pipeline import PipelineDF
-from sklearndf.regression import DummyRegressorDF, LassoDF, LinearRegressionDF
-from sklearndf.transformation import SelectKBestDF, SimpleImputerDF
+from sklearndf.pipeline import FeatureUnionDF, PipelineDF
+from sklearndf.regression import DummyRegressorDF, LassoDF, LinearRegressionDF, RidgeDF
+from sklearndf.transformation import (
+    PCADF,
+    RFEDF,
+    ColumnTransformerDF,
+    MaxAbsScalerDF,
+    MinMaxScalerDF,
+    NormalizerDF,
+    RobustScalerDF,
+    SelectKBestDF,
+    SimpleImputerDF,
+    StandardScalerDF,
+    VarianceThresholdDF,
+)
 from sklearndf.transformation._wrapper import _ColumnPreservingTransformerWrapperDF
 
 
@@ -293,3 +312,234 @@ def test_pipeline_df_raise_set_params_error() -> None:
         pipe.set_params,
         fake__estimator="nope",
     )
+
+
+def test_pipeline_df_fuse_affine_steps(boston_features: pd.DataFrame) -> None:
+    rng = np.random.RandomState(42)
+    X = boston_features.mask(rng.rand(*boston_features.shape) < 0.1)
+    y = boston_features.iloc[:, 0] + boston_features.iloc[:, 1]
+
+    def _make_transformer_steps():
+        return [
+            ("impute", SimpleImputerDF(strategy="median")),
+            ("standard", StandardScalerDF()),
+            ("skip", "passthrough"),
+            ("min_max", MinMaxScalerDF()),
+            ("robust", RobustScalerDF()),
+            ("max_abs", MaxAbsScalerDF()),
+        ]
+
+    # transformer pipeline: the affine steps are fused into a single step
+    pipe = PipelineDF(_make_transformer_steps()).fit(X)
+    pipe_fused = pipe.fuse_affine_steps()
+    assert pipe_fused.is_fitted
+    assert [name for name, _ in pipe_fused.steps] == [
+        "impute+standard+min_max+robust+max_abs"
+    ]
+    assert_frame_equal(pipe_fused.transform(X), pipe.transform(X), check_exact=False)
+
+    # regressor pipeline: the affine steps are folded into the coefficients,
+    # leaving a step to fill missing values
+    for regressor in [LinearRegressionDF(), RidgeDF(alpha=10.0)]:
+        pipe = PipelineDF(_make_transformer_steps() + [("regressor", regressor)])
+        pipe.fit(X, y)
+        for fold_into_final in [True, False]:
+            pipe_fused = pipe.fuse_affine_steps(fold_into_final=fold_into_final)
+            assert len(pipe_fused) == 2
+            # with folding, the fused step only fills missing values
+            fused_transformer = pipe_fused.steps[0][1].native_estimator
+            assert (fused_transformer.scale is None) == fold_into_final
+            assert (fused_transformer.offset is None) == fold_into_final
+            assert_series_equal(
+                pipe_fused.predict(X), pipe.predict(X), check_exact=False
+            )
+        # the original pipeline is unchanged
+        assert pipe.steps[-1][1] is regressor
+
+    # classifier pipeline without missing values: only the classifier remains
+    X_filled = X.fillna(0.0)
+    pipe = PipelineDF(
+        [
+            ("standard", StandardScalerDF()),
+            ("min_max", MinMaxScalerDF()),
+            ("classifier", LogisticRegressionDF(max_iter=1000)),
+        ]
+    ).fit(X_filled, y > y.median())
+    pipe_fused = pipe.fuse_affine_steps()
+    assert [name for name, _ in pipe_fused.steps] == ["classifier"]
+    assert_series_equal(pipe_fused.predict(X_filled), pipe.predict(X_filled))
+    assert_frame_equal(
+        pipe_fused.predict_proba(X_filled),
+        pipe.predict_proba(X_filled),
+        check_exact=False,
+    )
+
+    # steps that are not affine break up runs of affine steps
+    pipe = PipelineDF(
+        [
+            ("impute", SimpleImputerDF(add_indicator=True)),
+            ("standard", StandardScalerDF()),
+            ("select", SelectKBestDF(k=5, score_func=f_regression)),
+            ("regressor", LinearRegressionDF()),
+        ]
+    ).fit(X, y)
+    pipe_fused = pipe.fuse_affine_steps()
+    assert [step for _, step in pipe_fused.steps[:-1]] == [
+        step for _, step in pipe.steps[:-1]
+    ]
+    assert_series_equal(pipe_fused.predict(X), pipe.predict(X), check_exact=False)
+
+    with pytest.raises(NotFittedError):
+        PipelineDF([("standard", StandardScalerDF())]).fuse_affine_steps()
+
+
+def test_pipeline_df_prune_features(boston_features: pd.DataFrame) -> None:
+    rng = np.random.RandomState(42)
+    X = boston_features.mask(rng.rand(*boston_features.shape) < 0.1)
+    X["constant"] = 1.0
+    y = boston_features.iloc[:, 0] + boston_features.iloc[:, 1]
+
+    pipe = PipelineDF(
+        [
+            ("impute", SimpleImputerDF()),
+            ("variance", VarianceThresholdDF()),
+            ("standard", StandardScalerDF()),
+            ("select", SelectKBestDF(k=5, score_func=f_regression)),
+            ("rfe", RFEDF(estimator=LinearRegression(), n_features_to_select=3)),
+            ("regressor", RidgeDF()),
+        ]
+    ).fit(X, y)
+
+    # the selectors are replaced with passthrough steps, and the remaining
+    # transformers are restricted to the selected features
+    pipe_pruned = pipe.prune_features()
+    assert pipe_pruned.is_fitted
+    assert pipe_pruned.feature_names_in_.equals(
+        pipe.steps[-1][1].feature_names_in_.rename(pipe.feature_names_in_.name)
+    )
+    assert [step for _, step in pipe_pruned.steps[:-1]] == [
+        pipe_pruned.steps[0][1],
+        "passthrough",
+        pipe_pruned.steps[2][1],
+        "passthrough",
+        "passthrough",
+    ]
+    assert pipe_pruned.steps[-1][1] is pipe.steps[-1][1]
+
+    X_pruned = X.loc[:, pipe_pruned.feature_names_in_]
+    assert_series_equal(pipe_pruned.predict(X_pruned), pipe.predict(X))
+
+    # the pruned pipeline can be pickled
+    assert_series_equal(
+        joblib.load(_dump_to_buffer(pipe_pruned)).predict(X_pruned),
+        pipe.predict(X),
+    )
+
+    # steps not transforming columns independently require all their inputs,
+    # and the selectors following them are kept
+    pipe = PipelineDF(
+        [
+            ("impute", SimpleImputerDF()),
+            ("select_1", SelectKBestDF(k=8, score_func=f_regression)),
+            ("normalize", NormalizerDF()),
+            ("select_2", SelectKBestDF(k=4, score_func=f_regression)),
+            ("standard", StandardScalerDF()),
+        ]
+    ).fit(X, y)
+    pipe_pruned = pipe.prune_features()
+    assert len(pipe_pruned.feature_names_in_) == 8
+    assert [name for name, step in pipe_pruned.steps if step == "passthrough"] == [
+        "select_1"
+    ]
+    assert_frame_equal(
+        pipe_pruned.transform(X.loc[:, pipe_pruned.feature_names_in_]),
+        pipe.transform(X),
+    )
+
+    # fused affine steps can be pruned as well
+    pipe_fused = PipelineDF(
+        [
+            ("impute", SimpleImputerDF()),
+            ("standard", StandardScalerDF()),
+            ("select", SelectKBestDF(k=3, score_func=f_regression)),
+        ]
+    ).fit(X, y)
+    pipe_pruned = pipe_fused.fuse_affine_steps().prune_features()
+    assert len(pipe_pruned.feature_names_in_) == 3
+    assert_frame_equal(
+        pipe_pruned.transform(X.loc[:, pipe_pruned.feature_names_in_]),
+        pipe_fused.transform(X),
+        check_exact=False,
+    )
+
+
+def test_pipeline_df_profile(boston_features: pd.DataFrame) -> None:
+    X = boston_features
+    y = X.iloc[:, 0] + X.iloc[:, 1]
+
+    column_transformer = ColumnTransformerDF(
+        [
+            ("scale", StandardScalerDF(), X.columns[:5]),
+            ("impute", SimpleImputerDF(), X.columns[5:]),
+        ]
+    )
+    feature_union = FeatureUnionDF(
+        [("pca", PCADF(n_components=2)), ("scale", MinMaxScalerDF())]
+    )
+    pipe = PipelineDF(
+        [
+            ("columns", column_transformer),
+            ("skip", "passthrough"),
+            ("union", feature_union),
+            ("regressor", RidgeDF()),
+        ]
+    )
+
+    with pytest.raises(NotFittedError):
+        pipe.profile(X)
+
+    pipe.fit(X, y)
+
+    trace = io.StringIO()
+    profile = pipe.profile(X, trace=trace)
+
+    assert profile.index.tolist() == ["columns", "union", "regressor"]
+    assert profile.estimator.tolist() == [
+        "ColumnTransformerDF",
+        "FeatureUnionDF",
+        "RidgeDF",
+    ]
+    assert profile.method.tolist() == ["transform", "transform", "predict"]
+    assert profile.shape_in.tolist() == [X.shape, (len(X), 13), (len(X), 15)]
+    assert profile.shape_out.tolist() == [(len(X), 13), (len(X), 15), (len(X),)]
+    assert profile.dtypes_out.tolist() == ["float64: 13", "float64: 15", "float64: 1"]
+    assert profile.bytes_out.iloc[-1] == pipe.predict(X).memory_usage(deep=True)
+    assert (profile.time > 0).all()
+    assert (profile.peak_memory > 0).all()
+    assert ((profile.wrapper_share > 0) & (profile.wrapper_share < 1)).all()
+    assert (profile.wrapper_time < profile.time).all()
+
+    trace_events = json.loads(trace.getvalue())["traceEvents"]
+    assert [event["name"] for event in trace_events] == profile.index.tolist()
+    assert all(event["ph"] == "X" for event in trace_events)
+    assert trace_events[0]["args"]["shape_out"] == [len(X), 13]
+
+    # composite steps can be profiled in turn
+    profile = column_transformer.profile(X, trace_memory=False)
+    assert profile.index.tolist() == ["scale", "impute"]
+    assert profile.shape_in.tolist() == [(len(X), 5), (len(X), 8)]
+    assert profile.peak_memory.isna().all()
+
+    profile = feature_union.profile(column_transformer.transform(X))
+    assert profile.index.tolist() == ["pca", "scale"]
+    assert profile.shape_out.tolist() == [(len(X), 2), (len(X), 13)]
+
+    with pytest.raises(TypeError):
+        pipe.profile(X.values)
+
+
+def _dump_to_buffer(obj: Any) -> io.BytesIO:
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    buffer.seek(0)
+    return buffer
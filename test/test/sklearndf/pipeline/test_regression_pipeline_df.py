@@ -5,8 +5,14 @@ from lightgbm import LGBMRegressor
 from sklearn.preprocessing import OneHotEncoder
 
 from sklearndf.pipeline import RegressorPipelineDF
+from sklearndf.regression import RandomForestRegressorDF
 from sklearndf.regression.extra import LGBMRegressorDF
-from test.sklearndf.pipeline import make_simple_transformer
+from test.sklearndf.pipeline import (
+    STEP_IMPUTE,
+    STEP_ONE_HOT_ENCODE,
+    make_simple_transformer,
+)
+from test.synthetic import PREFIX_CATEGORY, PREFIX_FLOAT, make_data
 
 
 def test_regression_pipeline_df(
@@ -32,3 +38,69 @@ def test_regression_pipeline_df(
     with pytest.raises(TypeError):
         # noinspection PyTypeChecker
         RegressorPipelineDF(regressor=LGBMRegressor(), preprocessing=OneHotEncoder())
+
+
+def test_regression_pipeline_df_memory_usage() -> None:
+    X, y = make_data(n_rows=1_000, n_float=5, n_category=2, cardinality=200)
+
+    rpdf = RegressorPipelineDF(
+        regressor=RandomForestRegressorDF(n_estimators=5, random_state=42),
+        preprocessing=make_simple_transformer(
+            impute_median_columns=X.columns[X.columns.str.startswith(PREFIX_FLOAT)],
+            one_hot_encode_columns=X.columns[X.columns.str.startswith(PREFIX_CATEGORY)],
+        ),
+    ).fit(X, y)
+
+    memory_usage = rpdf.memory_usage()
+    assert memory_usage.columns.tolist() == [
+        "estimator",
+        "arrays",
+        "indexes",
+        "other",
+        "total",
+    ]
+    assert memory_usage.index.tolist() == [
+        "",
+        "preprocessing",
+        f"preprocessing__{STEP_IMPUTE}",
+        f"preprocessing__{STEP_ONE_HOT_ENCODE}",
+        "regressor",
+    ]
+    assert memory_usage.estimator.tolist() == [
+        "RegressorPipelineDF",
+        "ColumnTransformerDF",
+        "SimpleImputerDF",
+        "OneHotEncoderDF",
+        "RandomForestRegressorDF",
+    ]
+    assert (
+        memory_usage.total
+        == memory_usage.loc[:, ["arrays", "indexes", "other"]].sum(axis=1)
+    ).all()
+
+    # the node arrays of the trees are counted with the forest
+    tree_bytes = sum(
+        tree.tree_.__getstate__()["nodes"].nbytes
+        + tree.tree_.__getstate__()["values"].nbytes
+        for tree in rpdf.regressor.estimators_
+    )
+    assert memory_usage.loc["regressor", "arrays"] >= tree_bytes
+
+    # the categories of the encoder are counted, including the category strings
+    categories = rpdf.preprocessing.transformers_[1][1].categories_
+    assert memory_usage.loc[f"preprocessing__{STEP_ONE_HOT_ENCODE}", "arrays"] >= sum(
+        c.nbytes for c in categories
+    )
+    memory_usage_shallow = rpdf.memory_usage(deep=False)
+    assert (memory_usage_shallow.total <= memory_usage.total).all()
+    assert (
+        memory_usage_shallow.loc[f"preprocessing__{STEP_ONE_HOT_ENCODE}", "other"]
+        < memory_usage.loc[f"preprocessing__{STEP_ONE_HOT_ENCODE}", "other"]
+    )
+
+    # the cached feature names are counted with the wrappers
+    preprocessing = rpdf.preprocessing
+    assert memory_usage.loc["preprocessing", "indexes"] >= (
+        preprocessing.feature_names_in_.memory_usage(deep=True)
+        + preprocessing.feature_names_original_.memory_usage(deep=True)
+    )
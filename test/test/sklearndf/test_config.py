@@ -0,0 +1,153 @@
+from typing import Type
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from sklearndf import TransformerDF, config_context, get_config, set_config
+from sklearndf.pipeline import PipelineDF
+from sklearndf.regression import LinearRegressionDF
+from sklearndf.transformation import (
+    BinarizerDF,
+    ColumnTransformerDF,
+    FunctionTransformerDF,
+    MaxAbsScalerDF,
+    MinMaxScalerDF,
+    NormalizerDF,
+    OneHotEncoderDF,
+    PowerTransformerDF,
+    QuantileTransformerDF,
+    RobustScalerDF,
+    SimpleImputerDF,
+    StandardScalerDF,
+)
+from sklearndf.transformation.extra import OutlierRemoverDF
+
+COLUMN_PRESERVING_TRANSFORMERS = [
+    BinarizerDF,
+    FunctionTransformerDF,
+    MaxAbsScalerDF,
+    MinMaxScalerDF,
+    NormalizerDF,
+    PowerTransformerDF,
+    QuantileTransformerDF,
+    RobustScalerDF,
+    SimpleImputerDF,
+    StandardScalerDF,
+]
+
+
+@pytest.fixture
+def float_df() -> pd.DataFrame:
+    rng = np.random.RandomState(42)
+    return pd.DataFrame(
+        data=rng.randn(50, 4), columns=["a", "b", "c", "d"], dtype=np.float64
+    )
+
+
+def test_config() -> None:
+    assert get_config()["float_dtype"] is None
+
+    with config_context(float_dtype="float32"):
+        assert get_config()["float_dtype"] == np.float32
+
+        with config_context(float_dtype=None):
+            assert get_config()["float_dtype"] is None
+
+        assert get_config()["float_dtype"] == np.float32
+
+    assert get_config()["float_dtype"] is None
+
+    set_config(float_dtype=np.float32)
+    try:
+        set_config()
+        assert get_config()["float_dtype"] == np.float32
+    finally:
+        set_config(float_dtype=None)
+
+    with pytest.raises(ValueError):
+        set_config(float_dtype="int32")
+
+    with pytest.raises(TypeError):
+        set_config(float_dtype="no_dtype")
+
+    with config_context(binary_dtype=bool):
+        assert get_config()["binary_dtype"] == np.bool_
+        assert get_config()["float_dtype"] is None
+
+    with pytest.raises(ValueError):
+        set_config(binary_dtype="float32")
+
+    assert get_config()["float_dtype"] is None
+    assert get_config()["binary_dtype"] is None
+
+
+@pytest.mark.parametrize(
+    argnames="transformer_cls", argvalues=COLUMN_PRESERVING_TRANSFORMERS
+)
+@pytest.mark.parametrize(argnames="float_dtype", argvalues=[None, "float32"])
+@pytest.mark.parametrize(argnames="input_dtype", argvalues=["float32", "float64"])
+def test_float_dtype_column_preserving(
+    transformer_cls: Type[TransformerDF],
+    float_dtype: str,
+    input_dtype: str,
+    float_df: pd.DataFrame,
+) -> None:
+    X = float_df.astype(input_dtype)
+
+    with config_context(float_dtype=float_dtype):
+        transformer = transformer_cls()
+        transformed_fit = transformer.fit_transform(X)
+        transformed = transformer.transform(X)
+
+    expected_dtype = np.dtype(input_dtype if float_dtype is None else float_dtype)
+
+    for df in (transformed_fit, transformed):
+        assert df.columns.equals(X.columns)
+        assert (df.dtypes == expected_dtype).all(), df.dtypes
+
+    # results in reduced precision match the full precision results
+    transformed_64 = transformer_cls().fit_transform(float_df)
+    np.testing.assert_allclose(
+        transformed.values, transformed_64.values, rtol=1e-3, atol=1e-3
+    )
+
+
+def test_float_dtype_pipeline(float_df: pd.DataFrame) -> None:
+    X = float_df.assign(cat=list("xyz" * 16 + "xy"))
+    y = pd.Series(data=np.arange(len(X), dtype=np.float64), index=X.index)
+
+    pipeline = PipelineDF(
+        steps=[
+            (
+                "preprocess",
+                ColumnTransformerDF(
+                    transformers=[
+                        ("scale", StandardScalerDF(), ["a", "b", "c", "d"]),
+                        ("encode", OneHotEncoderDF(sparse=False), ["cat"]),
+                    ]
+                ),
+            ),
+            ("outliers", OutlierRemoverDF()),
+            ("impute", SimpleImputerDF()),
+            ("regress", LinearRegressionDF()),
+        ]
+    )
+
+    with config_context(float_dtype="float32"), patch.object(
+        LinearRegression, "fit", autospec=True, side_effect=LinearRegression.fit
+    ) as fit:
+        pipeline.fit(X, y)
+        transformed = pipeline.named_steps["outliers"].transform(
+            pipeline.named_steps["preprocess"].transform(X)
+        )
+        predictions = pipeline.predict(X)
+
+        # the final learner receives float32 features
+        X_fit = fit.call_args[0][1]
+        assert (X_fit.dtypes == np.float32).all()
+
+    assert (transformed.dtypes == np.float32).all()
+    assert len(predictions) == len(X)
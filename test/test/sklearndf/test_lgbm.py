@@ -0,0 +1,266 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+from unittest.mock import patch
+
+import joblib
+import lightgbm
+import lightgbm.sklearn
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal, assert_series_equal
+
+from sklearndf import config_context, set_config
+from sklearndf._lgbm import _dataset_cache
+from sklearndf.classification.extra import LGBMClassifierDF
+from sklearndf.pipeline import RegressorPipelineDF
+from sklearndf.regression.extra import LGBMRegressorDF
+from sklearndf.transformation import ColumnTransformerDF, SimpleImputerDF
+
+
+@pytest.fixture
+def lgbm_df() -> pd.DataFrame:
+    rng = np.random.RandomState(42)
+    n = 500
+    df = pd.DataFrame(data=rng.randn(n, 5), columns=[f"x{i}" for i in range(5)])
+    df["y"] = df["x0"] * 2 + df["x1"] + rng.randn(n) * 0.1
+    return df
+
+
+@pytest.fixture
+def dataset_cache() -> Iterator[None]:
+    _dataset_cache.clear()
+    with config_context(lgbm_dataset_cache_size=4):
+        yield
+    _dataset_cache.clear()
+
+
+def test_lgbm_dataset_cache(lgbm_df: pd.DataFrame, dataset_cache: None) -> None:
+    X = lgbm_df.drop(columns="y")
+    y = lgbm_df["y"]
+    X_fold = X.iloc[100:400]
+    y_fold = y.iloc[100:400]
+
+    with config_context(lgbm_dataset_cache_size=0):
+        predictions_uncached = LGBMRegressorDF(n_estimators=10).fit(X, y).predict(X)
+    assert len(_dataset_cache) == 0
+
+    with patch.object(
+        lightgbm.Dataset,
+        "_lazy_init",
+        autospec=True,
+        side_effect=lightgbm.Dataset._lazy_init,
+    ) as lazy_init:
+        predictions = LGBMRegressorDF(n_estimators=10).fit(X, y).predict(X)
+        assert lazy_init.call_count == 1
+
+        # refitting with different training parameters re-uses the binned dataset
+        LGBMRegressorDF(n_estimators=10, learning_rate=0.2).fit(X, y)
+        assert lazy_init.call_count == 1
+
+        # the dataset of a subset of rows is derived from the cached dataset
+        LGBMRegressorDF(n_estimators=10).fit(X_fold, y_fold)
+        assert lazy_init.call_count == 1
+
+        # different binning parameters, data, or labels require a new dataset
+        LGBMRegressorDF(n_estimators=10, subsample_for_bin=1000).fit(X, y)
+        LGBMRegressorDF(n_estimators=10).fit(X * 2, y)
+        LGBMRegressorDF(n_estimators=10).fit(X_fold, y_fold * 2)
+        assert lazy_init.call_count == 4
+
+    assert_series_equal(predictions, predictions_uncached)
+
+    # the datasets of failed fits are not cached
+    assert len(_dataset_cache) == 4
+    with pytest.raises(lightgbm.basic.LightGBMError):
+        LGBMRegressorDF(n_estimators=10, objective="unknown").fit(X * 3, y)
+    assert len(_dataset_cache) == 4
+    assert lightgbm.sklearn.Dataset is lightgbm.Dataset
+
+    # the least recently used datasets are evicted
+    with config_context(lgbm_dataset_cache_size=1):
+        LGBMRegressorDF(n_estimators=10).fit(X, y)
+    assert len(_dataset_cache) == 1
+
+    # the dataset class of lightgbm is restored after fitting
+    assert lightgbm.sklearn.Dataset is lightgbm.Dataset
+
+
+def test_lgbm_dataset_cache_threads(lgbm_df: pd.DataFrame, dataset_cache: None) -> None:
+    X = lgbm_df.drop(columns="y")
+    y = lgbm_df["y"]
+    predictions = LGBMRegressorDF(n_estimators=10).fit(X, y).predict(X)
+
+    def _fit_predict(n_fit: int) -> pd.Series:
+        # while fits use the cache, the LightGBM dataset type remains usable
+        assert isinstance(lightgbm.Dataset(X), lightgbm.sklearn.Dataset)
+        return LGBMRegressorDF(n_estimators=10).fit(X, y).predict(X)
+
+    # fits using the cache run concurrently
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for predictions_thread in executor.map(_fit_predict, range(8)):
+            assert_series_equal(predictions_thread, predictions)
+
+    assert len(_dataset_cache) == 1
+    assert lightgbm.sklearn.Dataset is lightgbm.Dataset
+
+
+def test_lgbm_dataset_cache_classifier(
+    lgbm_df: pd.DataFrame, dataset_cache: None
+) -> None:
+    X = lgbm_df.drop(columns="y")
+    y = pd.Series(
+        np.digitize(lgbm_df["y"], np.quantile(lgbm_df["y"], [0.3, 0.7])),
+        index=X.index,
+    )
+
+    LGBMClassifierDF(n_estimators=10).fit(X, y)
+
+    # rows without class 0, so class labels are encoded differently from the full
+    # data, and the cached dataset cannot be used for the subset of rows
+    fold = y > 0
+    classifier = LGBMClassifierDF(n_estimators=10).fit(X[fold], y[fold])
+    with config_context(lgbm_dataset_cache_size=0):
+        classifier_uncached = LGBMClassifierDF(n_estimators=10).fit(X[fold], y[fold])
+
+    assert list(classifier.classes_) == [1, 2]
+    assert_frame_equal(
+        classifier.predict_proba(X), classifier_uncached.predict_proba(X)
+    )
+
+
+def test_lgbm_dataset_cache_config() -> None:
+    with pytest.raises(ValueError, match="lgbm_dataset_cache_size"):
+        set_config(lgbm_dataset_cache_size=-1)
+    with pytest.raises(ValueError, match="lgbm_dataset_cache_size"):
+        set_config(lgbm_dataset_cache_size=1.5)
+
+
+def test_lgbm_categorical_passthrough(lgbm_df: pd.DataFrame) -> None:
+    X = lgbm_df.drop(columns="y").assign(
+        color=pd.Categorical(np.where(lgbm_df["x2"] > 0, "red", "blue")),
+        size=pd.Categorical(np.where(lgbm_df["x3"] > 0, 2, 1)),
+    )
+    X.loc[:10, "color"] = np.nan
+    y = lgbm_df["y"] + (X["color"] == "red") * 3
+
+    pipeline = RegressorPipelineDF(
+        preprocessing=ColumnTransformerDF(
+            transformers=[
+                (
+                    "impute",
+                    SimpleImputerDF(strategy="most_frequent"),
+                    ["color", "size"],
+                ),
+                ("keep", "passthrough", ["x0", "x1", "x2", "x3", "x4"]),
+            ]
+        ),
+        regressor=LGBMRegressorDF(n_estimators=10),
+    ).fit(X, y)
+
+    # the categorical features reach LightGBM as categoricals
+    booster: lightgbm.Booster = pipeline.regressor.native_estimator.booster_
+    assert booster.pandas_categorical == [["blue", "red"], [1, 2]]
+    assert pipeline.regressor.feature_names_in_.to_list()[:2] == ["color", "size"]
+    assert len(pipeline.predict(X)) == len(X)
+
+
+def test_lgbm_continue_fit(lgbm_df: pd.DataFrame) -> None:
+    X = lgbm_df.drop(columns="y").assign(
+        color=pd.Categorical(np.where(lgbm_df["x2"] > 0, "red", "blue"))
+    )
+    y = lgbm_df["y"]
+    X_old, y_old = X.iloc[:300], y.iloc[:300]
+    X_new, y_new = X.iloc[300:], y.iloc[300:]
+
+    regressor = LGBMRegressorDF(n_estimators=10).fit(X_old, y_old)
+    predictions_old = regressor.predict(X_old)
+
+    # categories in a different order are aligned with the original fit
+    X_new_reordered = X_new.assign(
+        color=X_new["color"].cat.reorder_categories(["red", "blue"])
+    )
+    assert regressor.continue_fit(X_new_reordered, y_new, n_more_estimators=5) is (
+        regressor
+    )
+
+    booster: lightgbm.Booster = regressor.native_estimator.booster_
+    assert booster.current_iteration() == 15
+    assert regressor.n_estimators == 15
+
+    # the first iterations are those of the original model
+    assert_series_equal(
+        pd.Series(booster.predict(X_old, num_iteration=10), index=X_old.index),
+        predictions_old,
+        check_names=False,
+    )
+
+    # continued training is equivalent to training with the original model as the
+    # initial model
+    init_model = LGBMRegressorDF(n_estimators=10).fit(X_old, y_old)
+    expected = lightgbm.LGBMRegressor(n_estimators=5).fit(
+        X_new, y_new, init_model=init_model.native_estimator.booster_
+    )
+    np.testing.assert_allclose(
+        regressor.predict(X).values, expected.predict(X), rtol=1e-10
+    )
+
+    # the schema of the new data must match the original fit
+    with pytest.raises(ValueError, match="same columns"):
+        regressor.continue_fit(X_new.iloc[:, ::-1], y_new, n_more_estimators=5)
+    with pytest.raises(ValueError, match="categorical columns"):
+        regressor.continue_fit(
+            X_new.astype(dict(color=object)).assign(color=1.0),
+            y_new,
+            n_more_estimators=5,
+        )
+    with pytest.raises(ValueError, match="n_more_estimators"):
+        regressor.continue_fit(X_new, y_new, n_more_estimators=0)
+    with pytest.raises(ValueError, match="n_more_estimators"):
+        regressor.continue_fit(X_new, y_new, n_more_estimators=True)
+    assert booster.current_iteration() == 15
+
+    classifier = LGBMClassifierDF(n_estimators=10).fit(X_old, y_old > 0)
+    with pytest.raises(ValueError, match="same classes"):
+        classifier.continue_fit(X_new, y_new > 100, n_more_estimators=5)
+    # numpy integers are accepted as the number of iterations
+    classifier.continue_fit(X_new, y_new > 0, n_more_estimators=np.int64(5))
+    assert classifier.native_estimator.booster_.current_iteration() == 15
+
+
+def test_lgbm_predict_num_threads(lgbm_df: pd.DataFrame) -> None:
+    X = lgbm_df.drop(columns="y")
+    y = lgbm_df["y"]
+
+    regressor = LGBMRegressorDF(n_estimators=10, n_jobs=2).fit(X, y)
+    classifier = LGBMClassifierDF(n_estimators=10, n_jobs=2).fit(X, y > 0)
+
+    def _num_threads(predict: Callable[..., Any], X: pd.DataFrame, **params) -> int:
+        with patch.object(
+            lightgbm.Booster,
+            "predict",
+            autospec=True,
+            side_effect=lightgbm.Booster.predict,
+        ) as booster_predict:
+            predict(X, **params)
+        return booster_predict.call_args[1]["num_threads"]
+
+    for predict in (regressor.predict, classifier.predict, classifier.predict_proba):
+        assert _num_threads(predict, X) == 2
+        assert _num_threads(predict, X.iloc[:10]) == 2
+
+        with config_context(lgbm_parallel_predict_min_rows=100):
+            # small batches are predicted using a single thread
+            assert _num_threads(predict, X) == 2
+            assert _num_threads(predict, X.iloc[:10]) == 1
+            # the number of threads can be set for each prediction
+            assert _num_threads(predict, X, num_threads=3) == 3
+
+    # with default parameters, predictions use all cores
+    regressor_default = LGBMRegressorDF(n_estimators=10).fit(X, y)
+    assert _num_threads(regressor_default.predict, X) == joblib.cpu_count()
+    regressor_default.native_estimator.set_params(n_jobs=None)
+    assert _num_threads(regressor_default.predict, X) == joblib.cpu_count()
+
+    with pytest.raises(ValueError, match="lgbm_parallel_predict_min_rows"):
+        set_config(lgbm_parallel_predict_min_rows=-1)
@@ -0,0 +1,140 @@
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from sklearndf import EstimatorDF, ModelRegistry, config_context
+from sklearndf.pipeline import ClassifierPipelineDF, RegressorPipelineDF
+from sklearndf.regression import RandomForestRegressorDF
+from sklearndf.transformation import SimpleImputerDF
+
+
+@pytest.fixture
+def model_directory(
+    boston_features: pd.DataFrame, boston_target_sr: pd.Series, tmp_path: Path
+) -> Path:
+    for i in range(3):
+        RegressorPipelineDF(
+            preprocessing=SimpleImputerDF(),
+            regressor=RandomForestRegressorDF(n_estimators=5, random_state=i),
+        ).fit(boston_features, boston_target_sr).save(
+            tmp_path / f"model_{i}{ModelRegistry.MODEL_SUFFIX}"
+        )
+    return tmp_path
+
+
+def test_model_registry(model_directory: Path, boston_features: pd.DataFrame) -> None:
+    model_size = int(
+        RegressorPipelineDF.load(model_directory / "model_0.sklearndf")
+        .memory_usage()["total"]
+        .sum()
+    )
+
+    registry: ModelRegistry[RegressorPipelineDF] = ModelRegistry(
+        max_memory=int(model_size * 2.5),
+        directory=model_directory,
+        estimator_type=RegressorPipelineDF,
+    )
+
+    assert "model_0" in registry
+    assert "model_3" not in registry
+    assert registry.loaded == []
+
+    model_0 = registry.get("model_0")
+    assert isinstance(model_0, RegressorPipelineDF)
+    assert model_0.predict(boston_features).shape == (len(boston_features),)
+
+    # lazily cached attributes are computed when loading
+    assert model_0.preprocessing._features_original is not None
+
+    assert registry["model_0"] is model_0
+    registry.get("model_1")
+    assert registry.loaded == ["model_0", "model_1"]
+    assert registry.memory_usage <= registry.max_memory
+
+    # model_0 is requested more recently than model_1, so model_1 is evicted
+    registry.get("model_0")
+    registry.get("model_2")
+    assert registry.loaded == ["model_0", "model_2"]
+    assert registry.memory_usage <= registry.max_memory
+    assert (registry.n_hits, registry.n_misses, registry.n_evictions) == (2, 3, 1)
+
+    # evicted models are loaded again when requested
+    assert registry.get("model_1") is not None
+    assert registry.loaded == ["model_2", "model_1"]
+
+    registry.evict("model_2")
+    assert registry.loaded == ["model_1"]
+
+    registry.clear()
+    assert registry.loaded == []
+    assert registry.memory_usage == 0
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("model_3")
+
+
+def test_model_registry_register(model_directory: Path) -> None:
+    registry = ModelRegistry(max_memory=1)
+
+    with pytest.raises(KeyError, match="no model registered under name 'a'"):
+        registry.get("a")
+
+    registry.register("a", model_directory / "model_0.sklearndf")
+    assert "a" in registry
+
+    # a model exceeding the memory budget on its own is kept until the next model is
+    # loaded
+    model_a = registry.get("a")
+    assert registry.loaded == ["a"]
+
+    # registering another model file under the same name evicts the loaded model
+    registry.register("a", model_directory / "model_1.sklearndf")
+    assert registry.loaded == []
+    assert registry.get("a") is not model_a
+
+    registry = ModelRegistry(max_memory=1, estimator_type=ClassifierPipelineDF)
+    registry.register("a", model_directory / "model_0.sklearndf")
+    with pytest.raises(TypeError, match="ClassifierPipelineDF"):
+        registry.get("a")
+
+    with pytest.raises(ValueError, match="max_memory"):
+        ModelRegistry(max_memory=0)
+
+
+def test_model_registry_register_while_loading(model_directory: Path) -> None:
+    registry = ModelRegistry(max_memory=10**9)
+    registry.register("a", model_directory / "model_0.sklearndf")
+
+    load = EstimatorDF.load
+
+    def _load_and_register(path: Path, **kwargs: Any) -> EstimatorDF:
+        registry.register("a", model_directory / "model_1.sklearndf")
+        return load(path, **kwargs)
+
+    # a model file registered while the previous model file of the same name is
+    # being loaded replaces the loaded estimator
+    with patch.object(EstimatorDF, "load", side_effect=_load_and_register):
+        assert registry.get("a").final_estimator.random_state == 0
+    assert registry.loaded == []
+    assert registry.get("a").final_estimator.random_state == 1
+
+
+def test_model_registry_mmap(
+    boston_features: pd.DataFrame, boston_target_sr: pd.Series, tmp_path: Path
+) -> None:
+    with config_context(compile_tree_ensembles=True):
+        RandomForestRegressorDF(n_estimators=5, random_state=42).fit(
+            boston_features, boston_target_sr
+        ).save(tmp_path / f"forest{ModelRegistry.MODEL_SUFFIX}")
+
+    registry = ModelRegistry(max_memory=10**9, directory=tmp_path)
+    registry_mmap = ModelRegistry(max_memory=10**9, directory=tmp_path, mmap_mode="r")
+    registry.get("forest")
+    registry_mmap.get("forest")
+
+    # arrays memory-mapped from the model file, e.g., the compiled trees, do not
+    # count against the memory budget
+    assert 0 < registry_mmap.memory_usage < registry.memory_usage
@@ -0,0 +1,234 @@
+"""
+Performance and memory regression tests of wrappers and pipelines on synthetic data
+sets, comparing the DF estimators with the native estimators they wrap.
+
+Timing tests are marked as benchmarks, and only run with option ``--benchmark``.
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import MissingIndicator, SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from sklearndf.pipeline import PipelineDF
+from sklearndf.transformation import (
+    ColumnTransformerDF,
+    MissingIndicatorDF,
+    OneHotEncoderDF,
+    SimpleImputerDF,
+    StandardScalerDF,
+)
+from test.synthetic import (
+    PREFIX_CATEGORY,
+    make_data,
+    make_frame,
+    make_tall_frame,
+    make_wide_frame,
+)
+
+# maximum ratio of the time of a DF estimator to the time of the native estimator,
+# and additional time in seconds to allow for timing noise
+MAX_TIME_RATIO = 2.0
+TIME_SLACK = 0.05
+
+# maximum ratio of the peak memory of a DF estimator to the peak memory of the native
+# estimator, and additional memory in bytes for the data frame indices
+MAX_MEMORY_RATIO = 1.25
+MEMORY_SLACK = 1024 * 1024
+
+
+def _best_time(call: Callable[[], Any], repeat: int = 3) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _peak_memory(call: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _check_time(
+    transform_df: Callable[[], Any], transform_native: Callable[[], Any]
+) -> None:
+    time_df = _best_time(transform_df)
+    time_native = _best_time(transform_native)
+    assert time_df <= time_native * MAX_TIME_RATIO + TIME_SLACK, (
+        f"DF estimator takes {time_df:.3f} s, "
+        f"native estimator takes {time_native:.3f} s"
+    )
+
+
+def _check_memory(
+    transform_df: Callable[[], Any], transform_native: Callable[[], Any]
+) -> None:
+    memory_df = _peak_memory(transform_df)
+    memory_native = _peak_memory(transform_native)
+    assert memory_df <= memory_native * MAX_MEMORY_RATIO + MEMORY_SLACK, (
+        f"DF estimator allocates {memory_df:,} bytes, "
+        f"native estimator allocates {memory_native:,} bytes"
+    )
+
+
+def test_synthetic_data() -> None:
+    X = make_tall_frame(n_rows=10_000, n_cols=9, missing=0.1, cardinality=500)
+
+    # the generators are deterministic
+    assert_frame_equal(
+        X, make_tall_frame(n_rows=10_000, n_cols=9, missing=0.1, cardinality=500)
+    )
+
+    assert X.shape == (10_000, 9)
+    assert X.dtypes.astype(str).value_counts().to_dict() == {
+        "float64": 2,
+        "float32": 1,
+        "int64": 2,
+        "bool": 2,
+        "object": 2,
+    }
+    assert X.isna().mean()[X.dtypes == np.float64].between(0.09, 0.11).all()
+    assert not X.select_dtypes(["int64", "bool"]).isna().any().any()
+    assert X[f"{PREFIX_CATEGORY}0"].nunique() > 100
+
+    assert make_wide_frame(n_rows=10, n_cols=1_000).shape == (10, 1_000)
+    assert (
+        make_frame(n_rows=10, n_float=0, n_category=1, category_dtype="category")
+        .dtypes.iloc[0]
+        .name
+        == "category"
+    )
+
+    X, y = make_data(n_rows=1_000, n_outputs=3, classification=True, n_float=5)
+    assert X.shape == (1_000, 5)
+    assert y.shape == (1_000, 3)
+    assert (y.mean() == 0.5).all()
+
+    X, y = make_data(n_rows=1_000, n_float=5, n_bool=2)
+    assert isinstance(y, pd.Series)
+    assert y.std() > 0.5
+
+
+def _imputer_transforms(
+    imputer_df: Any, imputer_native: Any
+) -> Tuple[Callable[[], Any], Callable[[], Any]]:
+    X = make_wide_frame(n_rows=500, n_cols=1_000, missing=0.1)
+
+    imputer_df.fit(X)
+    imputer_native.fit(X)
+
+    return lambda: imputer_df.transform(X), lambda: imputer_native.transform(X)
+
+
+def _pipeline_transforms() -> Tuple[Callable[[], Any], Callable[[], Any]]:
+    X = make_wide_frame(n_rows=500, n_cols=1_000, missing=0.1)
+
+    pipeline_df = PipelineDF(
+        [("impute", SimpleImputerDF()), ("scale", StandardScalerDF())]
+    ).fit(X)
+    pipeline_native = Pipeline(
+        [("impute", SimpleImputer()), ("scale", StandardScaler())]
+    ).fit(X)
+
+    return lambda: pipeline_df.transform(X), lambda: pipeline_native.transform(X)
+
+
+def _column_transformer_transforms(
+    n_rows: int,
+) -> Tuple[Callable[[], Any], Callable[[], Any]]:
+    X = make_tall_frame(n_rows=n_rows, n_cols=8, missing=0.05, cardinality=100)
+
+    def _make_transformers(
+        imputer: Any, scaler: Any, encoder: Any, pipeline: Any
+    ) -> List[Tuple[str, Any, List[str]]]:
+        columns_category = [
+            column for column in X.columns if column.startswith(PREFIX_CATEGORY)
+        ]
+        columns_numeric = [
+            column for column in X.columns if column not in columns_category
+        ]
+        return [
+            (
+                "numeric",
+                pipeline([("impute", imputer()), ("scale", scaler())]),
+                columns_numeric,
+            ),
+            (
+                "category",
+                pipeline(
+                    [
+                        ("impute", imputer(strategy="most_frequent")),
+                        ("encode", encoder(sparse=False, handle_unknown="ignore")),
+                    ]
+                ),
+                columns_category,
+            ),
+        ]
+
+    column_transformer_df = ColumnTransformerDF(
+        _make_transformers(
+            SimpleImputerDF, StandardScalerDF, OneHotEncoderDF, PipelineDF
+        )
+    ).fit(X)
+    column_transformer_native = ColumnTransformer(
+        _make_transformers(SimpleImputer, StandardScaler, OneHotEncoder, Pipeline)
+    ).fit(X)
+
+    return (
+        lambda: column_transformer_df.transform(X),
+        lambda: column_transformer_native.transform(X),
+    )
+
+
+IMPUTERS = pytest.mark.parametrize(
+    argnames=["imputer_df", "imputer_native"],
+    argvalues=[
+        (SimpleImputerDF(), SimpleImputer()),
+        (SimpleImputerDF(add_indicator=True), SimpleImputer(add_indicator=True)),
+        (MissingIndicatorDF(), MissingIndicator()),
+    ],
+)
+
+
+@IMPUTERS
+def test_imputer_memory(imputer_df: Any, imputer_native: Any) -> None:
+    _check_memory(*_imputer_transforms(imputer_df, imputer_native))
+
+
+@pytest.mark.benchmark
+@IMPUTERS
+def test_imputer_time(imputer_df: Any, imputer_native: Any) -> None:
+    _check_time(*_imputer_transforms(imputer_df, imputer_native))
+
+
+def test_pipeline_memory() -> None:
+    _check_memory(*_pipeline_transforms())
+
+
+@pytest.mark.benchmark
+def test_pipeline_time() -> None:
+    _check_time(*_pipeline_transforms())
+
+
+def test_column_transformer_memory() -> None:
+    _check_memory(*_column_transformer_transforms(n_rows=10_000))
+
+
+@pytest.mark.benchmark
+def test_column_transformer_time() -> None:
+    _check_time(*_column_transformer_transforms(n_rows=50_000))
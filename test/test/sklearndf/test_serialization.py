@@ -0,0 +1,157 @@
+import multiprocessing
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_series_equal
+
+import sklearndf
+from sklearndf import EstimatorDF, config_context
+from sklearndf.classification import RandomForestClassifierDF
+from sklearndf.pipeline import ClassifierPipelineDF, PipelineDF, RegressorPipelineDF
+from sklearndf.regression import LinearRegressionDF, RandomForestRegressorDF
+from sklearndf.transformation import SimpleImputerDF
+
+
+@pytest.fixture
+def regressor_pipeline(
+    boston_features: pd.DataFrame, boston_target_sr: pd.Series
+) -> RegressorPipelineDF:
+    return RegressorPipelineDF(
+        preprocessing=SimpleImputerDF(),
+        regressor=RandomForestRegressorDF(n_estimators=10, random_state=42),
+    ).fit(boston_features, boston_target_sr)
+
+
+@pytest.mark.parametrize(argnames="mmap_mode", argvalues=[None, "r", "c"])
+def test_save_load(
+    regressor_pipeline: RegressorPipelineDF,
+    boston_features: pd.DataFrame,
+    tmp_path: Path,
+    mmap_mode: Optional[str],
+) -> None:
+    path = tmp_path / "model.sklearndf"
+    regressor_pipeline.save(path)
+
+    loaded = RegressorPipelineDF.load(path, mmap_mode=mmap_mode)
+
+    assert type(loaded) is RegressorPipelineDF
+    assert loaded.is_fitted
+    assert_series_equal(
+        loaded.predict(boston_features), regressor_pipeline.predict(boston_features)
+    )
+    assert loaded.feature_names_in_.equals(regressor_pipeline.feature_names_in_)
+
+    # the model can be loaded via any base class
+    assert isinstance(EstimatorDF.load(path, mmap_mode=mmap_mode), RegressorPipelineDF)
+
+
+def test_save_load_arrays(tmp_path: Path) -> None:
+    path = tmp_path / "model.sklearndf"
+
+    X = pd.DataFrame(
+        np.random.RandomState(42).rand(1_000, 20), columns=[f"x{i}" for i in range(20)]
+    )
+    regressor = LinearRegressionDF().fit(X, X.iloc[:, 0])
+
+    # a large fortran-ordered array, referenced twice
+    shared = np.asfortranarray(np.arange(2_000, dtype=np.float64).reshape(100, 20))
+    regressor.native_estimator.shared_1_ = shared
+    regressor.native_estimator.shared_2_ = shared
+
+    regressor.save(path)
+
+    for mmap_mode, writeable in [(None, True), ("r", False), ("c", True)]:
+        loaded = LinearRegressionDF.load(path, mmap_mode=mmap_mode)
+        shared_1 = loaded.native_estimator.shared_1_
+        assert shared_1 is loaded.native_estimator.shared_2_
+        assert np.array_equal(shared_1, shared)
+        assert shared_1.flags.f_contiguous
+        assert shared_1.flags.writeable == writeable
+        assert np.array_equal(
+            loaded.native_estimator.coef_, regressor.native_estimator.coef_
+        )
+
+        if writeable:
+            # changes are not written back to the model file
+            shared_1[:] = 0
+            assert np.array_equal(
+                LinearRegressionDF.load(path).native_estimator.shared_1_, shared
+            )
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires forking worker processes")
+def test_load_shared(
+    iris_features: pd.DataFrame, iris_target_sr: pd.Series, tmp_path: Path
+) -> None:
+    path = tmp_path / "model.sklearndf"
+
+    with config_context(compile_tree_ensembles=True):
+        pipeline = ClassifierPipelineDF(
+            preprocessing=SimpleImputerDF(),
+            classifier=RandomForestClassifierDF(n_estimators=50, random_state=42),
+        ).fit(iris_features, iris_target_sr)
+        pipeline.save(path)
+
+        # saving does not modify the estimator
+        assert pipeline.final_estimator._compiled_ensemble is None
+
+        loaded = ClassifierPipelineDF.load(path, mmap_mode="r")
+
+        # lazily cached attributes were computed before saving
+        assert loaded.preprocessing._features_original is not None
+
+        # the compiled trees are memory-mapped from the model file
+        compiled = loaded.final_estimator._compiled_ensemble
+        assert not compiled.children.flags.writeable
+        assert not compiled.threshold.flags.writeable
+
+        # forked workers predict from the memory-mapped model
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            predictions = pool.map(
+                loaded.predict, [iris_features.iloc[:75], iris_features.iloc[75:]]
+            )
+
+        assert_series_equal(pd.concat(predictions), loaded.predict(iris_features))
+
+
+def test_read_metadata(regressor_pipeline: RegressorPipelineDF, tmp_path: Path) -> None:
+    path = tmp_path / "model.sklearndf"
+    regressor_pipeline.save(path)
+
+    metadata = EstimatorDF.read_metadata(path)
+
+    assert metadata["estimator_type"] == (
+        "sklearndf.pipeline._learner_pipeline.RegressorPipelineDF"
+    )
+    assert metadata["is_fitted"]
+    # model files can be loaded by all supported Python versions
+    assert metadata["pickle_protocol"] == 4
+    assert metadata["sklearndf_version"] == sklearndf.__version__
+    assert [component for component, _ in metadata["components"]] == list(
+        regressor_pipeline.memory_usage(deep=False).index
+    )
+    # the estimator is saved with its lazily cached attributes, and pandas indices
+    # build their hash tables lazily, so the memory usage differs slightly
+    assert metadata["memory_usage"] == pytest.approx(
+        regressor_pipeline.memory_usage(deep=False)["total"].sum(), rel=0.01
+    )
+
+
+def test_load_errors(regressor_pipeline: RegressorPipelineDF, tmp_path: Path) -> None:
+    path = tmp_path / "model.sklearndf"
+    regressor_pipeline.save(path)
+
+    with pytest.raises(TypeError, match="RegressorPipelineDF"):
+        PipelineDF.load(path)
+
+    with pytest.raises(ValueError, match="mmap_mode"):
+        RegressorPipelineDF.load(path, mmap_mode="r+")
+
+    not_a_model = tmp_path / "not_a_model"
+    not_a_model.write_bytes(b"not a model")
+    with pytest.raises(ValueError, match="not an sklearndf model file"):
+        EstimatorDF.read_metadata(not_a_model)
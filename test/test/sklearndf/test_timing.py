@@ -0,0 +1,105 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearndf import (
+    TimingEvent,
+    add_timing_callback,
+    record_timings,
+    remove_timing_callback,
+)
+from sklearndf.classification import LogisticRegressionDF
+from sklearndf.pipeline import PipelineDF
+from sklearndf.regression import RidgeDF
+from sklearndf.transformation import StandardScalerDF
+
+
+@pytest.fixture
+def X() -> pd.DataFrame:
+    rng = np.random.RandomState(42)
+    return pd.DataFrame(rng.randn(50, 3), columns=["a", "b", "c"])
+
+
+def test_timing_callback(X: pd.DataFrame) -> None:
+    events: List[TimingEvent] = []
+
+    scaler = StandardScalerDF().fit(X)
+
+    add_timing_callback(events.append)
+    try:
+        scaler.transform(X)
+    finally:
+        remove_timing_callback(events.append)
+
+    assert {event.estimator for event in events} == {scaler}
+    assert {event.method for event in events} == {"transform"}
+    assert [event.phase for event in events] == [
+        "check_parameter_types",
+        "convert_X_for_delegate",
+        "transformed_to_df",
+        TimingEvent.PHASE_TOTAL,
+        TimingEvent.PHASE_DELEGATE,
+    ]
+    durations = {event.phase: event.duration for event in events}
+    assert all(duration >= 0.0 for duration in durations.values())
+    assert durations[TimingEvent.PHASE_TOTAL] == pytest.approx(
+        sum(
+            duration
+            for phase, duration in durations.items()
+            if phase != TimingEvent.PHASE_TOTAL
+        )
+    )
+
+    # no events once the callback is removed
+    scaler.transform(X)
+    assert len(events) == 5
+
+    with pytest.raises(ValueError):
+        remove_timing_callback(events.append)
+
+
+def test_record_timings(X: pd.DataFrame) -> None:
+    y = X["a"] + X["b"]
+    pipeline = PipelineDF([("scaler", StandardScalerDF()), ("regressor", RidgeDF())])
+
+    with record_timings() as timings:
+        pipeline.fit(X, y)
+        pipeline.predict(X)
+        LogisticRegressionDF().fit(X, y > 0).predict_proba(X)
+
+    summary = timings.summary()
+    assert summary.index.names == ["estimator", "method", "phase"]
+    assert summary.columns.tolist() == ["calls", "total_time", "mean_time"]
+
+    # nested estimator calls are attributed to the nested estimators
+    calls = summary.calls
+    assert calls[("StandardScalerDF", "fit_transform", TimingEvent.PHASE_TOTAL)] == 1
+    assert calls[("StandardScalerDF", "transform", "transformed_to_df")] == 1
+    assert calls[("RidgeDF", "predict", "prediction_to_series_or_frame")] == 1
+    assert calls[("PipelineDF", "predict", TimingEvent.PHASE_TOTAL)] == 1
+    assert (
+        calls[("LogisticRegressionDF", "predict_proba", "prediction_with_class_labels")]
+        == 1
+    )
+
+    # nested calls of overridden methods are timed once
+    assert summary.xs(TimingEvent.PHASE_TOTAL, level="phase").calls.to_dict() == {
+        ("StandardScalerDF", "fit_transform"): 1,
+        ("RidgeDF", "fit"): 1,
+        ("PipelineDF", "fit"): 1,
+        ("StandardScalerDF", "transform"): 1,
+        ("RidgeDF", "predict"): 1,
+        ("PipelineDF", "predict"): 1,
+        ("LogisticRegressionDF", "fit"): 1,
+        ("LogisticRegressionDF", "predict_proba"): 1,
+    }
+
+    # timing stops at the end of the with block
+    n_events = len(timings.events)
+    pipeline.predict(X)
+    assert len(timings.events) == n_events
+
+    timings.reset()
+    assert timings.summary().empty
@@ -0,0 +1,160 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal, assert_series_equal
+from sklearn.tree import DecisionTreeRegressor
+
+from sklearndf import ClassifierDF, LearnerDF, RegressorDF, config_context, set_config
+from sklearndf._tree_ensemble import _CompiledGradientBoosting, _CompiledTreeEnsemble
+from sklearndf.classification import (
+    ExtraTreesClassifierDF,
+    GradientBoostingClassifierDF,
+    RandomForestClassifierDF,
+)
+from sklearndf.regression import (
+    ExtraTreesRegressorDF,
+    GradientBoostingRegressorDF,
+    RandomForestRegressorDF,
+)
+
+
+@pytest.fixture
+def ensemble_df() -> pd.DataFrame:
+    rng = np.random.RandomState(42)
+    n = 300
+    df = pd.DataFrame(
+        data=rng.randn(n, 6), columns=[f"x{i}" for i in range(6)], index=rng.rand(n)
+    )
+    df["y"] = df["x0"] * 2 + df["x1"] ** 2 + rng.randn(n) * 0.1
+    return df
+
+
+@pytest.mark.parametrize(
+    argnames="regressor",
+    argvalues=[
+        RandomForestRegressorDF(n_estimators=20, random_state=42),
+        ExtraTreesRegressorDF(n_estimators=20, max_depth=6, random_state=42),
+        GradientBoostingRegressorDF(n_estimators=30, random_state=42),
+        GradientBoostingRegressorDF(
+            n_estimators=30, loss="huber", init="zero", random_state=42
+        ),
+    ],
+)
+def test_compiled_tree_ensemble_regressor(
+    regressor: RegressorDF, ensemble_df: pd.DataFrame
+) -> None:
+    X = ensemble_df.drop(columns="y")
+    y = ensemble_df["y"]
+
+    regressor.fit(X, y)
+    _check_compiled_predictions(learner=regressor, X_test=X.iloc[::-1] * 1.1)
+
+
+@pytest.mark.parametrize(
+    argnames="classifier",
+    argvalues=[
+        RandomForestClassifierDF(n_estimators=20, random_state=42),
+        ExtraTreesClassifierDF(n_estimators=20, max_depth=6, random_state=42),
+        GradientBoostingClassifierDF(n_estimators=30, random_state=42),
+    ],
+)
+@pytest.mark.parametrize(argnames="n_classes", argvalues=[2, 3])
+def test_compiled_tree_ensemble_classifier(
+    classifier: ClassifierDF, n_classes: int, ensemble_df: pd.DataFrame
+) -> None:
+    X = ensemble_df.drop(columns="y")
+    y = ensemble_df["y"]
+    y = pd.Series(
+        np.digitize(y, np.quantile(y, np.linspace(0, 1, n_classes + 1)[1:-1])),
+        index=y.index,
+    ).map(lambda c: f"class_{c}")
+
+    classifier.fit(X, y)
+    X_test = X.iloc[::-1] * 1.1
+    _check_compiled_predictions(learner=classifier, X_test=X_test)
+
+    proba_native = classifier.predict_proba(X_test)
+    with config_context(compile_tree_ensembles=True):
+        proba_compiled = classifier.predict_proba(X_test)
+    assert_frame_equal(proba_compiled, proba_native)
+
+
+def test_compiled_gradient_boosting_unsupported(ensemble_df: pd.DataFrame) -> None:
+    X = ensemble_df.drop(columns="y")
+    y = ensemble_df["y"] > 0
+
+    classifier = GradientBoostingClassifierDF(n_estimators=10, random_state=42)
+    predictions_native = classifier.fit(X, y).predict(X)
+
+    # without the private methods the compiled ensemble relies on, the ensemble is
+    # not compiled
+    with patch.object(
+        classifier.native_estimator.loss_, "_raw_prediction_to_proba", None
+    ):
+        assert _CompiledTreeEnsemble.from_estimator(classifier.native_estimator) is None
+
+    # predictions fall back to the native estimator
+    with patch.object(
+        _CompiledGradientBoosting, "is_supported", return_value=False
+    ), config_context(compile_tree_ensembles=True):
+        assert_series_equal(classifier.predict(X), predictions_native)
+        assert classifier._compiled_ensemble is None
+
+
+def _check_compiled_predictions(learner: LearnerDF, X_test: pd.DataFrame) -> None:
+    predictions_native = learner.predict(X_test)
+    with config_context(compile_tree_ensembles=True):
+        predictions_compiled = learner.predict(X_test)
+        # evaluate in chunks of rows
+        with patch.object(_CompiledTreeEnsemble, "CHUNK_SIZE", 100):
+            predictions_chunked = learner.predict(X_test)
+        predictions_single = learner.predict(X_test.iloc[:1])
+
+    # the compiled ensemble produces the same predictions as the native estimator
+    assert_series_equal(predictions_compiled, predictions_native)
+    assert_series_equal(predictions_chunked, predictions_native)
+    assert_series_equal(predictions_single, predictions_native.iloc[:1])
+
+
+def test_compiled_tree_ensemble_refit(ensemble_df: pd.DataFrame) -> None:
+    X = ensemble_df.drop(columns="y")
+    y = ensemble_df["y"]
+    y_multi = pd.DataFrame(dict(y1=y, y2=-y))
+
+    regressor = RandomForestRegressorDF(n_estimators=10, random_state=42)
+
+    with config_context(compile_tree_ensembles=True):
+        # the native trees are not used for predicting
+        with patch.object(DecisionTreeRegressor, "predict") as tree_predict:
+            predictions = regressor.fit(X, y).predict(X)
+            assert tree_predict.call_count == 0
+
+        # large batches are predicted by the native estimator
+        with patch.object(
+            DecisionTreeRegressor,
+            "predict",
+            autospec=True,
+            side_effect=DecisionTreeRegressor.predict,
+        ) as tree_predict, patch.object(
+            RandomForestRegressorDF, "COMPILED_MAX_ROWS", len(X) - 1
+        ):
+            assert_series_equal(regressor.predict(X), predictions)
+            assert tree_predict.call_count == 10
+
+        # re-fitting discards the compiled trees
+        predictions_refit = regressor.fit(X, y * 2).predict(X)
+        assert_series_equal(predictions_refit, predictions * 2)
+
+        # multi-output regression
+        predictions_multi = regressor.fit(X, y_multi).predict(X)
+
+        # the features must match the features used for fitting
+        with pytest.raises(ValueError):
+            regressor.predict(X.iloc[:, 1:])
+
+    assert_frame_equal(predictions_multi, regressor.predict(X))
+
+    with pytest.raises(ValueError, match="compile_tree_ensembles"):
+        set_config(compile_tree_ensembles=1)
@@ -1,9 +1,15 @@
+from unittest.mock import patch
+
 import numpy as np
 import pandas as pd
+import pytest
+from lightgbm.sklearn import LGBMModel
 from sklearn.ensemble import RandomForestRegressor
 
+from sklearndf.classification.extra import LGBMClassifierDF
 from sklearndf.pipeline import PipelineDF
 from sklearndf.regression import RandomForestRegressorDF
+from sklearndf.regression.extra import LGBMRegressorDF
 from sklearndf.transformation import SimpleImputerDF
 from sklearndf.transformation.extra import BorutaDF
 
@@ -40,3 +46,121 @@ def test_boruta_pipeline(boston_df: pd.DataFrame, boston_target: str) -> None:
     y = boston_df.loc[:, boston_target]
 
     boruta_selector.fit(x, y)
+
+
+def test_boruta_df_mixed_dtypes() -> None:
+    """Test BorutaDF with mixed numeric dtypes, and rejecting non-numeric dtypes"""
+    rng = np.random.RandomState(42)
+    n = 100
+    x = pd.DataFrame(
+        data={
+            "float": rng.randn(n),
+            "float32": rng.randn(n).astype(np.float32),
+            "int": rng.randint(0, 10, size=n),
+            "bool": rng.randn(n) > 0,
+            "category": pd.Categorical(rng.choice([1.5, 2.5], size=n)),
+        }
+    )
+    y = pd.Series(rng.randn(n))
+
+    boruta = BorutaDF(
+        estimator=RandomForestRegressor(),
+        n_estimators=10,
+        max_iter=5,
+        random_state=42,
+    )
+
+    # missing categories are converted to NaN
+    x_missing = x.copy()
+    x_missing.loc[0, "category"] = np.nan
+
+    for x_test in (x, x_missing):
+        # noinspection PyProtectedMember
+        x_converted = boruta._convert_X_for_delegate(x_test)
+        assert x_converted.dtype == np.float64
+        np.testing.assert_array_equal(x_converted, x_test.astype(float).values)
+
+    boruta.fit(x, y)
+    assert boruta.transform(x).columns.isin(x.columns).all()
+
+    with pytest.raises(TypeError, match="non-numeric columns: text"):
+        boruta.fit(x.assign(text="a"), y)
+
+
+def test_boruta_df_parallel() -> None:
+    """Test BorutaDF with parallel fits and row subsampling"""
+    rng = np.random.RandomState(42)
+    n = 200
+    x = pd.DataFrame(data=rng.randn(n, 8), columns=[f"f{i}" for i in range(8)])
+    y = x["f0"] * 3 + x["f1"] * 2 + rng.randn(n) * 0.1
+
+    def _fit(max_iter: int = 30, **params) -> BorutaDF:
+        return BorutaDF(
+            estimator=RandomForestRegressor(max_depth=5),
+            n_estimators=20,
+            max_iter=max_iter,
+            random_state=42,
+            **params,
+        ).fit(x, y)
+
+    for params in (dict(), dict(n_jobs=3), dict(n_jobs=2, max_samples=0.5)):
+        boruta = _fit(**params)
+        assert {"f0", "f1"} <= set(boruta.feature_names_out_)
+        assert boruta.native_estimator.importance_history_.shape[1] == 8
+        # fitting is reproducible
+        assert boruta.feature_names_out_.equals(_fit(**params).feature_names_out_)
+
+    # selection stops once all features are decided
+    boruta = _fit(max_iter=200, n_jobs=2, max_samples=100)
+    assert len(boruta.native_estimator.importance_history_) < 200
+    assert not boruta.native_estimator.support_weak_.any()
+    assert (boruta.native_estimator.ranking_ > 0).all()
+
+    for max_samples, error in ((0, ValueError), (1.5, ValueError), ("1", TypeError)):
+        with pytest.raises(error, match="arg max_samples"):
+            _fit(max_samples=max_samples)
+
+
+@pytest.mark.parametrize(argnames="importance_type", argvalues=["split", "gain"])
+def test_boruta_df_lgbm(importance_type: str) -> None:
+    """Test BorutaDF with LightGBM importances"""
+    rng = np.random.RandomState(42)
+    n = 300
+    x = pd.DataFrame(data=rng.randn(n, 6), columns=[f"f{i}" for i in range(6)])
+    y_regression = x["f0"] * 3 + x["f1"] * 2 + rng.randn(n) * 0.1
+    y_classification = pd.Series(
+        np.digitize(y_regression, np.quantile(y_regression, [0.33, 0.67]))
+    )
+
+    for estimator, y, params in (
+        (LGBMRegressorDF, y_regression, dict()),
+        (LGBMClassifierDF, y_classification, dict()),
+        (LGBMClassifierDF, y_classification > 0, dict(n_jobs=2, max_samples=0.8)),
+    ):
+        boruta = BorutaDF(
+            estimator=estimator(
+                num_leaves=7, importance_type=importance_type, n_jobs=1
+            ),
+            n_estimators=30,
+            max_iter=20,
+            random_state=42,
+            **params,
+        )
+
+        # boosters are trained directly, not using the estimator's fit method
+        with patch.object(LGBMModel, "fit", side_effect=AssertionError):
+            boruta.fit(x, y)
+
+        assert {"f0", "f1"} <= set(boruta.feature_names_out_)
+
+    # estimators with class weights are fitted using their own fit method
+    boruta = BorutaDF(
+        estimator=LGBMClassifierDF(class_weight="balanced"),
+        n_estimators=5,
+        max_iter=3,
+    )
+    with patch.object(
+        LGBMModel, "fit", autospec=True, side_effect=LGBMModel.fit
+    ) as fit:
+        boruta.fit(x, y_classification)
+    assert fit.call_count == 2
@@ -1,26 +1,41 @@
-from typing import Type, cast
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Type, cast
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
 import pytest
 import sklearn
-from pandas.testing import assert_frame_equal
+from pandas.testing import assert_frame_equal, assert_series_equal
 from sklearn.base import BaseEstimator
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import Normalizer
+from sklearn.preprocessing import (
+    Normalizer,
+    OneHotEncoder,
+    OrdinalEncoder,
+    StandardScaler,
+)
 
 import sklearndf.transformation
-from sklearndf import TransformerDF
+from sklearndf import TransformerDF, config_context
 from sklearndf.classification import RandomForestClassifierDF
 from sklearndf.transformation import (
     RFECVDF,
     RFEDF,
+    BinarizerDF,
     ColumnTransformerDF,
     KBinsDiscretizerDF,
+    MaxAbsScalerDF,
+    MinMaxScalerDF,
+    MissingIndicatorDF,
     NormalizerDF,
     OneHotEncoderDF,
+    OrdinalEncoderDF,
+    RobustScalerDF,
     SelectFromModelDF,
+    SimpleImputerDF,
     SparseCoderDF,
+    StandardScalerDF,
 )
 from sklearndf.transformation.extra import OutlierRemoverDF
 from test.sklearndf import (
@@ -162,3 +177,410 @@ def test_outlier_remover(df_outlier: pd.DataFrame) -> None:
         }
     )
     assert_frame_equal(df_transformed, df_transformed_expected)
+
+
+@pytest.mark.parametrize(
+    argnames="transformer",
+    argvalues=[
+        BinarizerDF(threshold=3),
+        KBinsDiscretizerDF(n_bins=3, encode="onehot-dense"),
+        MissingIndicatorDF(features="all"),
+        OneHotEncoderDF(sparse=False),
+    ],
+    ids=lambda transformer: type(transformer).__name__,
+)
+@pytest.mark.parametrize(argnames="binary_dtype", argvalues=["uint8", "bool"])
+def test_binary_dtype(
+    transformer: TransformerDF, binary_dtype: str, df_outlier: pd.DataFrame
+) -> None:
+    df = df_outlier.astype(float)
+    df.iloc[1, 1] = np.nan
+
+    if isinstance(transformer, MissingIndicatorDF):
+        X = df
+    else:
+        X = df.fillna(0)
+
+    expected = transformer.clone().fit_transform(X)
+
+    with config_context(binary_dtype=binary_dtype):
+        transformer = transformer.clone()
+        transformed_fit = transformer.fit_transform(X)
+        transformed = transformer.transform(X)
+
+    for df_transformed in (transformed_fit, transformed):
+        assert (df_transformed.dtypes == binary_dtype).all()
+        assert df_transformed.columns.equals(expected.columns)
+        assert_frame_equal(df_transformed.astype(expected.dtypes), expected)
+
+
+def test_binary_dtype_ordinal_bins(df_outlier: pd.DataFrame) -> None:
+    # ordinal bins are not binary and retain their dtype
+    with config_context(binary_dtype="uint8"):
+        transformed = KBinsDiscretizerDF(n_bins=3, encode="ordinal").fit_transform(
+            df_outlier.astype(float)
+        )
+
+    assert (transformed.dtypes == np.float64).all()
+
+
+def test_column_transformer_preserves_dtypes(df_outlier: pd.DataFrame) -> None:
+    X = df_outlier.assign(cat=list("abcab"))
+
+    column_transformer = ColumnTransformerDF(
+        transformers=[
+            ("scale", StandardScalerDF(), ["c0", "c1"]),
+            ("encode", OneHotEncoderDF(sparse=False, dtype=np.uint8), ["cat"]),
+        ]
+    )
+
+    transformed_fit = column_transformer.fit_transform(X)
+    transformed = column_transformer.transform(X)
+
+    for df_transformed in (transformed_fit, transformed):
+        assert df_transformed.columns.equals(column_transformer.feature_names_out_)
+        assert df_transformed.index.equals(X.index)
+        assert (df_transformed.loc[:, ["c0", "c1"]].dtypes == np.float64).all()
+        assert (
+            df_transformed.loc[:, ["cat_a", "cat_b", "cat_c"]].dtypes == np.uint8
+        ).all()
+
+    # the fitted column transformer can be shared by concurrent threads
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for df_transformed in executor.map(column_transformer.transform, [X] * 16):
+            assert_frame_equal(df_transformed, transformed)
+
+
+def test_column_transformer_native_features(df_outlier: pd.DataFrame) -> None:
+    X = df_outlier
+
+    for kwargs in (
+        dict(transformer_weights=dict(scale=2.0, passthrough=0.5)),
+        dict(n_jobs=2),
+    ):
+        # weighted or parallel transforms match the native column transformer
+        transformers = [
+            ("scale", StandardScaler(), slice("c0", "c1")),
+            ("passthrough", "passthrough", [2]),
+        ]
+        column_transformer = ColumnTransformerDF(
+            transformers=[
+                (name, StandardScalerDF() if name == "scale" else transformer, columns)
+                for name, transformer, columns in transformers
+            ],
+            **kwargs,
+        )
+        column_transformer_native = ColumnTransformer(
+            transformers=transformers, **kwargs
+        )
+
+        expected = column_transformer_native.fit_transform(X)
+        assert np.array_equal(column_transformer.fit_transform(X).values, expected)
+        assert np.array_equal(column_transformer.transform(X).values, expected)
+        assert list(column_transformer.feature_names_out_) == list(X.columns[:3])
+
+
+@pytest.fixture
+def df_categorical() -> pd.DataFrame:
+    return pd.DataFrame(
+        data=dict(
+            color=pd.Categorical(list("rgbbgrgb"), categories=list("rgbx")),
+            size=pd.Categorical([3, 1, 2, 2, 1, 3, 3, 1]),
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    argnames=("encoder_df", "native_type"),
+    argvalues=[
+        (OrdinalEncoderDF(), OrdinalEncoder),
+        (OneHotEncoderDF(sparse=False), OneHotEncoder),
+        (OneHotEncoderDF(sparse=False, dtype=np.uint8), OneHotEncoder),
+    ],
+)
+def test_categorical_encoder_fast_path(
+    encoder_df: TransformerDF, native_type: type, df_categorical: pd.DataFrame
+) -> None:
+    df_object = df_categorical.astype(object)
+    expected_fit = encoder_df.clone().fit_transform(df_object)
+
+    # categorical inputs are encoded without calling the native transform method
+    with patch.object(
+        native_type, "transform", autospec=True, side_effect=native_type.transform
+    ) as transform:
+        transformed_fit = encoder_df.fit_transform(df_categorical)
+        transformed = encoder_df.transform(df_categorical)
+
+        # the same categories in a different order, with an unused category
+        df_reordered = df_categorical.apply(
+            lambda sr: sr.cat.set_categories(
+                sr.cat.categories[::-1].append(pd.Index(["unused"]))
+            )
+        )
+        transformed_reordered = encoder_df.transform(df_reordered)
+
+        assert transform.call_count == 0
+
+    for df_transformed in (transformed_fit, transformed, transformed_reordered):
+        assert_frame_equal(df_transformed, expected_fit)
+
+    # missing values and unknown categories are passed on to the native encoder
+    df_missing = df_categorical.copy()
+    df_missing.iloc[0, 0] = np.nan
+    df_unknown = df_categorical.copy()
+    df_unknown.iloc[0, 0] = "x"
+
+    for df_invalid in (df_missing, df_unknown):
+        with pytest.raises(ValueError):
+            encoder_df.transform(df_invalid)
+
+
+def test_one_hot_encoder_fast_path_ignore_unknown(
+    df_categorical: pd.DataFrame,
+) -> None:
+    encoder_df = OneHotEncoderDF(sparse=False, handle_unknown="ignore")
+    # size 2 is unknown
+    encoder_df.fit(df_categorical.iloc[[0, 1, 5, 6, 7]])
+
+    transformed = encoder_df.transform(df_categorical)
+    assert_frame_equal(transformed, encoder_df.transform(df_categorical.astype(object)))
+    assert (
+        transformed.sum(axis=1) == np.where(df_categorical["size"] == 2, 1, 2)
+    ).all()
+
+
+@pytest.mark.skipif(
+    "min_frequency" not in OneHotEncoder().get_params(),
+    reason="infrequent categories require scikit-learn 1.1 or later",
+)
+def test_one_hot_encoder_infrequent_categories(df_categorical: pd.DataFrame) -> None:
+    X = df_categorical.iloc[:, :1]
+    encoder_df = OneHotEncoderDF(sparse=False, min_frequency=3).fit(X)
+    encoder_native = OneHotEncoder(sparse=False, min_frequency=3).fit(X.astype(object))
+
+    # infrequent categories are grouped in one output column, so the categorical
+    # inputs are passed on to the native encoder
+    assert not encoder_df._supports_direct_encoding()
+    assert np.array_equal(
+        encoder_df._transform(X), encoder_native.transform(X.astype(object))
+    )
+
+
+def test_categorical_dtypes_preserved(df_categorical: pd.DataFrame) -> None:
+    X = df_categorical.assign(weight=np.linspace(0.0, 1.0, len(df_categorical)))
+    X.iloc[0, :] = np.nan
+
+    column_transformer = ColumnTransformerDF(
+        transformers=[
+            ("impute", SimpleImputerDF(strategy="most_frequent"), ["color", "size"]),
+            ("keep", "passthrough", ["weight"]),
+        ]
+    )
+
+    for transformer in (
+        SimpleImputerDF(strategy="most_frequent"),
+        column_transformer,
+    ):
+        transformed_fit = transformer.fit_transform(X)
+        transformed = transformer.transform(X)
+        for df_transformed in (transformed_fit, transformed):
+            assert_series_equal(df_transformed.dtypes, X.dtypes, check_names=False)
+            assert df_transformed.notna().loc[:, ["color", "size"]].all(axis=None)
+
+    assert column_transformer.feature_names_original_.to_dict() == {
+        "color": "color",
+        "size": "size",
+        "weight": "weight",
+    }
+
+    # imputed values that are not categories of the input column are kept as objects
+    transformed = SimpleImputerDF(strategy="constant", fill_value="?").fit_transform(
+        X.loc[:, ["color"]]
+    )
+    assert transformed["color"].dtype == object
+
+
+def test_outlier_remover_partial_fit(df_outlier: pd.DataFrame) -> None:
+    # without compaction, approximate quartiles are exact
+    outlier_remover_exact = OutlierRemoverDF(iqr_multiple=2).fit(df_outlier)
+    outlier_remover_approximate = OutlierRemoverDF(
+        iqr_multiple=2, approximate=True
+    ).fit(df_outlier)
+    outlier_remover_partial = OutlierRemoverDF(iqr_multiple=2)
+    for chunk in (df_outlier.iloc[:2], df_outlier.iloc[2:]):
+        outlier_remover_partial.partial_fit(chunk)
+
+    for outlier_remover in (outlier_remover_approximate, outlier_remover_partial):
+        assert outlier_remover.is_fitted
+        assert_series_equal(
+            outlier_remover.threshold_low_, outlier_remover_exact.threshold_low_
+        )
+        assert_series_equal(
+            outlier_remover.threshold_high_, outlier_remover_exact.threshold_high_
+        )
+        assert_frame_equal(
+            outlier_remover.transform(df_outlier),
+            outlier_remover_exact.transform(df_outlier),
+        )
+
+    # fitting with exact quartiles starts over
+    outlier_remover_partial.fit(df_outlier.iloc[:3])
+    with pytest.raises(ValueError, match="can be merged"):
+        outlier_remover_partial.merge(outlier_remover_approximate)
+
+    with pytest.raises(ValueError, match="columns do not match"):
+        outlier_remover_approximate.partial_fit(df_outlier.iloc[:, :2])
+
+
+def test_outlier_remover_merge() -> None:
+    rng = np.random.RandomState(42)
+    df = pd.DataFrame(data=rng.standard_cauchy(size=(100_000, 2)), columns=["a", "b"])
+    df.iloc[::10, 0] = np.nan
+
+    # fit on separate partitions, then merge; with an IQR multiple of 0 the
+    # thresholds are the quartiles
+    outlier_removers = [
+        OutlierRemoverDF(iqr_multiple=0).partial_fit(partition)
+        for partition in np.array_split(df, 4)
+    ]
+    outlier_remover = outlier_removers[0]
+    for outlier_remover_other in outlier_removers[1:]:
+        outlier_remover.merge(outlier_remover_other)
+
+    # the ranks of the approximate quartiles are within 1% of the exact ranks
+    for q, thresholds in (
+        (0.25, outlier_remover.threshold_low_),
+        (0.75, outlier_remover.threshold_high_),
+    ):
+        ranks = (df < thresholds).sum() / df.notna().sum()
+        assert ranks.sub(q).abs().max() < 0.01, ranks
+
+    # outlier removers fitted on columns in a different order can be merged
+    merged = [
+        OutlierRemoverDF()
+        .partial_fit(df.iloc[:1000])
+        .merge(OutlierRemoverDF().partial_fit(df.iloc[1000:2000, columns]))
+        for columns in ([0, 1], [1, 0])
+    ]
+    assert_series_equal(merged[0].threshold_high_, merged[1].threshold_high_)
+
+    # merging leaves the other outlier removers unchanged
+    outlier_remover_other = outlier_removers[1]
+    thresholds_high = outlier_remover_other.threshold_high_
+    outlier_remover_other.partial_fit(df.iloc[:0])
+    assert_series_equal(outlier_remover_other.threshold_high_, thresholds_high)
+
+
+@pytest.mark.parametrize(argnames="dtype", argvalues=["float32", "float64", "mixed"])
+def test_outlier_remover_vectorized(dtype: str) -> None:
+    rng = np.random.RandomState(42)
+    df = pd.DataFrame(data=rng.standard_cauchy(size=(1000, 5)), columns=list("abcde"))
+    if dtype == "mixed":
+        df = df.astype(dict(a=np.float32, b=np.int64))
+        df["c"] = np.arange(len(df))
+    else:
+        df = df.astype(dtype)
+    df.iloc[::7, 3] = np.nan
+
+    outlier_remover = OutlierRemoverDF(iqr_multiple=1.5).fit(df)
+    expected = df.where(
+        cond=(df >= outlier_remover.threshold_low_)
+        & (df <= outlier_remover.threshold_high_)
+    )
+    expected_counts = (expected.isna() & df.notna()).sum(axis=1)
+
+    # process the data in several chunks of rows
+    with patch.object(OutlierRemoverDF, "CHUNK_SIZE", 1024):
+        df_original = df.copy()
+        assert_frame_equal(outlier_remover.transform(df), expected)
+        assert_frame_equal(df, df_original)
+
+        counts = outlier_remover.outlier_counts(df)
+        assert (counts.values == expected_counts.values).all()
+        assert counts.index.equals(df.index)
+        assert_series_equal(outlier_remover.outlier_rows(df), counts > 0)
+
+        # without copying, outliers are replaced in place
+        outlier_remover.set_params(copy=False)
+        transformed = outlier_remover.transform(df)
+        assert_frame_equal(transformed, expected)
+        if dtype != "mixed":
+            assert_frame_equal(df, expected)
+
+    # the columns can be passed in any order, and keep the name of the columns
+    assert_frame_equal(outlier_remover.transform(df.iloc[:, ::-1]), expected)
+    assert_frame_equal(
+        outlier_remover.transform(df.rename_axis(columns="feature")),
+        expected.rename_axis(columns="feature"),
+    )
+
+    with pytest.raises(ValueError, match="columns do not match"):
+        outlier_remover.transform(df.iloc[:, :2])
+
+
+@pytest.mark.parametrize(
+    argnames="transformer",
+    argvalues=[
+        StandardScalerDF(),
+        MinMaxScalerDF(),
+        MaxAbsScalerDF(),
+        RobustScalerDF(),
+        SimpleImputerDF(),
+        SimpleImputerDF(add_indicator=True),
+        MissingIndicatorDF(features="all"),
+        NormalizerDF(),
+        OutlierRemoverDF(iqr_multiple=1.0),
+    ],
+)
+def test_transform_columns(transformer: TransformerDF) -> None:
+    rng = np.random.RandomState(42)
+    X = pd.DataFrame(rng.randn(50, 5), columns=[f"x{i}" for i in range(5)])
+    if not isinstance(transformer, NormalizerDF):
+        X = X.mask(rng.rand(*X.shape) < 0.2)
+
+    transformed = transformer.fit(X).transform(X)
+    columns = transformed.columns[[3, 0]].tolist()
+
+    # the requested columns are returned in the requested order
+    assert_frame_equal(
+        transformer.transform(X, columns=columns), transformed.loc[:, columns]
+    )
+    assert_frame_equal(transformer.transform(X, columns=[]), transformed.loc[:, []])
+
+    with pytest.raises(KeyError, match="unknown output features"):
+        transformer.transform(X, columns=["x_unknown"])
+
+
+@pytest.mark.parametrize(argnames="categorical", argvalues=[False, True])
+@pytest.mark.parametrize(argnames="drop", argvalues=[None, "first"])
+def test_one_hot_encoder_transform_columns(
+    df_categorical: pd.DataFrame, categorical: bool, drop: Optional[str]
+) -> None:
+    X = df_categorical.dropna().astype(str)
+    if categorical:
+        X = X.astype("category")
+    encoder = OneHotEncoderDF(sparse=False, drop=drop).fit(X)
+    transformed = encoder.transform(X)
+    # the last two columns, in reverse order, both encoding feature "size"
+    columns = transformed.columns[[-1, -2]].tolist()
+
+    with patch.object(
+        OneHotEncoder, "transform", autospec=True, side_effect=OneHotEncoder.transform
+    ) as native_transform:
+        transformed_columns = encoder.transform(X, columns=columns)
+
+    assert_frame_equal(transformed_columns, transformed.loc[:, columns])
+    # only the feature of the requested columns is encoded
+    for call in native_transform.call_args_list:
+        assert call.args[1].shape[1] == 1
+
+    # the restricted encoder is cached for the same columns
+    assert encoder._restricted_transformer[0] == tuple(columns)
+
+    # encoders with unknown per-feature state are not restricted, and transform all
+    # features instead
+    encoder.native_estimator._unknown_feature_state = [None] * X.shape[1]
+    assert not encoder._supports_restriction()
+    assert_frame_equal(
+        encoder.transform(X, columns=columns), transformed.loc[:, columns]
+    )
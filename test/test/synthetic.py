@@ -0,0 +1,203 @@
+"""
+Deterministic synthetic data sets of configurable size, for tests and benchmarks.
+
+Frames have numeric, boolean and categorical columns, with optional missing values and
+categoricals of high cardinality, to expose scaling issues that the small toy data
+sets used elsewhere in the tests cannot reveal.
+"""
+
+import logging
+from typing import NamedTuple, Union
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+#: Prefix of the names of floating point columns.
+PREFIX_FLOAT = "float_"
+
+#: Prefix of the names of integer columns.
+PREFIX_INT = "int_"
+
+#: Prefix of the names of boolean columns.
+PREFIX_BOOL = "bool_"
+
+#: Prefix of the names of categorical columns.
+PREFIX_CATEGORY = "category_"
+
+
+class SyntheticData(NamedTuple):
+    """
+    A synthetic data set with features and target(s).
+    """
+
+    #: The features.
+    X: pd.DataFrame
+
+    #: The target, as a series for a single output or a data frame for multiple
+    #: outputs.
+    y: Union[pd.Series, pd.DataFrame]
+
+
+def make_frame(
+    n_rows: int,
+    n_float: int = 10,
+    n_int: int = 0,
+    n_bool: int = 0,
+    n_category: int = 0,
+    *,
+    missing: float = 0.0,
+    cardinality: int = 10,
+    category_dtype: str = "object",
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Make a data frame of random features.
+
+    Floating point columns alternate between dtypes ``float64`` and ``float32``.
+    Missing values are inserted into floating point and categorical columns only, as
+    the other dtypes cannot represent them.
+
+    :param n_rows: the number of rows
+    :param n_float: the number of floating point columns
+    :param n_int: the number of integer columns
+    :param n_bool: the number of boolean columns
+    :param n_category: the number of categorical columns
+    :param missing: the share of missing values in floating point and categorical
+        columns
+    :param cardinality: the number of distinct values of each categorical column
+    :param category_dtype: the dtype of categorical columns, ``"object"`` for
+        strings or ``"category"`` for pandas categoricals
+    :param seed: the seed of the random generator
+    :return: the data frame
+    """
+    rng = np.random.RandomState(seed)
+    columns = {}
+
+    for i in range(n_float):
+        values = rng.randn(n_rows).astype(np.float64 if i % 2 == 0 else np.float32)
+        if missing > 0:
+            values[rng.rand(n_rows) < missing] = np.nan
+        columns[f"{PREFIX_FLOAT}{i}"] = values
+
+    for i in range(n_int):
+        columns[f"{PREFIX_INT}{i}"] = rng.randint(0, 1000, size=n_rows)
+
+    for i in range(n_bool):
+        columns[f"{PREFIX_BOOL}{i}"] = rng.rand(n_rows) < 0.5
+
+    if n_category > 0:
+        categories = np.array([f"c{j}" for j in range(cardinality)], dtype=object)
+        for i in range(n_category):
+            # skewed frequencies, as is typical for high-cardinality categoricals
+            codes = np.minimum(rng.zipf(1.5, size=n_rows) - 1, cardinality - 1).astype(
+                np.int64
+            )
+            if missing > 0:
+                codes[rng.rand(n_rows) < missing] = -1
+            values = pd.Categorical.from_codes(codes, categories=categories)
+            columns[f"{PREFIX_CATEGORY}{i}"] = (
+                values if category_dtype == "category" else values.astype(object)
+            )
+
+    return pd.DataFrame(columns)
+
+
+def make_wide_frame(
+    n_rows: int = 1_000, n_cols: int = 10_000, **kwargs
+) -> pd.DataFrame:
+    """
+    Make a data frame with few rows and many floating point columns.
+
+    :param n_rows: the number of rows
+    :param n_cols: the number of columns
+    :param kwargs: additional arguments to :func:`.make_frame`
+    :return: the data frame
+    """
+    return make_frame(n_rows=n_rows, n_float=n_cols, **kwargs)
+
+
+def make_tall_frame(
+    n_rows: int = 1_000_000, n_cols: int = 20, **kwargs
+) -> pd.DataFrame:
+    """
+    Make a data frame with many rows and few columns of mixed dtypes, in equal
+    shares of floating point, integer, boolean, and categorical columns.
+
+    :param n_rows: the number of rows
+    :param n_cols: the number of columns
+    :param kwargs: additional arguments to :func:`.make_frame`
+    :return: the data frame
+    """
+    n_each, n_remainder = divmod(n_cols, 4)
+    return make_frame(
+        n_rows=n_rows,
+        n_float=n_each + n_remainder,
+        n_int=n_each,
+        n_bool=n_each,
+        n_category=n_each,
+        **kwargs,
+    )
+
+
+def make_target(
+    X: pd.DataFrame,
+    n_outputs: int = 1,
+    *,
+    classification: bool = False,
+    noise: float = 0.1,
+    seed: int = 42,
+) -> Union[pd.Series, pd.DataFrame]:
+    """
+    Make a target depending linearly on the numeric features of the given frame.
+
+    :param X: the features
+    :param n_outputs: the number of outputs
+    :param classification: if ``True``, make binary targets, otherwise continuous
+        targets
+    :param noise: the standard deviation of the noise added to each target
+    :param seed: the seed of the random generator
+    :return: a series for a single output, or a data frame for multiple outputs
+    """
+    rng = np.random.RandomState(seed)
+    numeric = X.select_dtypes(include=[np.number, bool]).astype(np.float64)
+    numeric = numeric.fillna(0.0).values
+    n_rows, n_numeric = numeric.shape
+
+    outputs = {}
+    for i in range(n_outputs):
+        coef = rng.randn(n_numeric) / max(np.sqrt(n_numeric), 1.0)
+        values = numeric @ coef + rng.randn(n_rows) * noise
+        if classification:
+            values = values > np.median(values)
+        outputs[f"target_{i}"] = values
+
+    y = pd.DataFrame(outputs, index=X.index)
+    return y.iloc[:, 0] if n_outputs == 1 else y
+
+
+def make_data(
+    n_rows: int,
+    n_outputs: int = 1,
+    *,
+    classification: bool = False,
+    seed: int = 42,
+    **kwargs,
+) -> SyntheticData:
+    """
+    Make a data set with features and target(s).
+
+    :param n_rows: the number of rows
+    :param n_outputs: the number of outputs
+    :param classification: if ``True``, make binary targets, otherwise continuous
+        targets
+    :param seed: the seed of the random generator
+    :param kwargs: additional arguments to :func:`.make_frame`
+    :return: the data set
+    """
+    X = make_frame(n_rows=n_rows, seed=seed, **kwargs)
+    return SyntheticData(
+        X=X,
+        y=make_target(X, n_outputs, classification=classification, seed=seed + 1),
+    )